@@ -0,0 +1,3 @@
+"""
+    Benchmarks of florgon-cc CLI and fake CC API, that is used by benchmarks and tests.
+"""
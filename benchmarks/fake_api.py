@@ -0,0 +1,297 @@
+"""
+    Local stand-in for Florgon CC API, used by benchmarks.
+    Implements urls and pastes methods with realistic payload sizes,
+    injectable latency and transient errors. Bodies are compressed with gzip, if client accepts it,
+    and gzipped request bodies are accepted.
+    Can be run like this:
+    ```
+    python benchmarks/fake_api.py --port 8000 --latency 50
+    ```
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+import gzip
+import json
+import random
+import string
+import threading
+import time
+
+import click
+
+HASH_ALPHABET = string.ascii_letters + string.digits
+LOG_LINE = "2023-07-09 15:35:32,123 INFO [worker-{}] request handled in {} ms, status=200\n"
+
+
+class FakeApi:
+    """
+    In-memory state of fake API.
+    """
+
+    def __init__(
+        self,
+        urls_count: int = 100,
+        pastes_count: int = 20,
+        paste_size: int = 4096,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        paginate: bool = False,
+        seed: int = 0,
+    ) -> None:
+        """
+        :param int urls_count: number of urls created on start
+        :param int pastes_count: number of pastes created on start
+        :param int paste_size: size of text of created pastes in bytes
+        :param float latency: delay of every response in seconds
+        :param float error_rate: part of requests failed with 503 HTTP code, from 0 to 1
+        :param bool paginate: honor `offset` and `limit` params of lists
+        :param int seed: random seed, same seed gives same data
+        """
+        self.random = random.Random(seed)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.paginate = paginate
+        self.lock = threading.Lock()
+        self.urls: Dict[str, Dict[str, Any]] = {}
+        self.pastes: Dict[str, Dict[str, Any]] = {}
+        self.requests_count = 0
+        for index in range(urls_count):
+            self.create_url(f"https://example.com/articles/{index}?utm_source=benchmark", False)
+        for _ in range(pastes_count):
+            self.create_paste(self.generate_text(paste_size), False, False)
+
+    def generate_text(self, size: int) -> str:
+        lines = []
+        length = 0
+        while length < size:
+            line = LOG_LINE.format(self.random.randint(1, 16), self.random.randint(1, 999))
+            lines.append(line)
+            length += len(line)
+        return "".join(lines)[:size]
+
+    def generate_hash(self) -> str:
+        while True:
+            hash = "".join(self.random.choices(HASH_ALPHABET, k=6))
+            if hash not in self.urls and hash not in self.pastes:
+                return hash
+
+    def create_url(self, redirect_url: str, stats_is_public: bool) -> Dict[str, Any]:
+        with self.lock:
+            hash = self.generate_hash()
+            self.urls[hash] = {
+                "id": len(self.urls) + 1,
+                "redirect_url": redirect_url,
+                "hash": hash,
+                "expires_at": time.time() + 30 * 24 * 3600,
+                "is_expired": False,
+                "stats_is_public": stats_is_public,
+                "is_deleted": False,
+                "_links": {
+                    "qr": {"href": f"https://cc.florgon.com/qr/{hash}"},
+                    "stats": {"href": f"https://api-cc.florgon.com/v1/urls/{hash}/stats"},
+                },
+            }
+            return self.urls[hash]
+
+    def create_paste(self, text: str, stats_is_public: bool, burn_after_read: bool):
+        with self.lock:
+            hash = self.generate_hash()
+            self.pastes[hash] = {
+                "id": len(self.pastes) + 1,
+                "text": text,
+                "hash": hash,
+                "expires_at": time.time() + 30 * 24 * 3600,
+                "is_expired": False,
+                "stats_is_public": stats_is_public,
+                "is_deleted": False,
+                "burn_after_read": burn_after_read,
+                "_links": {
+                    "stats": {"href": f"https://api-cc.florgon.com/v1/pastes/{hash}/stats"},
+                },
+            }
+            return self.pastes[hash]
+
+    def generate_stats(self, hash: str, referers_as: str, dates_as: str) -> Dict[str, Any]:
+        generator = random.Random(hash)
+        by_referers = {
+            f"https://referer-{index}.example.com/": generator.randint(1, 500)
+            for index in range(20)
+        }
+        by_dates = {f"2023-06-{day:02}": generator.randint(1, 300) for day in range(1, 31)}
+        return {
+            "total": sum(by_dates.values()),
+            "by_referers": _as(by_referers, referers_as),
+            "by_dates": _as(by_dates, dates_as),
+        }
+
+    def handle(
+        self, method: str, path: str, query: Dict[str, str], body: Optional[Dict[str, Any]]
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Returns HTTP status and JSON body for request."""
+        with self.lock:
+            self.requests_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return _error(503, "Service temporarily unavailable")
+
+        parts = [part for part in path.split("/") if part][1:]  # Without API version.
+        if not parts or parts[0] not in ("urls", "pastes"):
+            return _error(404, "Method not found")
+        kind, items = ("url", self.urls) if parts[0] == "urls" else ("paste", self.pastes)
+
+        if len(parts) == 1 and method == "GET":
+            values = list(items.values())
+            if self.paginate and "limit" in query:
+                offset = int(query.get("offset", 0))
+                end = offset + int(query["limit"])
+                values = values[offset:end]
+            return 200, {"success": {parts[0]: values}}
+        if len(parts) == 1 and method == "POST":
+            if kind == "url":
+                item = self.create_url(body["url"], body.get("stats_is_public", False))
+            else:
+                item = self.create_paste(
+                    body["text"],
+                    body.get("stats_is_public", False),
+                    body.get("burn_after_read", False),
+                )
+            return 200, {"success": {kind: item}}
+
+        item = items.get(parts[1])
+        if item is None:
+            return _error(404, f"{kind.capitalize()} not found")
+        if len(parts) == 2 and method == "GET":
+            if kind == "paste" and item["burn_after_read"]:
+                items.pop(parts[1], None)
+            return 200, {"success": {kind: item}}
+        if len(parts) == 2 and method == "DELETE":
+            items.pop(parts[1], None)
+            return 204, None
+        if len(parts) == 3 and parts[2] == "stats" and method == "GET":
+            referers_as = query.get("referer_views_value_as", "percent")
+            dates_as = query.get("dates_views_value_as", "percent")
+            return 200, {
+                "success": {"views": self.generate_stats(item["hash"], referers_as, dates_as)}
+            }
+        if len(parts) == 3 and parts[2] == "stats" and method == "DELETE":
+            return 204, None
+        return _error(405, "Method not allowed")
+
+
+def create_server(api: FakeApi, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Creates HTTP server for fake API. Server is not started.
+    :param FakeApi api: fake API state
+    :param str host: host to bind
+    :param int port: port to bind, random free port if 0
+    :rtype: ThreadingHTTPServer
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, avoid delayed ACK stalls.
+        disable_nagle_algorithm = True
+
+        def log_message(self, *_) -> None:
+            pass
+
+        def handle_request(self) -> None:
+            path, _, query_string = self.path.partition("?")
+            query = dict(
+                parameter.split("=", 1) for parameter in query_string.split("&") if "=" in parameter
+            )
+            raw_body = self.read_body()
+            try:
+                body = json.loads(raw_body) if raw_body else None
+            except ValueError:
+                status, response = _error(400, "Invalid JSON")
+            else:
+                status, response = api.handle(self.command, path, query, body)
+
+            data = json.dumps(response).encode() if response is not None else b""
+            self.send_response(status)
+            if data:
+                self.send_header("Content-Type", "application/json")
+            if len(data) >= 1024 and "gzip" in self.headers.get("Accept-Encoding", ""):
+                data = gzip.compress(data, compresslevel=5)
+                self.send_header("Content-Encoding", "gzip")
+            if status == 503:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def read_body(self) -> bytes:
+            body = self.read_raw_body()
+            if self.headers.get("Content-Encoding") == "gzip":
+                return gzip.decompress(body)
+            return body
+
+        def read_raw_body(self) -> bytes:
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        return b"".join(chunks)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        do_GET = do_POST = do_DELETE = handle_request
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def _as(values: Dict[str, int], value_as: str) -> Dict[str, float]:
+    if value_as != "percent":
+        return values
+    total = sum(values.values())
+    return {key: round(value / total * 100, 2) for key, value in values.items()}
+
+
+def _error(status: int, message: str) -> Tuple[int, Dict[str, Any]]:
+    return status, {"error": {"message": message, "code": status, "status": status}}
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Host to bind.")
+@click.option("-p", "--port", type=int, default=0, help="Port to bind, random if 0.")
+@click.option("--urls", "urls_count", type=int, default=100, help="Number of created urls.")
+@click.option("--pastes", "pastes_count", type=int, default=20, help="Number of created pastes.")
+@click.option("--paste-size", type=int, default=4096, help="Size of created pastes in bytes.")
+@click.option("-l", "--latency", type=float, default=0.0, help="Response delay in milliseconds.")
+@click.option(
+    "-e",
+    "--error-rate",
+    type=click.FloatRange(0, 1),
+    default=0.0,
+    help="Part of requests failed with 503 HTTP code.",
+)
+@click.option("--paginate", is_flag=True, default=False, help="Honor offset and limit of lists.")
+def main(
+    host: str,
+    port: int,
+    urls_count: int,
+    pastes_count: int,
+    paste_size: int,
+    latency: float,
+    error_rate: float,
+    paginate: bool,
+):
+    """Runs fake Florgon CC API and prints its url."""
+    api = FakeApi(urls_count, pastes_count, paste_size, latency / 1000, error_rate, paginate)
+    server = create_server(api, host, port)
+    print(f"http://{host}:{server.server_address[1]}/v1", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
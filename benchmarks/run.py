@@ -0,0 +1,224 @@
+"""
+    Benchmark suite for florgon-cc CLI.
+    Starts fake API (benchmarks/fake_api.py) and measures real CLI commands against it:
+    cold start time (with and without daemon), latency percentiles of commands,
+    bulk throughput and peak memory.
+    Can be run like this:
+    ```
+    python benchmarks/run.py --repeat 50 --latency 20
+    ```
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# CLI resolves config directory on import, so home must be replaced before.
+HOME_DIR = tempfile.mkdtemp(prefix="florgon-cc-benchmark-")
+atexit.register(shutil.rmtree, HOME_DIR, ignore_errors=True)
+os.environ["HOME"] = HOME_DIR
+# Commands are forwarded to daemon started by benchmark.
+os.environ.pop("FLORGON_CC_NO_DAEMON", None)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import click  # noqa: E402
+import requests  # noqa: E402
+from click.testing import CliRunner  # noqa: E402
+
+from florgon_cc_cli import config  # noqa: E402
+from florgon_cc_cli.main import main  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+BENCHMARKS_DIR = ROOT_DIR / "benchmarks"
+
+
+def start_fake_api(latency: float, urls_count: int, pastes_count: int, paste_size: int):
+    """Starts fake API in subprocess and returns process with its url."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(BENCHMARKS_DIR / "fake_api.py"),
+            f"--latency={latency}",
+            f"--urls={urls_count}",
+            f"--pastes={pastes_count}",
+            f"--paste-size={paste_size}",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    return process, process.stdout.readline().strip()
+
+
+def write_config(api_host: str) -> None:
+    config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    config.CONFIG_FILE.write_text(f'api_host = "{api_host}"\naccess_token = "benchmark"\n')
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> List[float]:
+    """Calls function `repeat` times and returns durations in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started_at) * 1000)
+    return durations
+
+
+def invoke(runner: CliRunner, args: List[str], input: Optional[str] = None) -> None:
+    result = runner.invoke(main, args, input=input, catch_exceptions=False)
+    if result.exit_code != 0:
+        raise click.ClickException(f"`{' '.join(args)}` failed:\n{result.output}")
+
+
+def run_subprocess(args: List[str]) -> None:
+    """Runs command like `florgon-cc` entry point, forwarded to daemon if it is running."""
+    subprocess.run(
+        [sys.executable, "-m", "florgon_cc_cli.client", *args],
+        check=True,
+        cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def get_peak_rss_kb(who: int) -> Optional[int]:
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak_rss // 1024 if sys.platform == "darwin" else peak_rss
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(durations, 50), 2),
+        "p99_ms": round(percentile(durations, 99), 2),
+        "runs": len(durations),
+    }
+
+
+@click.command()
+@click.option("-n", "--repeat", type=click.IntRange(min=1), default=20, help="Runs per command.")
+@click.option(
+    "-l", "--latency", type=float, default=0.0, help="Fake API response delay in milliseconds."
+)
+@click.option("--urls", "urls_count", type=int, default=100, help="Number of urls in fake API.")
+@click.option(
+    "--pastes", "pastes_count", type=int, default=20, help="Number of pastes in fake API."
+)
+@click.option("--paste-size", type=int, default=64 * 1024, help="Size of pastes in bytes.")
+@click.option("--bulk", "bulk_count", type=int, default=200, help="Number of urls in bulk create.")
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default=None,
+    help="Write results as JSON to file. Pass '-' to write to stdout.",
+)
+def run(
+    repeat: int,
+    latency: float,
+    urls_count: int,
+    pastes_count: int,
+    paste_size: int,
+    bulk_count: int,
+    output,
+):
+    """Runs CLI benchmarks against fake API."""
+    process, api_host = start_fake_api(latency, urls_count, pastes_count, paste_size)
+    try:
+        write_config(api_host)
+        results = run_benchmarks(api_host, repeat, bulk_count)
+    finally:
+        process.terminate()
+        process.wait()
+
+    if output:
+        json.dump(results, output, indent=2)
+        return
+    click.echo(f"{'benchmark':<32}{'p50, ms':>12}{'p99, ms':>12}{'runs':>8}")
+    for name, result in results["commands"].items():
+        click.echo(f"{name:<32}{result['p50_ms']:>12}{result['p99_ms']:>12}{result['runs']:>8}")
+    click.echo(f"Bulk create: {results['bulk']['urls_per_second']} urls/s")
+    click.echo(
+        f"Peak RSS: {results['peak_rss_kb']} KB, subprocesses {results['children_peak_rss_kb']} KB"
+    )
+
+
+def run_benchmarks(api_host: str, repeat: int, bulk_count: int) -> Dict[str, Any]:
+    urls = requests.get(f"{api_host}/urls/").json()["success"]["urls"]
+    pastes = requests.get(f"{api_host}/pastes/").json()["success"]["pastes"]
+    short_url = f"{config.URL_OPEN_PROVIDER}/{urls[0]['hash']}"
+    paste_url = f"{config.URL_PASTE_OPEN_PROVIDER}/{pastes[0]['hash']}"
+
+    commands = {
+        "cold start: --help": lambda: run_subprocess(["--help"]),
+        "cold start: url info": lambda: run_subprocess(["url", "info", "-s", short_url]),
+    }
+    runner = CliRunner()
+    commands.update(
+        {
+            "url list": lambda: invoke(runner, ["--no-cache", "url", "list"]),
+            "url list (cached)": lambda: invoke(runner, ["url", "list"]),
+            "url info": lambda: invoke(runner, ["url", "info", "-s", short_url]),
+            "url stats": lambda: invoke(runner, ["url", "stats", "-s", short_url]),
+            "url create": lambda: invoke(
+                runner, ["url", "create", "-o", "-d", "https://example.com/benchmark"]
+            ),
+            "paste list": lambda: invoke(runner, ["--no-cache", "paste", "list"]),
+            "paste read": lambda: invoke(runner, ["paste", "read", "-o", "-s", paste_url]),
+            "paste create": lambda: invoke(
+                runner, ["paste", "create", "-o", "-d", "-t", "x" * 1024]
+            ),
+        }
+    )
+    results: Dict[str, Any] = {"commands": {}}
+    for name, command in commands.items():
+        command()  # Warm up connections and caches.
+        results["commands"][name] = summarize(measure(command, repeat))
+
+    run_subprocess(["daemon", "start"])
+    try:
+        for name, args in {
+            "daemon: --help": ["--help"],
+            "daemon: url info": ["url", "info", "-s", short_url],
+        }.items():
+            run_subprocess(args)  # Daemon warms up connections and caches.
+            results["commands"][name] = summarize(measure(lambda: run_subprocess(args), repeat))
+    finally:
+        run_subprocess(["daemon", "stop"])
+
+    long_urls = "".join(f"https://example.com/bulk/{index}\n" for index in range(bulk_count))
+    duration = measure(
+        lambda: invoke(runner, ["url", "create", "-o", "-d", "-f", "-"], input=long_urls), 1
+    )[0]
+    results["bulk"] = {
+        "urls": bulk_count,
+        "duration_ms": round(duration, 2),
+        "urls_per_second": round(bulk_count / duration * 1000, 2),
+    }
+    results["peak_rss_kb"] = get_peak_rss_kb(resource.RUSAGE_SELF) if resource else None
+    results["children_peak_rss_kb"] = (
+        get_peak_rss_kb(resource.RUSAGE_CHILDREN) if resource else None
+    )
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,115 @@
+"""
+    Entry point of `florgon-cc`. Forwards command to daemon (see `florgon-cc daemon start`)
+    if it is running, otherwise runs command in this process. Module imports nothing heavy,
+    so forwarded command does not pay for importing click and requests.
+"""
+from typing import BinaryIO, List, NoReturn, Optional
+import json
+import os
+import shutil
+import socket
+import struct
+import sys
+
+from florgon_cc_cli import config
+
+SOCKET_FILE = config.CONFIG_DIR / "daemon.sock"
+# Frame is kind (1 byte), payload size (4 bytes) and payload.
+FRAME_HEADER = struct.Struct(">cI")
+FRAME_STDOUT = b"o"
+FRAME_STDERR = b"e"
+FRAME_EXIT = b"x"
+# Command needs terminal (picker, prompt), so it should be run by client itself.
+FRAME_FALLBACK = b"f"
+# Commands that are never forwarded: daemon management and interactive shell.
+LOCAL_COMMANDS = ("daemon", "shell")
+NO_DAEMON_ENV = "FLORGON_CC_NO_DAEMON"
+
+
+def main() -> NoReturn:
+    """Runs command in daemon or, if it is not possible, in this process."""
+    args = sys.argv[1:]
+    if _can_forward(args):
+        exit_code = forward_command(args)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from florgon_cc_cli.main import main as run_command
+
+    run_command(prog_name="florgon-cc")
+
+
+def forward_command(args: List[str]) -> Optional[int]:
+    """
+    Runs command in daemon, its output is written to stdout and stderr of this process.
+    :param List[str] args: command line arguments
+    :rtype: Optional[int]
+    :return: exit code, or None if daemon is not running or command should be run locally
+    """
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(str(SOCKET_FILE))
+    except OSError:
+        return None
+
+    terminal_size = shutil.get_terminal_size()
+    request = {
+        "args": args,
+        "cwd": os.getcwd(),
+        "stdout_isatty": sys.stdout.isatty(),
+        "stderr_isatty": sys.stderr.isatty(),
+        "columns": terminal_size.columns,
+        "lines": terminal_size.lines,
+        "environ": {key: os.environ.get(key) for key in config.FORWARDED_ENVIRONMENT},
+    }
+    with connection, connection.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        while True:
+            header = stream.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                # Daemon is stopped while command is running.
+                sys.stderr.write("Connection to florgon-cc daemon is lost!\n")
+                return 1
+            kind, size = FRAME_HEADER.unpack(header)
+            payload = stream.read(size)
+            if kind == FRAME_STDOUT:
+                _write(sys.stdout.buffer, payload)
+            elif kind == FRAME_STDERR:
+                _write(sys.stderr.buffer, payload)
+            elif kind == FRAME_EXIT:
+                return int(payload)
+            elif kind == FRAME_FALLBACK:
+                return None
+
+
+def _can_forward(args: List[str]) -> bool:
+    """
+    Returns True if command can be forwarded to daemon. Commands that read stdin
+    (with '-' argument) are run locally, as stdin is not forwarded.
+    """
+    return (
+        not os.environ.get(NO_DAEMON_ENV)
+        and SOCKET_FILE.exists()
+        and not any(_is_stdin_arg(arg) for arg in args)
+        and next((arg for arg in args if not arg.startswith("-")), None) not in LOCAL_COMMANDS
+    )
+
+
+def _is_stdin_arg(arg: str) -> bool:
+    """
+    Returns True if argument is '-' (stdin) or option with attached '-' value:
+    `--from-file=-` or `-f-`.
+    """
+    if arg == "-" or arg.endswith("=-"):
+        return True
+    return arg.startswith("-") and not arg.startswith("--") and len(arg) > 2 and arg.endswith("-")
+
+
+def _write(file: BinaryIO, data: bytes) -> None:
+    file.write(data)
+    file.flush()
+
+
+if __name__ == "__main__":
+    main()
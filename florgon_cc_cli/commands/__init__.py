@@ -1,8 +1,4 @@
-from .url import url
-from .login import login
-from .logout import logout
-from .host import host
-from .config import config
-from .paste import paste
-
-__all__ = ["url", "login", "logout", "host", "config", "paste"]
+"""
+    CLI commands. Every command module is imported lazily by
+    `florgon_cc_cli.main` only when its command is invoked.
+"""
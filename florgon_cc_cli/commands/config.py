@@ -4,7 +4,7 @@
 import click
 
 import florgon_cc_cli.config
-from florgon_cc_cli.services.config import deserialize_config
+from florgon_cc_cli.services.config import load_config
 
 
 @click.group()
@@ -27,7 +27,7 @@ def show(raw: bool):
             click.echo(f.read())
         return
 
-    user_config = deserialize_config()
+    user_config = load_config()
     for key, value in user_config.items():
         click.echo(click.style(f"{key:20}", fg="green") + f"{value}")
 
@@ -0,0 +1,84 @@
+"""
+    Commands to manage daemon, that runs commands without startup cost.
+"""
+from datetime import datetime
+import subprocess
+import sys
+import time
+
+import click
+
+from florgon_cc_cli.services.daemon import get_daemon_status, serve, stop_daemon
+
+START_TIMEOUT = 10
+
+
+@click.group()
+def daemon():
+    """
+    Background process that runs commands without startup cost.
+    When daemon is running, commands are forwarded to it, commands that need
+    terminal or stdin are still run in place. Set FLORGON_CC_NO_DAEMON=1 to not use daemon.
+    """
+
+
+@daemon.command()
+@click.option(
+    "-f",
+    "--foreground",
+    is_flag=True,
+    default=False,
+    help="Run daemon in this process, e.g. under service manager.",
+)
+def start(foreground: bool):
+    """
+    Starts daemon.
+    """
+    status = get_daemon_status()
+    if status is not None:
+        click.secho(f"Daemon is already running with PID {status['pid']}!", fg="red", err=True)
+        click.get_current_context().exit(1)
+    if foreground:
+        serve()
+        return
+
+    subprocess.Popen(
+        [sys.executable, "-m", "florgon_cc_cli.main", "daemon", "start", "--foreground"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + START_TIMEOUT
+    while status is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = get_daemon_status()
+    if status is None:
+        click.secho("Daemon is not started!", fg="red", err=True)
+        click.get_current_context().exit(1)
+    click.echo("Daemon is started with PID " + click.style(str(status["pid"]), fg="green"))
+
+
+@daemon.command()
+def stop():
+    """
+    Stops daemon.
+    """
+    if not stop_daemon():
+        click.secho("Daemon is not running!", fg="red", err=True)
+        click.get_current_context().exit(1)
+    click.echo("Daemon is stopped.")
+
+
+@daemon.command()
+def status():
+    """
+    Prints whether daemon is running.
+    """
+    status = get_daemon_status()
+    if status is None:
+        click.echo("Daemon is not running.")
+        click.get_current_context().exit(1)
+    click.echo("Daemon is running with PID " + click.style(str(status["pid"]), fg="green"))
+    click.echo(f"Started at: {datetime.fromtimestamp(status['started_at'])}")
+    click.echo(f"Commands run: {status['commands']}")
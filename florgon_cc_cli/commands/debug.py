@@ -0,0 +1,65 @@
+"""
+    Commands for debugging the CLI itself.
+"""
+from typing import List, Optional, Tuple
+import re
+import subprocess
+import sys
+import time
+
+import click
+
+IMPORT_TIME_LINE_REGEX = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+@click.group()
+def debug():
+    """
+    Tools for debugging the CLI itself.
+    """
+
+
+@debug.command(context_settings={"ignore_unknown_options": True})
+@click.option("-n", "--top", type=int, default=10, help="Number of slowest imports to print.")
+@click.option(
+    "-b",
+    "--budget",
+    type=float,
+    default=None,
+    help="Exit with error if total import time exceeds budget (in milliseconds).",
+)
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+def import_time(top: int, budget: Optional[float], args: Tuple[str, ...]):
+    """
+    Prints import time report for command ARGS (defaults to --help).
+    Command is run in a fresh interpreter, like the `florgon-cc` entry point,
+    so it is forwarded to daemon if daemon is running.
+    Separate ARGS with `--` if they contain options, e.g. `import-time -- url --help`.
+    """
+    started_at = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "florgon_cc_cli.client", *(args or ["--help"])],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall_time = (time.perf_counter() - started_at) * 1000
+
+    imports: List[Tuple[int, str]] = []
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE_REGEX.match(line)
+        # Only top-level imports, nested ones are included into cumulative time.
+        if match and len(match.group(3)) == 1:
+            imports.append((int(match.group(2)), match.group(4)))
+    total_import_time = sum(cumulative for cumulative, _ in imports) / 1000
+
+    click.echo(f"Process wall time: {wall_time:.1f} ms")
+    click.echo("Total import time: " + click.style(f"{total_import_time:.1f} ms", fg="green"))
+    click.echo("Slowest top-level imports:")
+    for cumulative, module in sorted(imports, reverse=True)[:top]:
+        click.echo(f"\t{cumulative / 1000:8.1f} ms - {module}")
+
+    if budget is not None and total_import_time > budget:
+        click.secho(f"Import time exceeds budget of {budget:.1f} ms!", fg="red", err=True)
+        click.get_current_context().exit(1)
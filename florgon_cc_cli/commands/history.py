@@ -0,0 +1,68 @@
+"""
+    Commands for browsing local history of created urls and pastes.
+"""
+from datetime import datetime
+from typing import Optional
+
+import click
+
+from florgon_cc_cli.services.history import clear_history, find_history_entries
+from florgon_cc_cli.services.paste import build_paste_open_url
+from florgon_cc_cli.services.url import build_open_url
+
+
+@click.group()
+def history():
+    """
+    Local history of created urls and pastes.
+    """
+
+
+@history.command()
+@click.option("-p", "--pastes", is_flag=True, default=False, help="Show pastes instead of urls.")
+@click.option("--prefix", type=str, default=None, help="Show only items with hash prefix.")
+@click.option(
+    "--expired/--active",
+    "expired",
+    default=None,
+    help="Show only expired or only active items. Shows all by default.",
+)
+@click.option(
+    "--with-deleted", is_flag=True, default=False, help="Show items deleted with this CLI."
+)
+@click.option("-n", "--limit", type=click.IntRange(min=1), default=None, help="Max items count.")
+def list(
+    pastes: bool,
+    prefix: Optional[str],
+    expired: Optional[bool],
+    with_deleted: bool,
+    limit: Optional[int],
+):
+    """Prints urls or pastes from local history, newest first."""
+    entries = find_history_entries(
+        "paste" if pastes else "url",
+        prefix=prefix,
+        expired=expired,
+        include_deleted=with_deleted,
+        limit=limit,
+    )
+    for entry in entries:
+        if pastes:
+            line = f"{build_paste_open_url(entry['hash'])} - {entry['text_preview']}..."
+        else:
+            line = f"{build_open_url(entry['hash'])} - {entry['redirect_url']}"
+        line += f" (created at {datetime.fromtimestamp(entry['created_at']):%Y-%m-%d %H:%M})"
+
+        if entry["is_deleted"]:
+            click.secho(line + " (deleted)", fg="bright_black")
+        elif entry["expires_at"] <= datetime.now().timestamp():
+            click.secho(line + " (expired)", fg="red")
+        else:
+            click.echo(line)
+
+
+@history.command()
+def clear():
+    """Deletes all local history for current API host."""
+    deleted = clear_history()
+    click.secho(f"Deleted {deleted} history entries.", fg="green")
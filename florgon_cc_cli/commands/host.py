@@ -9,7 +9,9 @@ from florgon_cc_cli import config
 
 @click.group()
 def host():
-    pass
+    """
+    Work with API host.
+    """
 
 
 @host.command()
@@ -3,23 +3,40 @@
 """
 from io import TextIOWrapper
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import re
 
 import click
 
 from florgon_cc_cli.services.config import get_access_token
+from florgon_cc_cli.services.stats import (
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_WATCH_MAX_INTERVAL,
+    format_views,
+    get_aggregated_stats,
+    print_views,
+    watch_stats,
+)
+from florgon_cc_cli.services.history import mark_deleted_in_history, save_paste_to_history
+from florgon_cc_cli.services.output import OUTPUT_FORMATS, ListWriter
+from florgon_cc_cli.services.prune import delete_by_hashes, read_hashes, select_items_to_prune
 from florgon_cc_cli.services.paste import (
     build_paste_open_url,
     create_paste,
+    create_paste_from_files,
+    find_existing_paste,
+    PasteTextWriter,
+    get_first_line,
     get_pastes_list,
+    iter_pastes_list,
     request_hash_from_pastes_list,
-    get_paste_info_by_hash,
+    stream_paste_by_hash,
     delete_paste_by_hash,
     extract_hash_from_paste_short_url,
     get_paste_stats_by_hash,
     clear_paste_stats_by_hash,
 )
-from florgon_cc_cli.services.files import concat_files
+from florgon_cc_cli.services.files import FileTooLargeError, iter_files_chunks
 
 
 @click.group()
@@ -57,6 +74,12 @@ def paste():
     help="Read paste from file.",
 )
 @click.option("-t", "--text", type=str, help="Paste text.")
+@click.option(
+    "--dedup",
+    is_flag=True,
+    default=False,
+    help="Reuse existing paste with same text, created with this CLI, instead of uploading.",
+)
 def create(
     only_url: bool,
     do_not_save: bool,
@@ -64,6 +87,7 @@ def create(
     burn_after_read: bool,
     text: Optional[str],
     from_files: List[TextIOWrapper],
+    dedup: bool,
 ):
     """Creates paste from text or file."""
     if from_files and text:
@@ -72,31 +96,67 @@ def create(
     if not from_files and not text:
         click.secho("Pass --from-file or --text!", fg="red", err=True)
         return
-    if from_files:
-        text = concat_files(from_files)
-
     access_token = get_access_token()
     if stats_is_public and access_token is None:
         click.secho("Auth required for --stats-is-public flag!", fg="red", err=True)
         return
 
-    success, response = create_paste(
-        text,
-        stats_is_public=stats_is_public,
-        burn_after_read=burn_after_read,
-        access_token=access_token,
-    )
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
-        return
+    existing_paste = None
+    if dedup and not burn_after_read:
+        # Paste that burns after read is never reused, as it must be deleted after reading.
+        try:
+            existing_paste, from_files = find_existing_paste(
+                text, from_files, stats_is_public=stats_is_public, access_token=access_token
+            )
+        except FileTooLargeError as e:
+            click.secho(str(e), fg="red", err=True)
+            return
 
-    short_url = build_paste_open_url(response["hash"])
-    if only_url:
-        click.echo(short_url)
-        return
+    with PasteTextWriter(keep_text=not only_url) as text_writer:
+        if existing_paste is not None:
+            success, response = True, existing_paste
+            if not only_url:
+                for chunk in iter_files_chunks(from_files) if from_files else [text]:
+                    text_writer.write(chunk)
+        elif from_files:
+            try:
+                success, response = create_paste_from_files(
+                    from_files,
+                    stats_is_public=stats_is_public,
+                    burn_after_read=burn_after_read,
+                    access_token=access_token,
+                    write_text=text_writer.write,
+                )
+            except FileTooLargeError as e:
+                click.secho(str(e), fg="red", err=True)
+                return
+        else:
+            success, response = create_paste(
+                text,
+                stats_is_public=stats_is_public,
+                burn_after_read=burn_after_read,
+                access_token=access_token,
+            )
+            if success:
+                text_writer.write(response["text"])
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            return
+        if not do_not_save and existing_paste is None:
+            save_paste_to_history(response, text_writer.digest, text_writer.first_line)
 
-    click.echo("Short url: " + click.style(short_url, fg="green"))
-    click.echo(f"Text: \n{response['text']}")
+        short_url = build_paste_open_url(response["hash"])
+        if only_url:
+            click.echo(short_url)
+            return
+
+        click.echo("Short url: " + click.style(short_url, fg="green"))
+        if existing_paste is not None:
+            click.secho("Paste with same text already exists, it is reused.", fg="bright_yellow")
+        click.echo("Text: ")
+        for chunk in text_writer.iter_text():
+            click.echo(chunk, nl=False)
+        click.echo()
     if response["burn_after_read"]:
         click.secho("This paste will burn after reading!", fg="bright_yellow")
     click.echo(f"Expires at: {datetime.fromtimestamp(response['expires_at'])}")
@@ -108,79 +168,308 @@ def create(
 @click.option(
     "-e", "--exclude-expired", is_flag=True, default=False, help="Do not show expired pastes."
 )
-def list(exclude_expired: bool):
+@click.option(
+    "-l",
+    "--limit",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Max number of printed pastes.",
+)
+@click.option(
+    "-O", "--offset", type=click.IntRange(min=0), default=0, help="Number of pastes to skip."
+)
+@click.option(
+    "-P",
+    "--page-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of pastes requested at once. Defaults to `page_size` config value.",
+)
+@click.option(
+    "-F",
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="table",
+    help="Output format. Use ndjson or csv to process list with other tools.",
+)
+def list(
+    exclude_expired: bool,
+    limit: Optional[int],
+    offset: int,
+    page_size: Optional[int],
+    output_format: str,
+):
     """Prints a list of your pastes. Auth expired."""
-    success, response = get_pastes_list(access_token=get_access_token())
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
-        return
-
-    click.echo("Your pastes:")
-    for paste in response:
-        # NOTE: This is temporary solution. Should be moved to cc-api.
-        if paste["is_expired"] and exclude_expired:
-            continue
-
-        text_preview = paste["text"].split("\n")[0][:50] + "..."
-        if paste["is_expired"]:
-            click.secho(
-                f"{build_paste_open_url(paste['hash'])} - {text_preview} (expired)", fg="red"
+    writer = ListWriter(
+        output_format,
+        (
+            "hash",
+            "short_url",
+            "text_preview",
+            "expires_at",
+            "is_expired",
+            "stats_is_public",
+            "burn_after_read",
+        ),
+        lambda row: f"{row['short_url']} - {row['text_preview'][:50]}..."
+        + (" (expired)" if row["is_expired"] else ""),
+        get_color=lambda row: "red" if row["is_expired"] else None,
+        title="Your pastes:",
+    )
+    # Rows of consumed page are shown while next page is requested.
+    pastes = iter_pastes_list(
+        access_token=get_access_token(),
+        offset=offset,
+        limit=limit,
+        page_size=page_size,
+        exclude_expired=exclude_expired,
+        on_page_end=writer.flush,
+    )
+    with writer:
+        for paste in pastes:
+            writer.write(
+                {
+                    **paste,
+                    "short_url": build_paste_open_url(paste["hash"]),
+                    "text_preview": get_first_line(paste["text"]),
+                }
             )
-        else:
-            click.echo(f"{build_paste_open_url(paste['hash'])} - {text_preview}")
 
 
 @paste.command()
 @click.option("-s", "--short_url", type=str, help="Short url.")
+@click.option(
+    "-H",
+    "--from-history",
+    is_flag=True,
+    default=False,
+    help="Choose paste from local history instead of requesting list of your pastes.",
+)
 @click.option("-o", "--only-text", is_flag=True, default=False, help="Prints only paste text.")
-def read(short_url, only_text):
+@click.option(
+    "-O",
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default=None,
+    help="Write paste text to file as it is downloaded. Pass '-' to write only text to stdout.",
+)
+def read(short_url, only_text, from_history: bool, output: Optional[str]):
     """Prints text and info about paste."""
     if short_url:
         short_url_hash = extract_hash_from_paste_short_url(short_url)
     else:
-        click.echo("Short url is not specified, requesting for list of your pastes.")
-        short_url_hash = request_hash_from_pastes_list(access_token=get_access_token())
+        click.echo(
+            "Short url is not specified, requesting for list of your pastes.", err=output == "-"
+        )
+        short_url_hash = request_hash_from_pastes_list(
+            access_token=get_access_token(), from_history=from_history
+        )
 
-    success, response = get_paste_info_by_hash(short_url_hash)
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
-        return
-    if only_text:
-        click.echo("Text:\n" + response["text"].replace("\\n", "\n"))
+    if output is not None:
+        # File is opened lazily, so it is not created if request fails.
+        with click.open_file(output, "w", lazy=True) as output_file:
+            success, response = stream_paste_by_hash(
+                short_url_hash, lambda text: output_file.write(text)
+            )
+            if success:
+                # Text of empty paste is never written, so file is created explicitly.
+                output_file.open()
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            click.get_current_context().exit(1)
+        if output != "-":
+            click.echo("Paste text is written to " + click.style(output, fg="green"))
         return
-    click.echo(f"Expires at: {datetime.fromtimestamp(response['expires_at'])}")
-    if response["stats_is_public"]:
-        click.echo("Stats is public")
-    if response["burn_after_read"]:
-        click.secho("This paste will burn after reading!", fg="bright_yellow")
-    click.echo("Text:\n" + response["text"].replace("\\n", "\n"))
+
+    with PasteTextWriter() as text_writer:
+        success, response = stream_paste_by_hash(short_url_hash, text_writer.write)
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            return
+        if not only_text:
+            click.echo(f"Expires at: {datetime.fromtimestamp(response['expires_at'])}")
+            if response["stats_is_public"]:
+                click.echo("Stats is public")
+            if response["burn_after_read"]:
+                click.secho("This paste will burn after reading!", fg="bright_yellow")
+        click.echo("Text:")
+        for chunk in text_writer.iter_text():
+            click.echo(chunk, nl=False)
+        click.echo()
 
 
 @paste.command()
-@click.option("-s", "--short-url", type=str, help="Short url.")
-def delete(short_url: str):
+@click.option(
+    "-s", "--short-url", "short_urls", type=str, multiple=True, help="Short url. Can be repeated."
+)
+@click.option(
+    "-f",
+    "--from-file",
+    type=click.File("r"),
+    default=None,
+    help="Read short urls or hashes from file, one per line. Pass '-' to read from stdin.",
+)
+@click.option(
+    "-H",
+    "--from-history",
+    is_flag=True,
+    default=False,
+    help="Choose paste from local history instead of requesting list of your pastes.",
+)
+@click.option(
+    "-n", "--dry-run", is_flag=True, default=False, help="Only print pastes that would be deleted."
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests. Defaults to connection pool size.",
+)
+def delete(
+    short_urls: Tuple[str, ...],
+    from_file: Optional[TextIOWrapper],
+    from_history: bool,
+    dry_run: bool,
+    workers: Optional[int],
+):
     """
-    Deletes paste. Auth Required.
+    Deletes pastes. Auth Required.
     """
-    if short_url:
-        short_url_hash = extract_hash_from_paste_short_url(short_url)
+    access_token = get_access_token()
+    if short_urls or from_file:
+        hashes = read_hashes(short_urls, extract_hash_from_paste_short_url, from_file)
     else:
         click.echo("Short url is not specified, requesting for list of your pastes.")
-        short_url_hash = request_hash_from_pastes_list(access_token=get_access_token())
+        hashes = [
+            request_hash_from_pastes_list(access_token=access_token, from_history=from_history)
+        ]
+
+    if len(hashes) > 1 or dry_run:
+        failed = delete_by_hashes(
+            "paste",
+            hashes,
+            delete_paste_by_hash,
+            build_paste_open_url,
+            access_token=access_token,
+            workers=workers,
+            dry_run=dry_run,
+        )
+        if failed:
+            click.get_current_context().exit(1)
+        return
 
     success, *response = delete_paste_by_hash(
-        hash=short_url_hash,
-        access_token=get_access_token(),
+        hash=hashes[0],
+        access_token=access_token,
     )
     if not success:
         click.secho(response[0]["message"], err=True, fg="red")
         return
     else:
+        mark_deleted_in_history("paste", hashes[0])
         click.secho("Paste was successfully deleted!", fg="green")
 
 
 @paste.command()
-@click.option("-s", "--short-url", type=str, help="Short url.")
+@click.option("-e", "--expired", is_flag=True, default=False, help="Select expired pastes.")
+@click.option(
+    "-b",
+    "--expires-before",
+    type=click.DateTime(),
+    default=None,
+    help="Select pastes that expire before this date.",
+)
+@click.option(
+    "-m",
+    "--match",
+    "pattern",
+    type=str,
+    default=None,
+    help="Select pastes which text matches regular expression.",
+)
+@click.option(
+    "-n", "--dry-run", is_flag=True, default=False, help="Only print pastes that would be deleted."
+)
+@click.option("-y", "--yes", is_flag=True, default=False, help="Do not ask for confirmation.")
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests. Defaults to connection pool size.",
+)
+def prune(
+    expired: bool,
+    expires_before: Optional[datetime],
+    pattern: Optional[str],
+    dry_run: bool,
+    yes: bool,
+    workers: Optional[int],
+):
+    """
+    Deletes all your pastes that match every passed condition. Auth required.
+    """
+    if not expired and expires_before is None and pattern is None:
+        click.secho(
+            "Pass at least one of --expired, --expires-before or --match!", fg="red", err=True
+        )
+        return
+    try:
+        compiled_pattern = re.compile(pattern) if pattern is not None else None
+    except re.error as e:
+        click.secho(f"Invalid --match regular expression: {e}", fg="red", err=True)
+        return
+
+    access_token = get_access_token()
+    success, response = get_pastes_list(access_token=access_token)
+    if not success:
+        click.secho(response["message"], err=True, fg="red")
+        return
+
+    pastes = select_items_to_prune(
+        response,
+        field="text",
+        expired=expired,
+        expires_before=expires_before,
+        pattern=compiled_pattern,
+    )
+    if not pastes:
+        click.echo("No pastes match passed conditions.")
+        return
+    if not dry_run and not yes:
+        click.confirm(f"Delete {len(pastes)} pastes?", abort=True)
+
+    failed = delete_by_hashes(
+        "paste",
+        (paste["hash"] for paste in pastes),
+        delete_paste_by_hash,
+        build_paste_open_url,
+        access_token=access_token,
+        workers=workers,
+        dry_run=dry_run,
+    )
+    if failed:
+        click.get_current_context().exit(1)
+
+
+@paste.command()
+@click.option(
+    "-s",
+    "--short-url",
+    "short_urls",
+    type=str,
+    multiple=True,
+    help="Short url. Can be repeated.",
+)
+@click.option(
+    "-H",
+    "--from-history",
+    is_flag=True,
+    default=False,
+    help="Choose paste from local history instead of requesting list of your pastes.",
+)
 @click.option(
     "-r",
     "--referers-as",
@@ -195,57 +484,148 @@ def delete(short_url: str):
     default="percent",
     help="Paste views dates as.",
 )
-def stats(short_url: str, referers_as: str, dates_as: str):
+@click.option(
+    "-A",
+    "--all",
+    "all_pastes",
+    is_flag=True,
+    default=False,
+    help="Print stats of all your pastes together. Auth required.",
+)
+@click.option(
+    "-n",
+    "--top",
+    type=click.IntRange(min=1),
+    default=10,
+    help="Number of top referers to print with --all.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests with --all. Defaults to connection pool size.",
+)
+@click.option(
+    "-W",
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="Poll stats until interrupted, redrawing only changed lines.",
+)
+@click.option(
+    "-i",
+    "--interval",
+    type=click.FloatRange(min=0.1),
+    default=DEFAULT_WATCH_INTERVAL,
+    help="Min polling interval with --watch in seconds, doubled while stats are not changed.",
+)
+@click.option(
+    "-I",
+    "--max-interval",
+    type=click.FloatRange(min=0.1),
+    default=DEFAULT_WATCH_MAX_INTERVAL,
+    help="Max polling interval with --watch in seconds.",
+)
+def stats(
+    short_urls: Tuple[str, ...],
+    referers_as: str,
+    dates_as: str,
+    from_history: bool,
+    all_pastes: bool,
+    top: int,
+    workers: Optional[int],
+    watch: bool,
+    interval: float,
+    max_interval: float,
+):
     """Prints paste views statistics."""
-    if short_url:
-        paste_hash = extract_hash_from_paste_short_url(short_url)
+    access_token = get_access_token()
+    if all_pastes and watch:
+        click.secho("Pass --all or --watch, but not both!", fg="red", err=True)
+        return
+    if interval > max_interval:
+        click.secho("--interval must not be greater than --max-interval!", fg="red", err=True)
+        click.get_current_context().exit(1)
+    if all_pastes:
+        success, response = get_pastes_list(access_token=access_token)
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            return
+
+        views, errors = get_aggregated_stats(
+            (paste["hash"] for paste in response),
+            get_paste_stats_by_hash,
+            access_token=access_token,
+            workers=workers,
+        )
+        for hash, message in errors.items():
+            click.secho(f"{hash} - {message}", err=True, fg="red")
+        click.echo(f"Pastes: {len(response) - len(errors)}")
+        print_views(format_views(views, referers_as, dates_as, top), referers_as, dates_as)
+        return
+
+    if short_urls:
+        hashes = [extract_hash_from_paste_short_url(short_url) for short_url in short_urls]
     else:
         click.echo("Short url is not specified, requesting for list of your pastes.")
-        paste_hash = request_hash_from_pastes_list(access_token=get_access_token())
+        hashes = [
+            request_hash_from_pastes_list(access_token=access_token, from_history=from_history)
+        ]
 
-    success, response = get_paste_stats_by_hash(
-        paste_hash,
-        url_views_by_referers_as=referers_as,
-        url_views_by_dates_as=dates_as,
-        access_token=get_access_token(),
-    )
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
+    if watch:
+        watch_stats(
+            hashes,
+            get_paste_stats_by_hash,
+            build_paste_open_url,
+            referers_as=referers_as,
+            dates_as=dates_as,
+            access_token=access_token,
+            interval=interval,
+            max_interval=max_interval,
+        )
         return
 
-    click.echo("Total views: " + click.style(response["total"], fg="green"))
-    if response.get("by_referers"):
-        click.echo("Views by referers:")
-        for referer in response["by_referers"]:
-            click.echo(
-                f"\t{referer} - {response['by_referers'][referer]}"
-                + "%" * int(referers_as == "percent")
-            )
+    for paste_hash in hashes:
+        success, response = get_paste_stats_by_hash(
+            paste_hash,
+            url_views_by_referers_as=referers_as,
+            url_views_by_dates_as=dates_as,
+            access_token=access_token,
+        )
+        if len(hashes) > 1:
+            click.echo(build_paste_open_url(paste_hash))
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            continue
 
-    if response.get("by_dates"):
-        click.echo("Views by dates:")
-        for date in response["by_dates"]:
-            click.echo(
-                f"\t{date} - {response['by_dates'][date]}" + "%" * int(dates_as == "percent")
-            )
+        print_views(response, referers_as, dates_as)
 
 
 @paste.command()
 @click.option("-s", "--short-url", type=str, help="Short url.")
-def clear_stats(short_url: str):
+@click.option(
+    "-H",
+    "--from-history",
+    is_flag=True,
+    default=False,
+    help="Choose paste from local history instead of requesting list of your pastes.",
+)
+def clear_stats(short_url: str, from_history: bool):
     """
     Clears paste stats. Auth required.
     If short url is not passed, you can choose it from your pastes interactively.
     """
+    access_token = get_access_token()
     if short_url:
         short_url_hash = extract_hash_from_paste_short_url(short_url)
     else:
         click.echo("Short url is not specified, requesting for list of your pastes.")
-        short_url_hash = request_hash_from_pastes_list(access_token=get_access_token())
+        short_url_hash = request_hash_from_pastes_list(
+            access_token=access_token, from_history=from_history
+        )
 
-    success, *response = clear_paste_stats_by_hash(
-        hash=short_url_hash, access_token=get_access_token()
-    )
+    success, *response = clear_paste_stats_by_hash(hash=short_url_hash, access_token=access_token)
     if not success:
         click.secho(response[0]["message"], err=True, fg="red")
         return
@@ -0,0 +1,94 @@
+"""
+    Interactive shell, that runs commands in one process.
+"""
+from typing import List
+import shlex
+
+import click
+
+from florgon_cc_cli import config
+
+HISTORY_FILE = config.CONFIG_DIR / "shell_history"
+HISTORY_LENGTH = 1000
+EXIT_COMMANDS = ("exit", "quit")
+
+
+@click.command()
+def shell():
+    """
+    Interactive shell, that runs commands like `url list` or `paste info -s ...` one after another.
+    Config, connections to API and fetched lists of urls and pastes are kept between commands.
+    Type `exit` or press Ctrl+D to exit.
+    """
+    from florgon_cc_cli.main import main
+
+    _load_history()
+    try:
+        while True:
+            try:
+                line = input("florgon-cc> ")
+            except KeyboardInterrupt:
+                click.echo()
+                continue
+            except EOFError:
+                click.echo()
+                break
+
+            try:
+                args = _parse_line(line)
+            except ValueError as e:
+                click.secho(f"Unable to parse command: {e}", fg="red", err=True)
+                continue
+            if not args:
+                continue
+            if args[0] in EXIT_COMMANDS:
+                break
+            if args[0] == "shell":
+                click.secho("Already in shell!", fg="red", err=True)
+                continue
+
+            try:
+                main(args, prog_name="florgon-cc")
+            except SystemExit as e:
+                # Commands exit with code, like in standalone mode, errors are already printed.
+                if e.code and not isinstance(e.code, int):
+                    click.secho(str(e.code), fg="red", err=True)
+            except KeyboardInterrupt:
+                click.echo()
+            except Exception as e:
+                # Shell must not be ended by failed command, like daemon.
+                click.secho(f"Error: {e!r}", fg="red", err=True)
+    finally:
+        _save_history()
+
+
+def _parse_line(line: str) -> List[str]:
+    """Splits command line like shell, `florgon-cc` prefix is optional."""
+    args = shlex.split(line, comments=True)
+    return args[1:] if args[:1] == ["florgon-cc"] else args
+
+
+def _load_history() -> None:
+    """Enables line editing and loads history of commands, if readline is available."""
+    try:
+        import readline
+    except ImportError:
+        return
+    readline.set_history_length(HISTORY_LENGTH)
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+
+
+def _save_history() -> None:
+    """Saves history of commands, if readline is available."""
+    try:
+        import readline
+    except ImportError:
+        return
+    try:
+        config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        readline.write_history_file(HISTORY_FILE)
+    except OSError:
+        pass
@@ -0,0 +1,248 @@
+"""
+    Stats snapshots commands.
+"""
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import click
+
+from florgon_cc_cli.models.stats import Views
+from florgon_cc_cli.services.concurrency import map_concurrently
+from florgon_cc_cli.services.config import get_access_token
+from florgon_cc_cli.services.output import OUTPUT_FORMATS, ListWriter
+from florgon_cc_cli.services.paste import (
+    build_paste_open_url,
+    get_paste_stats_by_hash,
+    iter_pastes_list,
+)
+from florgon_cc_cli.services.snapshots import (
+    query_top_links,
+    query_top_referers,
+    query_views_by_period,
+    save_stats_snapshot,
+)
+from florgon_cc_cli.services.url import build_open_url, get_url_stats_by_hash, iter_urls_list
+
+KINDS = ("url", "paste")
+
+
+@click.group()
+def stats():
+    """
+    Local store of stats snapshots and queries over it.
+    Take snapshots regularly (e.g. with cron), then query views trends without requesting API.
+    """
+
+
+@stats.command()
+@click.option(
+    "-k",
+    "--kind",
+    type=click.Choice(KINDS),
+    default=None,
+    help="Take snapshot only of urls or only of pastes. Both by default.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests. Defaults to connection pool size.",
+)
+def snapshot(kind: Optional[str], workers: Optional[int]):
+    """
+    Requests stats of all your urls and pastes and stores values, that are changed
+    since last snapshot. Auth required.
+    """
+    access_token = get_access_token()
+    if access_token is None:
+        click.secho("Auth required to take snapshot of stats!", fg="red", err=True)
+        click.get_current_context().exit(1)
+
+    sources: Dict[str, Tuple[Callable[..., Iterator], Callable]] = {
+        "url": (iter_urls_list, get_url_stats_by_hash),
+        "paste": (iter_pastes_list, get_paste_stats_by_hash),
+    }
+    failed = 0
+    for source_kind, (iter_list, get_stats_by_hash) in sources.items():
+        if kind is not None and kind != source_kind:
+            continue
+        views_by_hash, source_failed = _request_views(
+            (item["hash"] for item in iter_list(access_token=access_token)),
+            get_stats_by_hash,
+            access_token=access_token,
+            workers=workers,
+        )
+        failed += source_failed
+        stored = save_stats_snapshot(source_kind, views_by_hash)
+        click.echo(
+            f"{source_kind.capitalize()}s: {len(views_by_hash)}, stored values: "
+            + click.style(str(stored), fg="green")
+        )
+    if failed:
+        click.secho(f"Failed to request stats of {failed} links!", fg="red", err=True)
+        click.get_current_context().exit(1)
+
+
+@stats.command()
+@click.option(
+    "-b",
+    "--by",
+    type=click.Choice(["period", "link", "referer"]),
+    default="period",
+    help="Group views by period (see --group-by), by link or by referer.",
+)
+@click.option(
+    "-g",
+    "--group-by",
+    type=click.Choice(["day", "week", "month"]),
+    default="day",
+    help="Period to group views by with `--by period`. Weeks start on Monday.",
+)
+@click.option(
+    "-k",
+    "--kind",
+    type=click.Choice(KINDS),
+    default=None,
+    help="Query only urls or only pastes. Both by default.",
+)
+@click.option(
+    "-H",
+    "--hash",
+    "hashes",
+    type=str,
+    multiple=True,
+    help="Query only link with this hash. Can be repeated.",
+)
+@click.option(
+    "-f",
+    "--from",
+    "since",
+    type=click.DateTime(["%Y-%m-%d"]),
+    default=None,
+    help="First day of range. Not supported with `--by referer`.",
+)
+@click.option(
+    "-t",
+    "--to",
+    "until",
+    type=click.DateTime(["%Y-%m-%d"]),
+    default=None,
+    help="Last day of range. With `--by referer` views are taken from last snapshot before it.",
+)
+@click.option(
+    "-n",
+    "--top",
+    type=click.IntRange(min=1),
+    default=10,
+    help="Number of printed links or referers.",
+)
+@click.option(
+    "-F",
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="table",
+    help="Output format. Use ndjson or csv to process result with other tools.",
+)
+def query(
+    by: str,
+    group_by: str,
+    kind: Optional[str],
+    hashes: Tuple[str, ...],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    top: int,
+    output_format: str,
+):
+    """
+    Prints views from local snapshots (see `stats snapshot`), no requests to API are made.
+    """
+    filters = {
+        "kind": kind,
+        "hashes": hashes,
+        "until": until.date() if until is not None else None,
+    }
+    if by == "referer":
+        if since is not None:
+            click.secho(
+                "--from is not supported with --by referer, views are cumulative!",
+                fg="red",
+                err=True,
+            )
+            click.get_current_context().exit(1)
+        writer = ListWriter(
+            output_format,
+            ("referer", "views"),
+            lambda row: f"{row['referer'] or 'No referer'} - {row['views']}",
+            title="Top referers:",
+        )
+        with writer:
+            for referer, views in query_top_referers(top, **filters):
+                writer.write({"referer": referer, "views": views})
+        return
+
+    filters["since"] = since.date() if since is not None else None
+    if by == "link":
+        writer = ListWriter(
+            output_format,
+            ("kind", "hash", "short_url", "views"),
+            lambda row: f"{row['short_url']} - {row['views']}",
+            title="Top links:",
+        )
+        with writer:
+            for link_kind, hash, views in query_top_links(top, **filters):
+                short_url = (
+                    build_open_url(hash) if link_kind == "url" else build_paste_open_url(hash)
+                )
+                writer.write(
+                    {"kind": link_kind, "hash": hash, "short_url": short_url, "views": views}
+                )
+        return
+
+    writer = ListWriter(
+        output_format,
+        ("period", "views"),
+        lambda row: f"{row['period']} - {row['views']}",
+        title=f"Views by {group_by}:",
+    )
+    with writer:
+        for period, views in query_views_by_period(group_by, **filters):
+            writer.write({"period": period, "views": views})
+
+
+def _request_views(
+    hashes: Iterator[str],
+    get_stats_by_hash: Callable,
+    *,
+    access_token: str,
+    workers: Optional[int],
+) -> Tuple[List[Tuple[str, Views]], int]:
+    """
+    Requests stats (as numbers) concurrently, errors are printed.
+    Returns views by hash and number of failed requests.
+    """
+    results = map_concurrently(
+        lambda hash: get_stats_by_hash(
+            hash,
+            url_views_by_referers_as="number",
+            url_views_by_dates_as="number",
+            access_token=access_token,
+        ),
+        hashes,
+        workers,
+    )
+    views_by_hash = []
+    failed = 0
+    for hash, result in results:
+        if isinstance(result, Exception):
+            click.secho(f"{hash} - {str(result) or 'Unable to request stats!'}", fg="red", err=True)
+            failed += 1
+            continue
+        success, views = result
+        if not success:
+            click.secho(f"{hash} - {views['message']}", fg="red", err=True)
+            failed += 1
+            continue
+        views_by_hash.append((hash, views))
+    return views_by_hash, failed
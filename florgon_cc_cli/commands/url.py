@@ -2,17 +2,37 @@
     Single url commands.
 """
 from datetime import datetime
+from io import TextIOWrapper
+from typing import Optional, Tuple, Union
+import re
 
 import click
 
-from florgon_cc_cli.services.config import get_value_from_config, get_access_token
+from florgon_cc_cli.models.error import Error
+from florgon_cc_cli.models.url import Url
+from florgon_cc_cli.services.concurrency import map_concurrently
+from florgon_cc_cli.services.config import get_access_token
+from florgon_cc_cli.services.stats import (
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_WATCH_MAX_INTERVAL,
+    format_views,
+    get_aggregated_stats,
+    print_views,
+    watch_stats,
+)
+from florgon_cc_cli.services.history import mark_deleted_in_history, save_url_to_history
+from florgon_cc_cli.services.index import find_url_in_index, prune_url_info_cache
+from florgon_cc_cli.services.output import OUTPUT_FORMATS, ListWriter
+from florgon_cc_cli.services.prune import delete_by_hashes, read_hashes, select_items_to_prune
 from florgon_cc_cli.services.url import (
     build_open_url,
     create_url,
     extract_hash_from_short_url,
+    match_short_url_hash,
     get_url_info_by_hash,
     get_url_stats_by_hash,
     get_urls_list,
+    iter_urls_list,
     request_hash_from_urls_list,
     delete_url_by_hash,
     clear_url_stats_by_hash,
@@ -36,21 +56,112 @@ def url():
     default=False,
     help="Make url stats public. Auth required.",
 )
-@click.argument("long_url", type=str)
-def create(only_url: bool, do_not_save: bool, long_url: str, stats_is_public: bool):
-    """Creates short url."""
+@click.option(
+    "-f",
+    "--from-file",
+    type=click.File("r"),
+    default=None,
+    help="Read long urls from file, one per line. Pass '-' to read from stdin.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests with --from-file. Defaults to connection pool size.",
+)
+@click.option(
+    "-r",
+    "--reuse",
+    is_flag=True,
+    default=False,
+    help="Reuse existing short url for same long url, created with this CLI, without request.",
+)
+@click.argument("long_url", type=str, required=False)
+def create(
+    only_url: bool,
+    do_not_save: bool,
+    long_url: Optional[str],
+    stats_is_public: bool,
+    from_file: Optional[TextIOWrapper],
+    workers: Optional[int],
+    reuse: bool,
+):
+    """Creates short url from LONG_URL or from each line of file."""
+    if from_file and long_url:
+        click.secho("Pass LONG_URL or --from-file, but not both!", fg="red", err=True)
+        return
+    if not from_file and not long_url:
+        click.secho("Pass LONG_URL or --from-file!", fg="red", err=True)
+        return
+
     access_token = get_access_token()
     if stats_is_public and access_token is None:
         click.secho("Auth required for --stats-is-public flag!", fg="red", err=True)
         return
 
+    if long_url:
+        success, response, is_reused = _create_or_reuse_url(
+            long_url, stats_is_public=stats_is_public, access_token=access_token, reuse=reuse
+        )
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            return
+        if not do_not_save and not is_reused:
+            save_url_to_history(response)
+        _print_created_url(response, only_url)
+        return
+
+    long_urls = (line.strip() for line in from_file)
+    results = map_concurrently(
+        lambda long_url: _create_or_reuse_url(
+            long_url, stats_is_public=stats_is_public, access_token=access_token, reuse=reuse
+        ),
+        (long_url for long_url in long_urls if long_url),
+        workers,
+    )
+    failed = 0
+    for long_url, result in results:
+        if isinstance(result, Exception):
+            failed += 1
+            # Exit means that error was already printed by API services.
+            if not isinstance(result, click.exceptions.Exit):
+                click.secho(f"{long_url} - {result}", err=True, fg="red")
+            continue
+        success, response, is_reused = result
+        if not success:
+            failed += 1
+            click.secho(f"{long_url} - {response['message']}", err=True, fg="red")
+            continue
+        if not do_not_save and not is_reused:
+            save_url_to_history(response)
+        _print_created_url(response, only_url)
+        if not only_url:
+            click.echo()
+
+    if failed:
+        click.secho(f"Failed to create {failed} urls!", err=True, fg="red")
+        click.get_current_context().exit(1)
+
+
+def _create_or_reuse_url(
+    long_url: str, *, stats_is_public: bool, access_token: Optional[str], reuse: bool
+) -> Tuple[bool, Union[Url, Error], bool]:
+    """
+    Creates url, or returns existing url from local index without request if reuse is True.
+    Third element of result is True if url is reused.
+    """
+    existing_url = find_url_in_index(long_url, stats_is_public, access_token) if reuse else None
+    if existing_url is not None:
+        return True, existing_url, True
     success, response = create_url(
         long_url, stats_is_public=stats_is_public, access_token=access_token
     )
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
-        return
+    return success, response, False
+
 
+def _print_created_url(response: Url, only_url: bool) -> None:
+    """Prints created short url."""
     short_url = build_open_url(response["hash"])
     if only_url:
         click.echo(short_url)
@@ -65,29 +176,129 @@ def create(only_url: bool, do_not_save: bool, long_url: str, stats_is_public: bo
 
 
 @url.command()
-@click.option("-s", "--short-url", type=str, help="Short url.")
-def info(short_url: str):
-    """Prints main information about short url."""
-    if short_url:
-        short_url_hash = extract_hash_from_short_url(short_url)
-    else:
-        click.echo("Short url is not specified, requesting for list of your urls.")
-        short_url_hash = request_hash_from_urls_list()
+@click.option(
+    "-s",
+    "--short-url",
+    "short_url_options",
+    type=str,
+    multiple=True,
+    help="Short url or hash. Can be repeated.",
+)
+@click.option(
+    "-f",
+    "--from-file",
+    type=click.File("r"),
+    default=None,
+    help="Read short urls or hashes from file, one per line. Pass '-' to read from stdin.",
+)
+@click.option(
+    "-H",
+    "--from-history",
+    is_flag=True,
+    default=False,
+    help="Choose url from local history instead of requesting list of your urls.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests for many urls. Defaults to connection pool size.",
+)
+@click.option(
+    "-F",
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="table",
+    help="Output format for many urls. Use ndjson or csv to process them with other tools.",
+)
+@click.argument("short_urls", type=str, nargs=-1)
+def info(
+    short_url_options: Tuple[str, ...],
+    from_file: Optional[TextIOWrapper],
+    from_history: bool,
+    workers: Optional[int],
+    output_format: str,
+    short_urls: Tuple[str, ...],
+):
+    """
+    Prints main information about short url, or about every of SHORT_URLS (or hashes).
+    """
+    prune_url_info_cache()
+    short_urls = short_url_options + short_urls
+    if from_file is None and len(short_urls) <= 1:
+        if short_urls:
+            short_url_hash = extract_hash_from_short_url(short_urls[0])
+        else:
+            click.echo("Short url is not specified, requesting for list of your urls.")
+            short_url_hash = request_hash_from_urls_list(from_history=from_history)
 
-    success, response = get_url_info_by_hash(short_url_hash)
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
+        success, response = get_url_info_by_hash(short_url_hash)
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            return
+
+        click.echo("Redirects to: " + click.style(response["redirect_url"], fg="green"))
+        click.echo(f"Expires at: {datetime.fromtimestamp(response['expires_at'])}")
+        click.echo(f"QR Code url: {response['_links']['qr']['href']}")
+        if response["stats_is_public"]:
+            click.echo("Stats is public")
         return
 
-    click.echo("Redirects to: " + click.style(response["redirect_url"], fg="green"))
-    click.echo(f"Expires at: {datetime.fromtimestamp(response['expires_at'])}")
-    click.echo(f"QR Code url: {response['_links']['qr']['href']}")
-    if response["stats_is_public"]:
-        click.echo("Stats is public")
+    values = [*short_urls, *(line.strip() for line in from_file or () if line.strip())]
+    failed = 0
+    hashes = {}
+    for value in values:
+        hash = match_short_url_hash(value)
+        if hash is None:
+            failed += 1
+            click.secho(f"{value} - short url is invalid!", err=True, fg="red")
+            continue
+        hashes[hash] = None
+
+    results = map_concurrently(get_url_info_by_hash, hashes, workers)
+    writer = ListWriter(
+        output_format,
+        ("hash", "short_url", "redirect_url", "expires_at", "is_expired", "stats_is_public"),
+        lambda row: f"{row['short_url']} - {row['redirect_url']}",
+    )
+    with writer:
+        for hash, result in results:
+            if isinstance(result, Exception):
+                failed += 1
+                # Exit means that error was already printed by API services.
+                if not isinstance(result, click.exceptions.Exit):
+                    click.secho(f"{build_open_url(hash)} - {result}", err=True, fg="red")
+                continue
+            success, response = result
+            if not success:
+                failed += 1
+                click.secho(f"{build_open_url(hash)} - {response['message']}", err=True, fg="red")
+                continue
+            writer.write({**response, "short_url": build_open_url(hash)})
+
+    if failed:
+        click.secho(f"Failed to get info about {failed} urls!", err=True, fg="red")
+        click.get_current_context().exit(1)
 
 
 @url.command()
-@click.option("-s", "--short-url", type=str, help="Short url.")
+@click.option(
+    "-s",
+    "--short-url",
+    "short_urls",
+    type=str,
+    multiple=True,
+    help="Short url. Can be repeated.",
+)
+@click.option(
+    "-H",
+    "--from-history",
+    is_flag=True,
+    default=False,
+    help="Choose url from local history instead of requesting list of your urls.",
+)
 @click.option(
     "-r",
     "--referers-as",
@@ -102,87 +313,336 @@ def info(short_url: str):
     default="percent",
     help="Url views dates as.",
 )
-def stats(short_url: str, referers_as: str, dates_as: str):
+@click.option(
+    "-A",
+    "--all",
+    "all_urls",
+    is_flag=True,
+    default=False,
+    help="Print stats of all your urls together. Auth required.",
+)
+@click.option(
+    "-n",
+    "--top",
+    type=click.IntRange(min=1),
+    default=10,
+    help="Number of top referers to print with --all.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests with --all. Defaults to connection pool size.",
+)
+@click.option(
+    "-W",
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="Poll stats until interrupted, redrawing only changed lines.",
+)
+@click.option(
+    "-i",
+    "--interval",
+    type=click.FloatRange(min=0.1),
+    default=DEFAULT_WATCH_INTERVAL,
+    help="Min polling interval with --watch in seconds, doubled while stats are not changed.",
+)
+@click.option(
+    "-I",
+    "--max-interval",
+    type=click.FloatRange(min=0.1),
+    default=DEFAULT_WATCH_MAX_INTERVAL,
+    help="Max polling interval with --watch in seconds.",
+)
+def stats(
+    short_urls: Tuple[str, ...],
+    referers_as: str,
+    dates_as: str,
+    from_history: bool,
+    all_urls: bool,
+    top: int,
+    workers: Optional[int],
+    watch: bool,
+    interval: float,
+    max_interval: float,
+):
     """Prints url views statistics."""
-    if short_url:
-        short_url_hash = extract_hash_from_short_url(short_url)
+    access_token = get_access_token()
+    if all_urls and watch:
+        click.secho("Pass --all or --watch, but not both!", fg="red", err=True)
+        return
+    if interval > max_interval:
+        click.secho("--interval must not be greater than --max-interval!", fg="red", err=True)
+        click.get_current_context().exit(1)
+    if all_urls:
+        success, response = get_urls_list(access_token=access_token)
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            return
+
+        views, errors = get_aggregated_stats(
+            (url["hash"] for url in response),
+            get_url_stats_by_hash,
+            access_token=access_token,
+            workers=workers,
+        )
+        for hash, message in errors.items():
+            click.secho(f"{hash} - {message}", err=True, fg="red")
+        click.echo(f"Urls: {len(response) - len(errors)}")
+        print_views(format_views(views, referers_as, dates_as, top), referers_as, dates_as)
+        return
+
+    if short_urls:
+        hashes = [extract_hash_from_short_url(short_url) for short_url in short_urls]
     else:
         click.echo("Short url is not specified, requesting for list of your urls.")
-        short_url_hash = request_hash_from_urls_list()
+        hashes = [request_hash_from_urls_list(from_history=from_history)]
 
-    success, response = get_url_stats_by_hash(
-        short_url_hash,
-        url_views_by_referers_as=referers_as,
-        url_views_by_dates_as=dates_as,
-        access_token=get_access_token(),
-    )
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
+    if watch:
+        watch_stats(
+            hashes,
+            get_url_stats_by_hash,
+            build_open_url,
+            referers_as=referers_as,
+            dates_as=dates_as,
+            access_token=access_token,
+            interval=interval,
+            max_interval=max_interval,
+        )
         return
 
-    click.echo("Total views: " + click.style(response["total"], fg="green"))
-    if response.get("by_referers"):
-        click.echo("Views by referers:")
-        for referer in response["by_referers"]:
-            click.echo(
-                f"\t{referer} - {response['by_referers'][referer]}"
-                + "%" * int(referers_as == "percent")
-            )
+    for short_url_hash in hashes:
+        success, response = get_url_stats_by_hash(
+            short_url_hash,
+            url_views_by_referers_as=referers_as,
+            url_views_by_dates_as=dates_as,
+            access_token=access_token,
+        )
+        if len(hashes) > 1:
+            click.echo(build_open_url(short_url_hash))
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            continue
 
-    if response.get("by_dates"):
-        click.echo("Views by dates:")
-        for date in response["by_dates"]:
-            click.echo(
-                f"\t{date} - {response['by_dates'][date]}" + "%" * int(dates_as == "percent")
-            )
+        print_views(response, referers_as, dates_as)
 
 
 @url.command()
-def list():
+@click.option(
+    "-l",
+    "--limit",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Max number of printed urls.",
+)
+@click.option(
+    "-O", "--offset", type=click.IntRange(min=0), default=0, help="Number of urls to skip."
+)
+@click.option(
+    "-P",
+    "--page-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of urls requested at once. Defaults to `page_size` config value.",
+)
+@click.option(
+    "-F",
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="table",
+    help="Output format. Use ndjson or csv to process list with other tools.",
+)
+def list(limit: Optional[int], offset: int, page_size: Optional[int], output_format: str):
     """
     Prints list of your short urls. Auth required.
     """
-    success, response = get_urls_list(access_token=get_access_token())
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
-        return
-
-    click.echo("Your urls:")
-    for url in response:
-        if url["is_expired"]:
-            click.secho(
-                f"{build_open_url(url['hash'])} - {url['redirect_url']} (expired)", fg="red"
-            )
-        else:
-            click.echo(f"{build_open_url(url['hash'])} - {url['redirect_url']}")
+    writer = ListWriter(
+        output_format,
+        ("hash", "short_url", "redirect_url", "expires_at", "is_expired", "stats_is_public"),
+        lambda row: f"{row['short_url']} - {row['redirect_url']}"
+        + (" (expired)" if row["is_expired"] else ""),
+        get_color=lambda row: "red" if row["is_expired"] else None,
+        title="Your urls:",
+    )
+    # Rows of consumed page are shown while next page is requested.
+    urls = iter_urls_list(
+        access_token=get_access_token(),
+        offset=offset,
+        limit=limit,
+        page_size=page_size,
+        on_page_end=writer.flush,
+    )
+    with writer:
+        for url in urls:
+            writer.write({**url, "short_url": build_open_url(url["hash"])})
 
 
 @url.command()
-@click.option("-s", "--short-url", type=str, help="Short url.")
-def delete(short_url: str):
+@click.option(
+    "-s", "--short-url", "short_urls", type=str, multiple=True, help="Short url. Can be repeated."
+)
+@click.option(
+    "-f",
+    "--from-file",
+    type=click.File("r"),
+    default=None,
+    help="Read short urls or hashes from file, one per line. Pass '-' to read from stdin.",
+)
+@click.option(
+    "-H",
+    "--from-history",
+    is_flag=True,
+    default=False,
+    help="Choose url from local history instead of requesting list of your urls.",
+)
+@click.option(
+    "-n", "--dry-run", is_flag=True, default=False, help="Only print urls that would be deleted."
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests. Defaults to connection pool size.",
+)
+def delete(
+    short_urls: Tuple[str, ...],
+    from_file: Optional[TextIOWrapper],
+    from_history: bool,
+    dry_run: bool,
+    workers: Optional[int],
+):
     """
-    Deletes short url. Auth Required.
+    Deletes short urls. Auth Required.
     """
-    if short_url:
-        short_url_hash = extract_hash_from_short_url(short_url)
+    access_token = get_access_token()
+    if short_urls or from_file:
+        hashes = read_hashes(short_urls, extract_hash_from_short_url, from_file)
     else:
         click.echo("Short url is not specified, requesting for list of your urls.")
-        short_url_hash = request_hash_from_urls_list()
+        hashes = [request_hash_from_urls_list(from_history=from_history)]
+
+    if len(hashes) > 1 or dry_run:
+        failed = delete_by_hashes(
+            "url",
+            hashes,
+            delete_url_by_hash,
+            build_open_url,
+            access_token=access_token,
+            workers=workers,
+            dry_run=dry_run,
+        )
+        if failed:
+            click.get_current_context().exit(1)
+        return
 
     success, *response = delete_url_by_hash(
-        hash=short_url_hash,
-        access_token=get_access_token(),
+        hash=hashes[0],
+        access_token=access_token,
     )
     if not success:
         click.secho(response[0]["message"], err=True, fg="red")
         return
 
+    mark_deleted_in_history("url", hashes[0])
     click.secho("Url was successfully deleted!", fg="green")
 
 
+@url.command()
+@click.option("-e", "--expired", is_flag=True, default=False, help="Select expired urls.")
+@click.option(
+    "-b",
+    "--expires-before",
+    type=click.DateTime(),
+    default=None,
+    help="Select urls that expire before this date.",
+)
+@click.option(
+    "-m",
+    "--match",
+    "pattern",
+    type=str,
+    default=None,
+    help="Select urls which redirect url matches regular expression.",
+)
+@click.option(
+    "-n", "--dry-run", is_flag=True, default=False, help="Only print urls that would be deleted."
+)
+@click.option("-y", "--yes", is_flag=True, default=False, help="Do not ask for confirmation.")
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of concurrent requests. Defaults to connection pool size.",
+)
+def prune(
+    expired: bool,
+    expires_before: Optional[datetime],
+    pattern: Optional[str],
+    dry_run: bool,
+    yes: bool,
+    workers: Optional[int],
+):
+    """
+    Deletes all your urls that match every passed condition. Auth required.
+    """
+    if not expired and expires_before is None and pattern is None:
+        click.secho(
+            "Pass at least one of --expired, --expires-before or --match!", fg="red", err=True
+        )
+        return
+    try:
+        compiled_pattern = re.compile(pattern) if pattern is not None else None
+    except re.error as e:
+        click.secho(f"Invalid --match regular expression: {e}", fg="red", err=True)
+        return
+
+    access_token = get_access_token()
+    success, response = get_urls_list(access_token=access_token)
+    if not success:
+        click.secho(response["message"], err=True, fg="red")
+        return
+
+    urls = select_items_to_prune(
+        response,
+        field="redirect_url",
+        expired=expired,
+        expires_before=expires_before,
+        pattern=compiled_pattern,
+    )
+    if not urls:
+        click.echo("No urls match passed conditions.")
+        return
+    if not dry_run and not yes:
+        click.confirm(f"Delete {len(urls)} urls?", abort=True)
+
+    failed = delete_by_hashes(
+        "url",
+        (url["hash"] for url in urls),
+        delete_url_by_hash,
+        build_open_url,
+        access_token=access_token,
+        workers=workers,
+        dry_run=dry_run,
+    )
+    if failed:
+        click.get_current_context().exit(1)
+
+
 @url.command()
 @click.option("-s", "--short-url", type=str, help="Short url.")
-def clear_stats(short_url: str):
+@click.option(
+    "-H",
+    "--from-history",
+    is_flag=True,
+    default=False,
+    help="Choose url from local history instead of requesting list of your urls.",
+)
+def clear_stats(short_url: str, from_history: bool):
     """
     Clears short url stats. Auth required.
     """
@@ -190,7 +650,7 @@ def clear_stats(short_url: str):
         short_url_hash = extract_hash_from_short_url(short_url)
     else:
         click.echo("Short url is not specified, requesting for list of your urls.")
-        short_url_hash = request_hash_from_urls_list()
+        short_url_hash = request_hash_from_urls_list(from_history=from_history)
 
     success, *response = clear_url_stats_by_hash(
         hash=short_url_hash, access_token=get_access_token()
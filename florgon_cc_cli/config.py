@@ -5,5 +5,37 @@ URL_OPEN_PROVIDER = "https://cc.florgon.com/o"
 URL_PASTE_OPEN_PROVIDER = "https://cc.florgon.com/p"
 URL_QR_PROVIDER = "https://cc.florgon.com/qr"
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CACHE_TTL = 60
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_COMPRESS_MIN_SIZE = 1024
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_RETRY_MAX_DELAY = 30
+
 CONFIG_DIR = Path.home() / ".config" / "florgon-cc"
 CONFIG_FILE = CONFIG_DIR / "config.toml"
+STORAGE_FILE = CONFIG_DIR / "storage.sqlite3"
+CACHE_DIR = CONFIG_DIR / "cache"
+
+# Environment variables, that change behavior of command: proxies, CA bundles, colors, timezone.
+# Client passes them to daemon, so forwarded command runs with environment of the caller.
+FORWARDED_ENVIRONMENT = (
+    "HTTP_PROXY",
+    "HTTPS_PROXY",
+    "ALL_PROXY",
+    "NO_PROXY",
+    "http_proxy",
+    "https_proxy",
+    "all_proxy",
+    "no_proxy",
+    "REQUESTS_CA_BUNDLE",
+    "CURL_CA_BUNDLE",
+    "SSL_CERT_FILE",
+    "SSL_CERT_DIR",
+    "NETRC",
+    "NO_COLOR",
+    "TERM",
+    "TZ",
+)
@@ -0,0 +1,53 @@
+"""
+    Click group that imports subcommands only when they are needed.
+"""
+from typing import Dict, List, Optional, Tuple
+import importlib
+
+import click
+
+
+class LazyGroup(click.Group):
+    """
+    Group that resolves subcommands by import path on first access.
+    Help for lazy commands is taken from `lazy_commands`, so printing
+    help of the group does not import anything.
+    """
+
+    def __init__(
+        self, *args, lazy_commands: Optional[Dict[str, Tuple[str, str]]] = None, **kwargs
+    ) -> None:
+        """
+        :param Optional[Dict[str, Tuple[str, str]]] lazy_commands: mapping of command name
+               to tuple of import path in form 'package.module:attribute' and short help.
+        """
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            import_path, _ = self.lazy_commands[cmd_name]
+            module_name, attribute = import_path.split(":")
+            command = getattr(importlib.import_module(module_name), attribute)
+            self.add_command(command, cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        commands = self.list_commands(ctx)
+        if not commands:
+            return
+
+        limit = formatter.width - 6 - max(len(name) for name in commands)
+        rows = []
+        for name in commands:
+            command = self.commands.get(name)
+            if command is None:
+                rows.append((name, self.lazy_commands[name][1]))
+            elif not command.hidden:
+                rows.append((name, command.get_short_help_str(limit)))
+
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
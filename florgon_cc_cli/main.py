@@ -4,12 +4,50 @@
     python main.py --help
     ```
 """
+from typing import Optional
+import json
+
 import click
 
-from florgon_cc_cli.commands import url, login, logout, host, config, paste
+from florgon_cc_cli.lazy_group import LazyGroup
+from florgon_cc_cli.services.profiling import start_profiling
+from florgon_cc_cli.services.trace import Tracer, format_trace
 
 
-@click.group()
+@click.group(
+    cls=LazyGroup,
+    lazy_commands={
+        "url": (
+            "florgon_cc_cli.commands.url:url",
+            "Commands that interacts with single url or list.",
+        ),
+        "paste": (
+            "florgon_cc_cli.commands.paste:paste",
+            "Command that interacts with single paste or list.",
+        ),
+        "login": ("florgon_cc_cli.commands.login:login", "Login to Florgon."),
+        "logout": ("florgon_cc_cli.commands.logout:logout", "Deletes auth data."),
+        "host": ("florgon_cc_cli.commands.host:host", "Work with API host."),
+        "config": ("florgon_cc_cli.commands.config:config", "Work with user config."),
+        "history": (
+            "florgon_cc_cli.commands.history:history",
+            "Local history of created urls and pastes.",
+        ),
+        "stats": (
+            "florgon_cc_cli.commands.stats:stats",
+            "Local store of stats snapshots and queries over it.",
+        ),
+        "debug": ("florgon_cc_cli.commands.debug:debug", "Tools for debugging the CLI itself."),
+        "shell": (
+            "florgon_cc_cli.commands.shell:shell",
+            "Interactive shell, that runs commands in one process.",
+        ),
+        "daemon": (
+            "florgon_cc_cli.commands.daemon:daemon",
+            "Background process that runs commands without startup cost.",
+        ),
+    },
+)
 @click.option(
     "-D",
     "--debug",
@@ -20,18 +58,65 @@ from florgon_cc_cli.commands import url, login, logout, host, config, paste
 @click.option(
     "-a", "--anonymous", is_flag=True, default=False, help="Do not use access token for request."
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Do not use cached lists of urls and pastes.",
+)
+@click.option(
+    "--trace",
+    is_flag=True,
+    default=False,
+    help="Print timings of API requests, config loading and whole command to stderr.",
+)
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default=None,
+    help="Write timings as JSON to file instead of printing table. Implies --trace.",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(["cpu", "memory"]),
+    default=None,
+    help="Profile command with cProfile or tracemalloc and print top entries to stderr.",
+)
+@click.option(
+    "--profile-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Dump raw profile (pstats file or tracemalloc snapshot) to file.",
+)
 @click.pass_context
-def main(ctx: click.Context, debug: bool, anonymous: bool):
-    ctx.obj = {"DEBUG": debug, "ANONYMOUS": anonymous}
+def main(
+    ctx: click.Context,
+    debug: bool,
+    anonymous: bool,
+    no_cache: bool,
+    trace: bool,
+    trace_file: Optional[str],
+    profile: Optional[str],
+    profile_file: Optional[str],
+):
     """Florgon CC CLI - url shortener and paste manager."""
+    tracer = Tracer() if trace or trace_file else None
+    ctx.obj = {"DEBUG": debug, "ANONYMOUS": anonymous, "NO_CACHE": no_cache, "TRACE": tracer}
+    if tracer is not None:
+        ctx.call_on_close(lambda: _print_trace(tracer, trace_file))
+    if profile:
+        # Registered after trace, so profiling is stopped before trace is printed.
+        ctx.call_on_close(start_profiling(profile, profile_file))
+
 
+def _print_trace(tracer: Tracer, trace_file: Optional[str]) -> None:
+    """Prints trace table to stderr or writes trace as JSON to file."""
+    if trace_file:
+        with click.open_file(trace_file, "w") as f:
+            json.dump(tracer.get_trace(), f, indent=2)
+    else:
+        click.echo(format_trace(tracer.get_trace()), err=True)
 
-main.add_command(url)
-main.add_command(login)
-main.add_command(logout)
-main.add_command(host)
-main.add_command(config)
-main.add_command(paste)
 
 if __name__ == "__main__":
     main()
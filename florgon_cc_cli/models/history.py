@@ -0,0 +1,21 @@
+"""
+    Local history entry model.
+"""
+from typing import Literal, Optional, TypedDict
+
+
+class HistoryEntry(TypedDict):
+    """
+    Url or paste, created by this CLI.
+    """
+
+    kind: Literal["url", "paste"]
+    hash: str
+    redirect_url: Optional[str]
+    text_digest: Optional[str]
+    text_preview: Optional[str]
+    expires_at: float
+    stats_is_public: bool
+    burn_after_read: bool
+    is_deleted: bool
+    created_at: float
@@ -6,7 +6,7 @@ from typing import TypedDict, Dict, NotRequired
 
 class Views(TypedDict):
     total: int
-    by_refferers: NotRequired[Dict[str, int]]
+    by_referers: NotRequired[Dict[str, int]]
     by_dates: NotRequired[Dict[str, int]]
 
 
@@ -0,0 +1,41 @@
+"""
+    Trace models, collected with --trace flag.
+"""
+from typing import List, Optional, TypedDict
+
+
+class RequestTrace(TypedDict):
+    """
+    Timings of single API request. Durations are in milliseconds.
+    `bytes` are sizes of decoded bodies, `wire_bytes` are sizes of (compressed) bodies
+    transferred over network, None if unknown.
+    """
+
+    method: str
+    endpoint: str
+    status: Optional[int]
+    bytes: Optional[int]
+    wire_bytes: Optional[int]
+    sent_bytes: Optional[int]
+    sent_wire_bytes: Optional[int]
+    connect_ms: float
+    ttfb_ms: Optional[float]
+    total_ms: float
+    json_decode_ms: Optional[float]
+    retries: int
+
+
+class Trace(TypedDict):
+    """
+    Timings of whole command. Durations are in milliseconds.
+    Network and JSON decode times are summed over all requests,
+    so they may be greater than total time if requests are concurrent.
+    """
+
+    requests: List[RequestTrace]
+    config_load_ms: float
+    network_ms: float
+    json_decode_ms: float
+    other_ms: float
+    total_ms: float
+    bytes_saved: int
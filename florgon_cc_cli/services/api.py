@@ -1,13 +1,34 @@
 """
     Services for working with Florgon CC Api.
 """
-from typing import Any, Dict, Optional, NoReturn, Union
+from typing import Any, Dict, Iterable, Iterator, Optional, NoReturn, Tuple, Union
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
 import click
 
 import florgon_cc_cli.config as config
+from florgon_cc_cli.models.trace import RequestTrace
 from florgon_cc_cli.services.config import get_value_from_config
+from florgon_cc_cli.services.trace import add_connect_time, get_tracer, pop_connect_time
+
+# Config keys, that session is built with. Session is rebuilt when they are changed.
+SESSION_CONFIG_KEYS = ("pool_size", "max_retries", "retry_backoff", "retry_max_delay")
+
+_session: Optional[requests.Session] = None
+_session_config: Optional[Tuple[Any, ...]] = None
+# Reentrant, as session is closed by `get_session` when config is changed.
+_session_lock = threading.RLock()
 
 
 def execute_json_api_method(
@@ -45,6 +66,9 @@ def execute_api_method(
     data: Dict[str, Any] = {},
     params: Dict[str, Any] = {},
     access_token: Optional[str] = None,
+    headers: Dict[str, str] = {},
+    body: Optional[Iterable[bytes]] = None,
+    stream: bool = False,
 ) -> requests.Request:
     """
     Executes API method and returns Request object.
@@ -53,27 +77,168 @@ def execute_api_method(
     :param Dict[str, Any] data: POST JSON data
     :param Dict[str, Any] params: GET data
     :param Optional[str] access_token: Florgon OAuth token
+    :param Dict[str, str] headers: additional HTTP headers
+    :param Optional[Iterable[bytes]] body: already encoded JSON body, sent by chunks.
+                                           `data` is ignored if passed
+    :param bool stream: do not download response body until it is accessed
     :rtype: requests.Response
     :return: response object
+    NOTE: Response compression (gzip, deflate and zstd/brotli if their modules are installed)
+    is negotiated by requests. If `compress_requests` config value is true, streamed bodies
+    and JSON bodies larger than `compress_min_size` bytes are sent compressed with gzip.
     """
     request_url = f"{get_api_host()}/{api_method}"
-    response = requests.request(
-        http_method,
-        request_url,
-        json=data,
-        params=params,
-        headers={"Authorization": access_token} if access_token else {},
-    )
-    ctx = click.get_current_context()
-    if ctx.obj["DEBUG"]:
+    if access_token:
+        headers = {**headers, "Authorization": access_token}
+    tracer = get_tracer()
+    compress = bool(get_value_from_config("compress_requests"))
+    json_data = data if body is None else None
+    request_body: Union[bytes, Iterable[bytes], None] = None
+    body_size: Dict[str, int] = {}
+    if body is not None:
+        headers = {**headers, "Content-Type": "application/json"}
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        request_body = body
+        if compress or tracer is not None:
+            request_body = _iter_request_chunks(body, body_size, compress)
+    elif compress and data:
+        encoded_data = json.dumps(data).encode()
+        min_size = get_value_from_config("compress_min_size")
+        if len(encoded_data) >= int(min_size or config.DEFAULT_COMPRESS_MIN_SIZE):
+            json_data = None
+            request_body = b"".join(_iter_request_chunks([encoded_data], body_size, True))
+            headers = {
+                **headers,
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
+            }
+
+    pop_connect_time()
+    started_at = time.perf_counter()
+    try:
+        response = get_session().request(
+            http_method,
+            request_url,
+            json=json_data,
+            data=request_body,
+            params=params,
+            headers=headers,
+            stream=stream,
+        )
+    except requests.RequestException:
+        if tracer is not None:
+            tracer.add_request(
+                _get_request_trace(http_method, api_method, None, started_at, stream, body_size)
+            )
+        raise
+    if tracer is not None:
+        response.trace = tracer.add_request(
+            _get_request_trace(http_method, api_method, response, started_at, stream, body_size)
+        )
+
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None and ctx.obj["DEBUG"]:
         click.secho(
             f"API response from {request_url} with HTTP code {response.status_code}:", fg="yellow"
         )
-        click.echo(response.text)
+        click.echo("<streamed>" if stream else response.text)
 
     return response
 
 
+def iter_response_content(response: requests.Response, chunk_size: int) -> Iterator[bytes]:
+    """
+    Yields decoded body of streamed response by chunks.
+    When body is read, its sizes are added to request trace (if --trace is passed).
+    :param requests.Response response: response of request with `stream=True`
+    :param int chunk_size: size of chunks
+    :rtype: Iterator[bytes]
+    """
+    size = 0
+    for chunk in response.iter_content(chunk_size):
+        size += len(chunk)
+        yield chunk
+    request_trace = getattr(response, "trace", None)
+    if request_trace is not None:
+        request_trace["bytes"] = size
+        request_trace["wire_bytes"] = response.raw.tell()
+
+
+def get_session() -> requests.Session:
+    """
+    Returns process-wide HTTP session. Connections are kept alive and reused by all API calls.
+    Size of connection pool can be set with `pool_size` key in user config.
+    Failed requests are retried according to `get_retry_policy()`.
+    Session is rebuilt if these config values are changed, e.g. while daemon or shell is running.
+    :rtype: requests.Session
+    :return: pooled session
+    """
+    global _session, _session_config
+    session_config = tuple(get_value_from_config(key) for key in SESSION_CONFIG_KEYS)
+    with _session_lock:
+        if _session is not None and session_config != _session_config:
+            close_session()
+        if _session is None:
+            pool_size = int(get_value_from_config("pool_size") or config.DEFAULT_POOL_SIZE)
+            adapter = _TimedHTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+                max_retries=get_retry_policy(),
+            )
+            session = _Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+            _session_config = session_config
+        return _session
+
+
+def get_retry_policy() -> Retry:
+    """
+    Returns retry policy for API requests, configured with keys in user config:
+    `max_retries` (0 disables retries), `retry_backoff` (delay before first retry in seconds,
+    doubled for each next retry) and `retry_max_delay` (max delay in seconds).
+    Idempotent methods (GET, DELETE) are retried on connection errors and
+    on 429, 502, 503 and 504 HTTP codes, `Retry-After` header is honored.
+    Other methods (POST) are retried only if connection is not established,
+    so request never reached server.
+    :rtype: Retry
+    :return: retry policy
+    """
+    max_retries = get_value_from_config("max_retries")
+    retry_backoff = get_value_from_config("retry_backoff")
+    retry_max_delay = get_value_from_config("retry_max_delay")
+    retry = _JitteredRetry(
+        total=int(max_retries if max_retries is not None else config.DEFAULT_MAX_RETRIES),
+        redirect=False,
+        allowed_methods=frozenset(["GET", "DELETE"]),
+        status_forcelist=frozenset([429, 502, 503, 504]),
+        backoff_factor=float(
+            retry_backoff if retry_backoff is not None else config.DEFAULT_RETRY_BACKOFF
+        ),
+        raise_on_status=False,
+        raise_on_redirect=False,
+    )
+    retry.max_delay = float(
+        retry_max_delay if retry_max_delay is not None else config.DEFAULT_RETRY_MAX_DELAY
+    )
+    return retry
+
+
+def close_session() -> None:
+    """
+    Closes process-wide HTTP session and all its pooled connections.
+    Called when session is rebuilt with changed config and when daemon is stopped.
+    :rtype: None
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
 def get_api_host() -> str:
     """
     Returns API host from user config. If it is not set, returns default API host.
@@ -90,9 +255,175 @@ def try_decode_response_to_json(response: requests.Response) -> Union[Dict[str,
     :return: JSON dict if decoding is successfully, else exit application
     :rtype: Union[Dict[str, Any], NoReturn]
     """
+    started_at = time.perf_counter()
     try:
         return response.json()
     except requests.exceptions.JSONDecodeError:
-        ctx = click.get_current_context()
         click.secho("Unable to decode API response as JSON!", fg="red", err=True)
-        ctx.exit(1)
+        # Context is not closed here, because this function may be called from worker threads.
+        raise click.exceptions.Exit(1)
+    finally:
+        request_trace = getattr(response, "trace", None)
+        if request_trace is not None:
+            request_trace["json_decode_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+
+
+def _get_request_trace(
+    http_method: str,
+    api_method: str,
+    response: Optional[requests.Response],
+    started_at: float,
+    stream: bool,
+    body_size: Dict[str, int],
+) -> RequestTrace:
+    """
+    Returns timings of request. Response is None if request is failed.
+    Streamed response is not read yet, so only its size over network is known
+    from Content-Length header. Sizes of compressed or streamed request body are taken
+    from body_size, filled while body is sent.
+    """
+    total_ms = (time.perf_counter() - started_at) * 1000
+    retries = 0
+    status = size = wire_size = ttfb_ms = None
+    sent_size = body_size.get("bytes")
+    sent_wire_size = body_size.get("wire_bytes")
+    if response is not None:
+        if response.raw is not None and response.raw.retries is not None:
+            retries = len(response.raw.retries.history)
+        status = response.status_code
+        ttfb_ms = round(response.elapsed.total_seconds() * 1000, 3)
+        if not stream:
+            size = len(response.content)
+            wire_size = response.raw.tell() if response.raw is not None else None
+        else:
+            content_length = response.headers.get("Content-Length")
+            wire_size = int(content_length) if content_length else None
+        if isinstance(response.request.body, bytes) and sent_size is None:
+            sent_size = sent_wire_size = len(response.request.body)
+    return {
+        "method": http_method,
+        "endpoint": api_method,
+        "status": status,
+        "bytes": size,
+        "wire_bytes": wire_size,
+        "sent_bytes": sent_size,
+        "sent_wire_bytes": sent_wire_size,
+        "connect_ms": round(pop_connect_time() * 1000, 3),
+        "ttfb_ms": ttfb_ms,
+        "total_ms": round(total_ms, 3),
+        "json_decode_ms": None,
+        "retries": retries,
+    }
+
+
+def _iter_request_chunks(
+    chunks: Iterable[bytes], body_size: Dict[str, int], compress: bool
+) -> Iterator[bytes]:
+    """
+    Yields request body chunks, compressed with gzip if `compress` is True.
+    Sizes of original and sent body are counted in body_size.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    body_size["bytes"] = body_size["wire_bytes"] = 0
+    for chunk in chunks:
+        body_size["bytes"] += len(chunk)
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            body_size["wire_bytes"] += len(chunk)
+            yield chunk
+    if compressor is not None:
+        tail = compressor.flush()
+        body_size["wire_bytes"] += len(tail)
+        yield tail
+
+
+class _Session(requests.Session):
+    """
+    Session that reads proxy and CA bundle environment variables once per host,
+    not for every request, as it takes more time than request to local network.
+    Settings are read again when these variables are changed (e.g. by daemon for
+    command of other caller).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._environment_settings: Dict[Any, Dict[str, Any]] = {}
+
+    def merge_environment_settings(self, url, proxies, stream, verify, cert) -> Dict[str, Any]:
+        if proxies or verify is not None or cert is not None:
+            return super().merge_environment_settings(url, proxies, stream, verify, cert)
+        key = (
+            urlsplit(url)[:2],
+            tuple(os.environ.get(name) for name in config.FORWARDED_ENVIRONMENT),
+        )
+        settings = self._environment_settings.get(key)
+        if settings is None:
+            settings = super().merge_environment_settings(url, {}, None, None, None)
+            self._environment_settings[key] = settings
+        return {**settings, "proxies": dict(settings["proxies"]), "stream": stream}
+
+
+class _JitteredRetry(Retry):
+    """
+    Retry policy with exponential backoff and jitter, so concurrent requests
+    are not retried at the same moment. Delays (including `Retry-After`) are limited by max_delay.
+    """
+
+    max_delay: float = config.DEFAULT_RETRY_MAX_DELAY
+
+    def new(self, **kwargs) -> "_JitteredRetry":
+        retry = super().new(**kwargs)
+        retry.max_delay = self.max_delay
+        return retry
+
+    def get_backoff_time(self) -> float:
+        if not self.history:
+            return 0
+        backoff = min(self.backoff_factor * 2 ** (len(self.history) - 1), self.max_delay)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.max_delay)
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    """HTTP connection that reports time of connecting to tracer."""
+
+    def connect(self) -> None:
+        started_at = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            add_connect_time(time.perf_counter() - started_at)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection that reports time of connecting (with TLS handshake) to tracer."""
+
+    def connect(self) -> None:
+        started_at = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            add_connect_time(time.perf_counter() - started_at)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTP adapter, which connections report time of connecting to tracer."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
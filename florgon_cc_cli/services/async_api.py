@@ -0,0 +1,139 @@
+"""
+    Asyncio interface for Florgon CC Api.
+    Requests are executed by synchronous API services in a thread pool, so they share
+    pooled HTTP session and return the same models, while event loop is never blocked.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, NoReturn, Optional, TypeVar, Union
+import asyncio
+import functools
+import threading
+
+import click
+import requests
+
+from florgon_cc_cli.services.api import execute_api_method, execute_json_api_method
+from florgon_cc_cli.services.concurrency import call_in_context, get_default_workers_count
+
+R = TypeVar("R")
+
+_concurrency_limit: Optional[int] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+
+def set_concurrency_limit(limit: int) -> None:
+    """
+    Sets max number of API requests executed at the same time.
+    Should be called before first request. Defaults to connection pool size.
+    :param int limit: concurrency limit
+    :rtype: None
+    """
+    global _concurrency_limit, _executor
+    with _executor_lock:
+        _concurrency_limit = limit
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+    _semaphores.clear()
+
+
+def get_concurrency_limit() -> int:
+    """
+    Returns max number of API requests executed at the same time.
+    :rtype: int
+    """
+    return _concurrency_limit or get_default_workers_count()
+
+
+async def run_api_call(func: Callable[..., R], *args, **kwargs) -> R:
+    """
+    Runs synchronous API service in thread pool within concurrency limit.
+    Current click context (if any) is available for service.
+    :param Callable[..., R] func: API service, like `services.url.create_url`
+    :rtype: R
+    :return: API service result
+    """
+    ctx = click.get_current_context(silent=True)
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore(loop):
+        return await loop.run_in_executor(
+            _get_executor(), functools.partial(call_in_context, ctx, func, *args, **kwargs)
+        )
+
+
+def execute_json_api_method_async(
+    http_method: str,
+    api_method: str,
+    *,
+    data: Dict[str, Any] = {},
+    params: Dict[str, Any] = {},
+    access_token: Optional[str] = None,
+) -> Awaitable[Union[Dict[str, Any], NoReturn]]:
+    """
+    Async version of `execute_json_api_method`.
+    :param str http_method: GET, POST, PUT, PATCH, DELETE or OPTIONS
+    :param str api_method: API method, described in docs
+    :param Dict[str, Any] data: POST JSON data
+    :param Dict[str, Any] params: GET data
+    :param Optional[str] access_token: Florgon OAuth token
+    :rtype: Awaitable[Union[Dict[str, Any], NoReturn]]
+    :return: JSON response from API or exit application
+    """
+    return run_api_call(
+        execute_json_api_method,
+        http_method,
+        api_method,
+        data=data,
+        params=params,
+        access_token=access_token,
+    )
+
+
+def execute_api_method_async(
+    http_method: str,
+    api_method: str,
+    *,
+    data: Dict[str, Any] = {},
+    params: Dict[str, Any] = {},
+    access_token: Optional[str] = None,
+) -> Awaitable[requests.Response]:
+    """
+    Async version of `execute_api_method`.
+    :param str http_method: GET, POST, PUT, PATCH, DELETE or OPTIONS
+    :param str api_method: API method, described in docs
+    :param Dict[str, Any] data: POST JSON data
+    :param Dict[str, Any] params: GET data
+    :param Optional[str] access_token: Florgon OAuth token
+    :rtype: Awaitable[requests.Response]
+    :return: response object
+    """
+    return run_api_call(
+        execute_api_method,
+        http_method,
+        api_method,
+        data=data,
+        params=params,
+        access_token=access_token,
+    )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Returns thread pool sized by concurrency limit."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_concurrency_limit(), thread_name_prefix="florgon-cc-api"
+            )
+        return _executor
+
+
+def _get_semaphore(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    """Returns concurrency limit semaphore bound to event loop."""
+    for other_loop in [other_loop for other_loop in _semaphores if other_loop.is_closed()]:
+        _semaphores.pop(other_loop)
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(get_concurrency_limit())
+    return _semaphores[loop]
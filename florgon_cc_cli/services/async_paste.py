@@ -0,0 +1,71 @@
+"""
+    Asyncio versions of services for working with single paste API or list.
+"""
+from typing import List, Literal, NoReturn, Optional, Tuple, Union
+
+from florgon_cc_cli.models.error import Error
+from florgon_cc_cli.models.paste import Paste
+from florgon_cc_cli.models.stats import Stats
+from florgon_cc_cli.services import paste
+from florgon_cc_cli.services.async_api import run_api_call
+
+
+async def create_paste(
+    text: str,
+    *,
+    stats_is_public: bool = False,
+    burn_after_read: bool = False,
+    access_token: Optional[str] = None,
+) -> Union[Tuple[Literal[True], Paste], Tuple[Literal[False], Error]]:
+    """Async version of `services.paste.create_paste`."""
+    return await run_api_call(
+        paste.create_paste,
+        text,
+        stats_is_public=stats_is_public,
+        burn_after_read=burn_after_read,
+        access_token=access_token,
+    )
+
+
+async def get_pastes_list(
+    access_token: Optional[str] = None,
+) -> Union[Tuple[Literal[True], List[Paste]], Tuple[Literal[False], Error]]:
+    """Async version of `services.paste.get_pastes_list`."""
+    return await run_api_call(paste.get_pastes_list, access_token=access_token)
+
+
+async def get_paste_info_by_hash(
+    hash: str,
+) -> Union[Tuple[Literal[True], Paste], Tuple[Literal[False], Error]]:
+    """Async version of `services.paste.get_paste_info_by_hash`."""
+    return await run_api_call(paste.get_paste_info_by_hash, hash)
+
+
+async def delete_paste_by_hash(
+    hash: str, access_token: Optional[str] = None
+) -> Union[Tuple[bool, Optional[Error]], NoReturn]:
+    """Async version of `services.paste.delete_paste_by_hash`."""
+    return await run_api_call(paste.delete_paste_by_hash, hash, access_token=access_token)
+
+
+async def get_paste_stats_by_hash(
+    hash: str,
+    url_views_by_referers_as: str = "percent",
+    url_views_by_dates_as: str = "percent",
+    access_token: Optional[str] = None,
+) -> Union[Tuple[Literal[True], Stats], Tuple[Literal[False], Error], NoReturn]:
+    """Async version of `services.paste.get_paste_stats_by_hash`."""
+    return await run_api_call(
+        paste.get_paste_stats_by_hash,
+        hash,
+        url_views_by_referers_as=url_views_by_referers_as,
+        url_views_by_dates_as=url_views_by_dates_as,
+        access_token=access_token,
+    )
+
+
+async def clear_paste_stats_by_hash(
+    hash: str, access_token: Optional[str] = None
+) -> Union[Tuple[Literal[True]], Tuple[Literal[False], Error], NoReturn]:
+    """Async version of `services.paste.clear_paste_stats_by_hash`."""
+    return await run_api_call(paste.clear_paste_stats_by_hash, hash, access_token=access_token)
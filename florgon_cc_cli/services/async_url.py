@@ -0,0 +1,63 @@
+"""
+    Asyncio versions of services for working with single url API or list.
+"""
+from typing import List, Literal, NoReturn, Optional, Tuple, Union
+
+from florgon_cc_cli.models.error import Error
+from florgon_cc_cli.models.stats import Stats
+from florgon_cc_cli.models.url import Url
+from florgon_cc_cli.services import url
+from florgon_cc_cli.services.async_api import run_api_call
+
+
+async def create_url(
+    long_url: str, stats_is_public: bool = False, access_token: Optional[str] = None
+) -> Union[Tuple[Literal[True], Url], Tuple[Literal[False], Error]]:
+    """Async version of `services.url.create_url`."""
+    return await run_api_call(
+        url.create_url, long_url, stats_is_public=stats_is_public, access_token=access_token
+    )
+
+
+async def get_url_info_by_hash(
+    hash: str,
+) -> Union[Tuple[Literal[True], Url], Tuple[Literal[False], Error]]:
+    """Async version of `services.url.get_url_info_by_hash`."""
+    return await run_api_call(url.get_url_info_by_hash, hash)
+
+
+async def get_url_stats_by_hash(
+    hash: str,
+    url_views_by_referers_as: str = "percent",
+    url_views_by_dates_as: str = "percent",
+    access_token: Optional[str] = None,
+) -> Union[Tuple[Literal[True], Stats], Tuple[Literal[False], Error]]:
+    """Async version of `services.url.get_url_stats_by_hash`."""
+    return await run_api_call(
+        url.get_url_stats_by_hash,
+        hash,
+        url_views_by_referers_as=url_views_by_referers_as,
+        url_views_by_dates_as=url_views_by_dates_as,
+        access_token=access_token,
+    )
+
+
+async def get_urls_list(
+    access_token: Optional[str] = None,
+) -> Union[Tuple[Literal[True], List[Url]], Tuple[Literal[False], Error]]:
+    """Async version of `services.url.get_urls_list`."""
+    return await run_api_call(url.get_urls_list, access_token=access_token)
+
+
+async def delete_url_by_hash(
+    hash: str, access_token: Optional[str] = None
+) -> Union[Tuple[Literal[True]], Tuple[Literal[False], Error], NoReturn]:
+    """Async version of `services.url.delete_url_by_hash`."""
+    return await run_api_call(url.delete_url_by_hash, hash, access_token=access_token)
+
+
+async def clear_url_stats_by_hash(
+    hash: str, access_token: Optional[str] = None
+) -> Union[Tuple[Literal[True]], Tuple[Literal[False], Error], NoReturn]:
+    """Async version of `services.url.clear_url_stats_by_hash`."""
+    return await run_api_call(url.clear_url_stats_by_hash, hash, access_token=access_token)
@@ -0,0 +1,151 @@
+"""
+    On-disk cache for API list responses.
+"""
+from typing import Any, Dict, NoReturn, Optional, Tuple, Union
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import click
+
+from florgon_cc_cli import config
+from florgon_cc_cli.services.api import (
+    execute_api_method,
+    get_api_host,
+    try_decode_response_to_json,
+)
+from florgon_cc_cli.services.config import get_value_from_config
+
+# Parsed cache entries by cache file, with file modification time and size. They are used
+# by long-lived processes (shell, daemon) while cache file is not changed by other process.
+# NOTE: Returned response bodies are shared, do not modify them.
+_memory_entries: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+_memory_entries_lock = threading.Lock()
+
+
+def execute_cached_json_api_method(
+    api_method: str,
+    *,
+    params: Dict[str, Any] = {},
+    access_token: Optional[str] = None,
+) -> Union[Dict[str, Any], NoReturn]:
+    """
+    Executes GET API method, successful responses are cached per API host and access token.
+    Cached response is returned while it is younger than `cache_ttl` config value (in seconds),
+    then it is revalidated with ETag or Last-Modified if server sent them.
+    Cache is not used if --no-cache flag is passed.
+    NOTE: Returned dict may be shared with next calls, do not modify it!
+    :param str api_method: API method, described in docs
+    :param Dict[str, Any] params: GET data
+    :param Optional[str] access_token: Florgon OAuth token
+    :rtype: Union[Dict[str, Any], NoResponse]
+    :return: JSON response from API or exit application
+    """
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None and ctx.obj.get("NO_CACHE"):
+        response = execute_api_method("GET", api_method, params=params, access_token=access_token)
+        return try_decode_response_to_json(response)
+
+    cache_file = _get_cache_file(api_method, params, access_token)
+    entry = _read_cache_entry(cache_file)
+    ttl = get_value_from_config("cache_ttl")
+    ttl = float(ttl if ttl is not None else config.DEFAULT_CACHE_TTL)
+    if entry is not None and time.time() - entry["stored_at"] < ttl:
+        if ctx is not None and ctx.obj.get("DEBUG"):
+            click.secho(f"Using cached API response for {api_method}", fg="yellow")
+        return entry["body"]
+
+    headers = {}
+    if entry is not None and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry is not None and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    response = execute_api_method(
+        "GET", api_method, params=params, access_token=access_token, headers=headers
+    )
+    if response.status_code == 304 and entry is not None:
+        entry["stored_at"] = time.time()
+        _write_cache_entry(cache_file, entry)
+        return entry["body"]
+
+    body = try_decode_response_to_json(response)
+    if "success" in body:
+        _write_cache_entry(
+            cache_file,
+            {
+                "stored_at": time.time(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body": body,
+            },
+        )
+    return body
+
+
+def invalidate_cache() -> None:
+    """
+    Deletes all cached responses for current API host.
+    Should be called after any change of urls or pastes.
+    :rtype: None
+    """
+    host_cache_dir = _get_host_cache_dir()
+    shutil.rmtree(host_cache_dir, ignore_errors=True)
+    with _memory_entries_lock:
+        for cache_file in [path for path in _memory_entries if path.startswith(host_cache_dir)]:
+            del _memory_entries[cache_file]
+
+
+def _get_host_cache_dir() -> str:
+    """Returns cache dir for current API host."""
+    host_key = hashlib.sha256(get_api_host().encode()).hexdigest()[:32]
+    return os.path.join(config.CACHE_DIR, host_key)
+
+
+def _get_cache_file(api_method: str, params: Dict[str, Any], access_token: Optional[str]) -> str:
+    """Returns cache file path for request. Access token is hashed, never stored."""
+    request_key = json.dumps([api_method, params, access_token], sort_keys=True)
+    return os.path.join(
+        _get_host_cache_dir(), hashlib.sha256(request_key.encode()).hexdigest() + ".json"
+    )
+
+
+def _read_cache_entry(cache_file: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns cache entry or None if it does not exist or broken.
+    Entry is parsed again only if cache file is changed since last read in this process.
+    """
+    try:
+        stat = os.stat(cache_file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with _memory_entries_lock:
+            memory_entry = _memory_entries.get(cache_file)
+        if memory_entry is not None and memory_entry[0] == stamp:
+            return memory_entry[1]
+        with open(cache_file, "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    with _memory_entries_lock:
+        _memory_entries[cache_file] = (stamp, entry)
+    return entry
+
+
+def _write_cache_entry(cache_file: str, entry: Dict[str, Any]) -> None:
+    """Atomically writes cache entry, cache file is readable only by user."""
+    cache_dir = os.path.dirname(cache_file)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, cache_file)
+        stat = os.stat(cache_file)
+        with _memory_entries_lock:
+            _memory_entries[cache_file] = ((stat.st_mtime_ns, stat.st_size), entry)
+    except OSError:
+        # Cache is optional, failed write must not break command.
+        pass
@@ -0,0 +1,76 @@
+"""
+    Services for running API calls concurrently.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple, TypeVar, Union
+
+import click
+from click.globals import push_context, pop_context
+
+from florgon_cc_cli import config
+from florgon_cc_cli.services.config import get_value_from_config
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def get_default_workers_count() -> int:
+    """
+    Returns default number of concurrent workers, it is equal to size of connection pool.
+    :rtype: int
+    """
+    return int(get_value_from_config("pool_size") or config.DEFAULT_POOL_SIZE)
+
+
+def call_in_context(ctx: Optional[click.Context], func: Callable[..., R], *args, **kwargs) -> R:
+    """
+    Calls function with click context pushed, it is needed to call API services
+    from threads other than main.
+    :param Optional[click.Context] ctx: click context, nothing is pushed if None
+    :param Callable[..., R] func: function to call
+    :rtype: R
+    :return: function result
+    """
+    if ctx is None:
+        return func(*args, **kwargs)
+    push_context(ctx)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        pop_context()
+
+
+def map_concurrently(
+    func: Callable[[T], R], items: Iterable[T], workers: Optional[int] = None
+) -> Iterator[Tuple[T, Union[R, Exception]]]:
+    """
+    Calls function for every item in thread pool and yields results in input order.
+    Current click context is available in workers, so API services can be used.
+    Number of items in flight is bounded, so items can be a lazy iterable of any size.
+    :param Callable[[T], R] func: function to call
+    :param Iterable[T] items: function arguments
+    :param Optional[int] workers: max number of concurrent calls. Defaults to pool size
+    :return: pairs of item and function result, or exception raised by function
+             (including click.exceptions.Exit, if function tried to exit application)
+    :rtype: Iterator[Tuple[T, Union[R, Exception]]]
+    """
+    workers = workers or get_default_workers_count()
+    ctx = click.get_current_context(silent=True)
+
+    def call(item: T) -> Union[R, Exception]:
+        try:
+            return call_in_context(ctx, func, item)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Tuple[T, Future]] = deque()
+        for item in items:
+            pending.append((item, executor.submit(call, item)))
+            if len(pending) >= workers * 2:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
@@ -1,12 +1,21 @@
 """
     Services for working with user config.
 """
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
+import os
+import tempfile
+import threading
+import time
 import toml
 
 import click
 
 from florgon_cc_cli import config
+from florgon_cc_cli.services.trace import get_tracer
+
+_config: Optional[Dict[str, Any]] = None
+_config_stamp: Optional[Tuple[int, int]] = None
+_config_lock = threading.Lock()
 
 
 def get_access_token() -> Optional[str]:
@@ -27,12 +36,7 @@ def save_value_to_config(key: str, value: Any) -> None:
     :param Any value: value to save.
     :rtype: None
     """
-    create_config_file()
-    user_config = deserialize_config()
-
-    user_config[key] = value
-    with open(config.CONFIG_FILE, "w") as f:
-        toml.dump(user_config, f)
+    update_config({key: value})
 
 
 def get_value_from_config(key: str) -> Any:
@@ -42,10 +46,7 @@ def get_value_from_config(key: str) -> Any:
     :param str key: key for value
     :rtype: Any
     """
-    create_config_file()
-    user_config = deserialize_config()
-
-    return user_config.get(key)
+    return load_config().get(key)
 
 
 def delete_value_from_config(key: str) -> None:
@@ -54,14 +55,58 @@ def delete_value_from_config(key: str) -> None:
     :param str key: key for value
     :rtype: None
     """
-    create_config_file()
-    user_config = deserialize_config()
+    update_config(delete_keys=[key])
 
-    if key in user_config:
-        user_config.pop(key)
 
-    with open(config.CONFIG_FILE, "w") as f:
-        toml.dump(user_config, f)
+def load_config() -> Dict[str, Any]:
+    """
+    Returns user config. Config is parsed once per process and parsed again
+    only if config file modification time or size is changed.
+    NOTE: Returned dict is shared, do not modify it, use update_config() instead!
+    :rtype: Dict[str, Any]
+    :return: user config
+    """
+    global _config, _config_stamp
+    stamp = _get_config_stamp()
+    with _config_lock:
+        if _config is None or stamp != _config_stamp:
+            started_at = time.perf_counter()
+            _config = deserialize_config() if stamp is not None else {}
+            _config_stamp = stamp
+            tracer = get_tracer()
+            if tracer is not None:
+                tracer.add_config_load(time.perf_counter() - started_at)
+        return _config
+
+
+def update_config(
+    values: Optional[Dict[str, Any]] = None, *, delete_keys: Iterable[str] = ()
+) -> None:
+    """
+    Updates and deletes values in user config and writes it in one atomic replace.
+    :param Optional[Dict[str, Any]] values: values to save by keys
+    :param Iterable[str] delete_keys: keys to delete
+    :rtype: None
+    """
+    global _config, _config_stamp
+    user_config = dict(load_config())
+    user_config.update(values or {})
+    for key in delete_keys:
+        user_config.pop(key, None)
+
+    config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=config.CONFIG_DIR, prefix=".config-", suffix=".toml")
+    try:
+        with os.fdopen(fd, "w") as f:
+            toml.dump(user_config, f)
+        os.replace(temp_path, config.CONFIG_FILE)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    with _config_lock:
+        _config = user_config
+        _config_stamp = _get_config_stamp()
 
 
 def deserialize_config() -> Dict[str, Any]:
@@ -74,10 +119,13 @@ def deserialize_config() -> Dict[str, Any]:
         return toml.load(f)
 
 
-def create_config_file() -> None:
+def _get_config_stamp() -> Optional[Tuple[int, int]]:
     """
-    Creates empty config dir and config file.
-    :rtype: None
+    Returns modification time and size of config file or None if it does not exist.
+    :rtype: Optional[Tuple[int, int]]
     """
-    config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    config.CONFIG_FILE.touch(exist_ok=True)
+    try:
+        stat = os.stat(config.CONFIG_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
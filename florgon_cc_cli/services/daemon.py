@@ -0,0 +1,294 @@
+"""
+    Daemon that runs forwarded commands (see `florgon_cc_cli.client`) in one long-lived process,
+    so parsed config, imported modules, pooled connections and caches are reused.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from florgon_cc_cli.client import (
+    FRAME_EXIT,
+    FRAME_FALLBACK,
+    FRAME_HEADER,
+    FRAME_STDERR,
+    FRAME_STDOUT,
+    SOCKET_FILE,
+)
+
+# Output is held until command is completed or held output is larger than this size,
+# so command that needs terminal can be run again by client without duplicated output.
+HELD_OUTPUT_SIZE = 64 * 1024
+STATUS_COMMAND = "status"
+STOP_COMMAND = "stop"
+
+_serving = False
+
+
+class TerminalRequiredError(Exception):
+    """
+    Raised in daemon by services that need terminal (picker, prompts),
+    command is run again by client itself.
+    """
+
+
+def require_terminal() -> None:
+    """
+    Raises TerminalRequiredError if command is run by daemon.
+    :raises TerminalRequiredError: if command is run by daemon
+    :rtype: None
+    """
+    if _serving:
+        raise TerminalRequiredError()
+
+
+def serve() -> None:
+    """
+    Runs daemon on Unix socket in config dir until it is stopped with `stop_daemon()`.
+    Commands are run one by one, like they are run by shell script.
+    :rtype: None
+    """
+    global _serving
+    SOCKET_FILE.parent.mkdir(parents=True, exist_ok=True)
+    if SOCKET_FILE.exists():
+        SOCKET_FILE.unlink()
+    old_umask = os.umask(0o177)
+    try:
+        server = _DaemonServer(str(SOCKET_FILE), _DaemonRequestHandler)
+    finally:
+        os.umask(old_umask)
+
+    _serving = True
+    try:
+        with server:
+            server.serve_forever()
+    finally:
+        _serving = False
+        if SOCKET_FILE.exists():
+            SOCKET_FILE.unlink()
+        # Imported here, so `daemon stop` and `daemon status` do not import requests.
+        from florgon_cc_cli.services.api import close_session
+
+        close_session()
+
+
+def get_daemon_status() -> Optional[Dict[str, Any]]:
+    """
+    Returns status of running daemon.
+    :rtype: Optional[Dict[str, Any]]
+    :return: dict with `pid`, `started_at` and `commands` (number of run commands),
+             or None if daemon is not running
+    """
+    return _send_command(STATUS_COMMAND)
+
+
+def stop_daemon() -> bool:
+    """
+    Stops running daemon.
+    :rtype: bool
+    :return: True if daemon was running
+    """
+    return _send_command(STOP_COMMAND) is not None
+
+
+def _send_command(command: str) -> Optional[Dict[str, Any]]:
+    """Sends management command to daemon and returns its response."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(str(SOCKET_FILE))
+            with connection.makefile("rwb") as stream:
+                stream.write(json.dumps({"command": command}).encode() + b"\n")
+                stream.flush()
+                return json.loads(stream.readline())
+    except (OSError, ValueError):
+        return None
+
+
+class _DaemonServer(socketserver.UnixStreamServer):
+    """Server that keeps its statistics for status command."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.started_at = time.time()
+        self.commands_count = 0
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Runs one forwarded command, or handles management command."""
+
+    server: _DaemonServer
+
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        if request.get("command") == STATUS_COMMAND:
+            self._reply(
+                {
+                    "pid": os.getpid(),
+                    "started_at": self.server.started_at,
+                    "commands": self.server.commands_count,
+                }
+            )
+        elif request.get("command") == STOP_COMMAND:
+            self._reply({"pid": os.getpid()})
+            # Shutdown waits for serve_forever loop, which is waiting for this handler.
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            self.server.commands_count += 1
+            self._run_command(request)
+
+    def _reply(self, response: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    def _run_command(self, request: Dict[str, Any]) -> None:
+        from florgon_cc_cli.main import main
+
+        output = _FramedOutput(self.wfile)
+        stdout = _text_stream(output, FRAME_STDOUT, request["stdout_isatty"])
+        stderr = _text_stream(output, FRAME_STDERR, request["stderr_isatty"])
+        exit_code: Any = 0
+        needs_terminal = False
+        with _redirected(request, stdout, stderr):
+            try:
+                main(request["args"], prog_name="florgon-cc")
+            except SystemExit as e:
+                exit_code = e.code
+            except TerminalRequiredError:
+                needs_terminal = True
+            except Exception as e:
+                # Daemon must not be stopped by failed command.
+                stderr.write(f"Error: {e!r}\n")
+                exit_code = 1
+            finally:
+                stdout.flush()
+                stderr.flush()
+
+        if needs_terminal and not output.is_sent:
+            output.send(FRAME_FALLBACK, b"")
+            return
+        if needs_terminal:
+            output.write(FRAME_STDERR, b"Command needs terminal, run it without daemon!\n")
+            exit_code = 1
+        elif exit_code is not None and not isinstance(exit_code, int):
+            # Like Python does for `sys.exit(message)`.
+            output.write(FRAME_STDERR, f"{exit_code}\n".encode())
+            exit_code = 1
+        output.flush()
+        output.send(FRAME_EXIT, str(exit_code or 0).encode())
+
+
+class _FramedOutput:
+    """Output of command, sent to client by frames. Output is held, see HELD_OUTPUT_SIZE."""
+
+    def __init__(self, file) -> None:
+        self._file = file
+        self._held = []
+        self._held_size = 0
+        self.is_sent = False
+
+    def write(self, kind: bytes, data: bytes) -> None:
+        self._held.append((kind, data))
+        self._held_size += len(data)
+        if self.is_sent or self._held_size > HELD_OUTPUT_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        for kind, data in self._held:
+            self.send(kind, data)
+        self._held.clear()
+        self._held_size = 0
+
+    def send(self, kind: bytes, data: bytes) -> None:
+        self._file.write(FRAME_HEADER.pack(kind, len(data)) + data)
+        self._file.flush()
+        self.is_sent = True
+
+
+class _OutputStream(io.RawIOBase):
+    """Binary stream, which writes to framed output."""
+
+    def __init__(self, output: _FramedOutput, kind: bytes, isatty: bool) -> None:
+        super().__init__()
+        self._output = output
+        self._kind = kind
+        self._isatty = isatty
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._isatty
+
+    def write(self, data) -> int:
+        self._output.write(self._kind, bytes(data))
+        return len(data)
+
+
+class _NoTerminalInput(io.TextIOBase):
+    """Stdin of commands, run by daemon. Reading it means that command needs terminal."""
+
+    def readable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def read(self, *_) -> str:
+        raise TerminalRequiredError()
+
+    def readline(self, *_) -> str:
+        raise TerminalRequiredError()
+
+
+def _text_stream(output: _FramedOutput, kind: bytes, isatty: bool) -> io.TextIOWrapper:
+    """Returns text stream, like sys.stdout, which writes to framed output."""
+    return io.TextIOWrapper(
+        io.BufferedWriter(_OutputStream(output, kind, isatty)),
+        encoding="utf-8",
+        errors="replace",
+        line_buffering=True,
+    )
+
+
+@contextmanager
+def _redirected(
+    request: Dict[str, Any], stdout: io.TextIOWrapper, stderr: io.TextIOWrapper
+) -> Iterator[None]:
+    """
+    Runs command with client's working directory, terminal size, environment
+    (see FORWARDED_ENVIRONMENT) and output streams.
+    """
+    environ = {
+        **request.get("environ", {}),
+        "COLUMNS": str(request["columns"]),
+        "LINES": str(request["lines"]),
+    }
+    saved_streams = sys.stdin, sys.stdout, sys.stderr
+    saved_cwd = os.getcwd()
+    saved_environ = {key: os.environ.get(key) for key in environ}
+    sys.stdin, sys.stdout, sys.stderr = _NoTerminalInput(), stdout, stderr
+    _set_environ(environ)
+    try:
+        os.chdir(request["cwd"])
+        yield
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+        os.chdir(saved_cwd)
+        _set_environ(saved_environ)
+
+
+def _set_environ(environ: Dict[str, Optional[str]]) -> None:
+    """Sets environment variables, None values are unset."""
+    timezone = os.environ.get("TZ")
+    for key, value in environ.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    if os.environ.get("TZ") != timezone:
+        time.tzset()
@@ -1,8 +1,26 @@
 """
     Differents services for working with files.
 """
-from typing import List
-from io import TextIOWrapper
+from typing import Iterator, List, Optional, Tuple
+from io import TextIOWrapper, UnsupportedOperation
+import codecs
+import hashlib
+import mmap
+import os
+import stat
+import tempfile
+
+from florgon_cc_cli import config
+
+
+class FileTooLargeError(Exception):
+    """
+    Raised when files are larger than allowed size.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        super().__init__(f"Files are larger than {max_size} bytes!")
+        self.max_size = max_size
 
 
 def concat_files(files: List[TextIOWrapper]) -> str:
@@ -13,3 +31,109 @@ def concat_files(files: List[TextIOWrapper]) -> str:
     :rtype: str
     """
     return "".join(file.read() for file in files)
+
+
+def get_regular_files_size(files: List[TextIOWrapper]) -> int:
+    """
+    Returns total size of files in bytes. Only regular files are counted, not pipes or ttys.
+    :param List[TextIOWrapper] files: list of files, opened for reading (with mode 'r')
+    :rtype: int
+    """
+    return sum(
+        os.fstat(file.fileno()).st_size for file in files if _get_regular_file_fd(file) is not None
+    )
+
+
+def iter_files_chunks(
+    files: List[TextIOWrapper],
+    chunk_size: int = config.DEFAULT_CHUNK_SIZE,
+    max_size: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Reads files by chunks and yields them one after another, like concat_files(),
+    but only one chunk is kept in memory. Regular files are memory-mapped.
+    :param List[TextIOWrapper] files: list of files, opened for reading (with mode 'r')
+    :param int chunk_size: size of chunk in bytes (characters for non-regular files)
+    :param Optional[int] max_size: max total size of files in bytes
+    :raises FileTooLargeError: when files are larger than max_size, raised before reading
+                               if regular files are too large
+    :rtype: Iterator[str]
+    """
+    if max_size is not None and get_regular_files_size(files) > max_size:
+        raise FileTooLargeError(max_size)
+
+    total_size = 0
+    for file in files:
+        for chunk in _iter_file_chunks(file, chunk_size):
+            if max_size is not None:
+                total_size += len(chunk.encode()) if not chunk.isascii() else len(chunk)
+                if total_size > max_size:
+                    raise FileTooLargeError(max_size)
+            yield chunk
+
+
+def get_files_digest(
+    files: List[TextIOWrapper],
+    chunk_size: int = config.DEFAULT_CHUNK_SIZE,
+    max_size: Optional[int] = None,
+) -> Tuple[str, List[TextIOWrapper]]:
+    """
+    Returns digest of concatenated files (like `services.history.get_text_digest`),
+    reading them by chunks, and files that can be read again. Seekable files are rewound,
+    if there are other files (pipes, stdin), concatenated files are copied to temporary file.
+    :param List[TextIOWrapper] files: list of files, opened for reading (with mode 'r')
+    :param int chunk_size: size of chunk in bytes (characters for non-regular files)
+    :param Optional[int] max_size: max total size of files in bytes
+    :raises FileTooLargeError: when files are larger than max_size
+    :rtype: Tuple[str, List[TextIOWrapper]]
+    """
+    digest = hashlib.sha256()
+    if all(file.seekable() for file in files):
+        positions = [file.tell() for file in files]
+        for chunk in iter_files_chunks(files, chunk_size, max_size):
+            digest.update(chunk.encode())
+        for file, position in zip(files, positions):
+            file.seek(position)
+        return digest.hexdigest(), files
+
+    # Concatenated files are copied to temporary file, it is regular, so it is mapped later.
+    copy = tempfile.TemporaryFile(mode="w+", encoding="utf-8", newline="")
+    for chunk in iter_files_chunks(files, chunk_size, max_size):
+        digest.update(chunk.encode())
+        copy.write(chunk)
+    copy.seek(0)
+    return digest.hexdigest(), [copy]
+
+
+def _iter_file_chunks(file: TextIOWrapper, chunk_size: int) -> Iterator[str]:
+    """Yields chunks of single file."""
+    fd = _get_regular_file_fd(file)
+    if fd is None or os.fstat(fd).st_size == 0:
+        yield from iter(lambda: file.read(chunk_size), "")
+        return
+
+    decoder = codecs.getincrementaldecoder(file.encoding or "utf-8")(errors=file.errors)
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+        carriage_return = ""
+        for offset in range(os.lseek(fd, 0, os.SEEK_CUR), len(mapped), chunk_size):
+            end = offset + chunk_size
+            chunk = carriage_return + decoder.decode(mapped[offset:end])
+            if hasattr(mmap, "MADV_DONTNEED") and offset % mmap.PAGESIZE == 0:
+                # Read pages are released, so resident memory is bounded by chunk size.
+                mapped.madvise(mmap.MADV_DONTNEED, offset, min(chunk_size, len(mapped) - offset))
+            # Newlines are translated like in text mode, CR may be followed by LF in next chunk.
+            carriage_return = "\r" if chunk.endswith("\r") else ""
+            chunk = chunk[:-1] if carriage_return else chunk
+            yield chunk.replace("\r\n", "\n").replace("\r", "\n")
+        tail = carriage_return + decoder.decode(b"", final=True)
+        if tail:
+            yield tail.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _get_regular_file_fd(file: TextIOWrapper) -> Optional[int]:
+    """Returns file descriptor if file is regular file, else None."""
+    try:
+        fd = file.fileno()
+    except (AttributeError, UnsupportedOperation):
+        return None
+    return fd if stat.S_ISREG(os.fstat(fd).st_mode) else None
@@ -0,0 +1,159 @@
+"""
+    Services for working with local history of created urls and pastes.
+"""
+from typing import List, Literal, Optional
+import hashlib
+import time
+
+from florgon_cc_cli.models.history import HistoryEntry
+from florgon_cc_cli.models.paste import Paste
+from florgon_cc_cli.models.url import Url
+from florgon_cc_cli.services.api import get_api_host
+from florgon_cc_cli.services.storage import get_connection
+
+
+def get_text_digest(text: str) -> str:
+    """
+    Returns digest of paste text.
+    :param str text: paste text
+    :rtype: str
+    """
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def save_url_to_history(url: Url) -> None:
+    """
+    Saves created url to local history.
+    :param Url url: created url
+    :rtype: None
+    """
+    get_connection().execute(
+        "INSERT OR REPLACE INTO history (api_host, kind, hash, redirect_url, expires_at, "
+        "stats_is_public, burn_after_read, created_at) VALUES (?, 'url', ?, ?, ?, ?, 0, ?)",
+        (
+            get_api_host(),
+            url["hash"],
+            url["redirect_url"],
+            url["expires_at"],
+            url["stats_is_public"],
+            time.time(),
+        ),
+    )
+
+
+def save_paste_to_history(
+    paste: Paste, text_digest: Optional[str] = None, text_preview: Optional[str] = None
+) -> None:
+    """
+    Saves created paste to local history. Only digest and first line of text are saved.
+    :param Paste paste: created paste
+    :param Optional[str] text_digest: digest of paste text, if it is already computed
+    :param Optional[str] text_preview: first line of paste text, if paste text is not in model
+    :rtype: None
+    """
+    get_connection().execute(
+        "INSERT OR REPLACE INTO history (api_host, kind, hash, text_digest, text_preview, "
+        "expires_at, stats_is_public, burn_after_read, created_at) "
+        "VALUES (?, 'paste', ?, ?, ?, ?, ?, ?, ?)",
+        (
+            get_api_host(),
+            paste["hash"],
+            text_digest or get_text_digest(paste["text"]),
+            (paste["text"] if text_preview is None else text_preview).split("\n", 1)[0][:50],
+            paste["expires_at"],
+            paste["stats_is_public"],
+            paste["burn_after_read"],
+            time.time(),
+        ),
+    )
+
+
+def mark_deleted_in_history(kind: Literal["url", "paste"], hash: str) -> None:
+    """
+    Marks url or paste as deleted in local history.
+    :param Literal["url", "paste"] kind: url or paste
+    :param str hash: url or paste hash
+    :rtype: None
+    """
+    get_connection().execute(
+        "UPDATE history SET is_deleted = 1 WHERE api_host = ? AND kind = ? AND hash = ?",
+        (get_api_host(), kind, hash),
+    )
+
+
+def get_history_entry(kind: Literal["url", "paste"], hash: str) -> Optional[HistoryEntry]:
+    """
+    Returns history entry by hash.
+    :param Literal["url", "paste"] kind: url or paste
+    :param str hash: url or paste hash
+    :rtype: Optional[HistoryEntry]
+    :return: history entry or None if not found
+    """
+    cursor = get_connection().execute(
+        "SELECT * FROM history WHERE api_host = ? AND kind = ? AND hash = ?",
+        (get_api_host(), kind, hash),
+    )
+    row = cursor.fetchone()
+    return _row_to_entry(row) if row is not None else None
+
+
+def find_history_entries(
+    kind: Literal["url", "paste"],
+    *,
+    prefix: Optional[str] = None,
+    expired: Optional[bool] = None,
+    include_deleted: bool = False,
+    limit: Optional[int] = None,
+) -> List[HistoryEntry]:
+    """
+    Returns history entries, newest first.
+    :param Literal["url", "paste"] kind: url or paste
+    :param Optional[str] prefix: hash prefix
+    :param Optional[bool] expired: only expired if True, only active if False, all if None
+    :param bool include_deleted: include entries deleted with this CLI
+    :param Optional[int] limit: max number of entries
+    :rtype: List[HistoryEntry]
+    """
+    conditions = ["api_host = ?", "kind = ?"]
+    parameters: list = [get_api_host(), kind]
+    if prefix:
+        # Range condition instead of LIKE, so primary key index is used.
+        conditions.append("hash >= ? AND hash < ?")
+        parameters += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+    if expired is not None:
+        conditions.append("expires_at <= ?" if expired else "expires_at > ?")
+        parameters.append(time.time())
+    if not include_deleted:
+        conditions.append("is_deleted = 0")
+
+    query = f"SELECT * FROM history WHERE {' AND '.join(conditions)} ORDER BY created_at DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        parameters.append(limit)
+    return [_row_to_entry(row) for row in get_connection().execute(query, parameters)]
+
+
+def clear_history() -> int:
+    """
+    Deletes all history entries for current API host.
+    :rtype: int
+    :return: number of deleted entries
+    """
+    cursor = get_connection().execute("DELETE FROM history WHERE api_host = ?", (get_api_host(),))
+    return cursor.rowcount
+
+
+def _row_to_entry(row) -> HistoryEntry:
+    """Converts storage row to history entry."""
+    return {
+        "kind": row["kind"],
+        "hash": row["hash"],
+        "redirect_url": row["redirect_url"],
+        "text_digest": row["text_digest"],
+        "text_preview": row["text_preview"],
+        "expires_at": row["expires_at"],
+        "stats_is_public": bool(row["stats_is_public"]),
+        "burn_after_read": bool(row["burn_after_read"]),
+        "is_deleted": bool(row["is_deleted"]),
+        "created_at": row["created_at"],
+    }
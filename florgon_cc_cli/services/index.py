@@ -0,0 +1,246 @@
+"""
+    Services for working with local indexes of created urls and pastes.
+    Indexes are used to reuse existing url or paste instead of creating new one,
+    and to get info about url without request.
+"""
+from typing import Optional
+import hashlib
+import json
+from urllib.parse import urlsplit, urlunsplit
+import time
+
+from florgon_cc_cli.models.paste import Paste
+from florgon_cc_cli.models.url import Url
+from florgon_cc_cli.services.api import get_api_host
+from florgon_cc_cli.services.storage import get_connection, transaction
+
+
+def save_paste_to_index(paste: Paste, text_digest: str, access_token: Optional[str]) -> None:
+    """
+    Saves created paste to local index by digest of its text and owner.
+    Pastes that burn after read are not saved, as they can not be reused.
+    :param Paste paste: created paste
+    :param str text_digest: digest of paste text, see `services.history.get_text_digest`
+    :param Optional[str] access_token: access token paste is created with, None if anonymous
+    :rtype: None
+    """
+    if paste["burn_after_read"]:
+        return
+    get_connection().execute(
+        "INSERT OR REPLACE INTO paste_index (api_host, owner, text_digest, stats_is_public, "
+        "hash, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            get_api_host(),
+            get_owner(access_token),
+            text_digest,
+            paste["stats_is_public"],
+            paste["hash"],
+            paste["expires_at"],
+        ),
+    )
+
+
+def find_paste_in_index(
+    text_digest: str, stats_is_public: bool, access_token: Optional[str]
+) -> Optional[Paste]:
+    """
+    Returns not expired paste with same text and owner from local index.
+    Expired pastes are pruned.
+    :param str text_digest: digest of paste text, see `services.history.get_text_digest`
+    :param bool stats_is_public: stats of paste should be public
+    :param Optional[str] access_token: access token of owner, None if anonymous
+    :rtype: Optional[Paste]
+    :return: paste without text and id, or None if not found
+    """
+    api_host = get_api_host()
+    with transaction(get_connection()) as connection:
+        connection.execute(
+            "DELETE FROM paste_index WHERE api_host = ? AND expires_at <= ?",
+            (api_host, time.time()),
+        )
+        row = connection.execute(
+            "SELECT hash, expires_at FROM paste_index "
+            "WHERE api_host = ? AND owner = ? AND text_digest = ? AND stats_is_public = ?",
+            (api_host, get_owner(access_token), text_digest, stats_is_public),
+        ).fetchone()
+    if row is None:
+        return None
+    return {
+        "hash": row["hash"],
+        "text": "",
+        "expires_at": row["expires_at"],
+        "is_expired": False,
+        "stats_is_public": stats_is_public,
+        "is_deleted": False,
+        "burn_after_read": False,
+        "_links": None,
+    }
+
+
+def delete_paste_from_index(hash: str) -> None:
+    """
+    Deletes paste from local index, when paste is deleted.
+    :param str hash: paste hash
+    :rtype: None
+    """
+    get_connection().execute(
+        "DELETE FROM paste_index WHERE api_host = ? AND hash = ?", (get_api_host(), hash)
+    )
+
+
+def save_url_to_index(url: Url, long_url: str, access_token: Optional[str]) -> None:
+    """
+    Saves created url to local index by normalized long url and owner.
+    :param Url url: created url
+    :param str long_url: long url, as it was passed to API
+    :param Optional[str] access_token: access token url is created with, None if anonymous
+    :rtype: None
+    """
+    get_connection().execute(
+        "INSERT OR REPLACE INTO url_index (api_host, owner, long_url, stats_is_public, hash, "
+        "redirect_url, qr_url, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            get_api_host(),
+            get_owner(access_token),
+            normalize_long_url(long_url),
+            url["stats_is_public"],
+            url["hash"],
+            url["redirect_url"],
+            (url.get("_links") or {}).get("qr", {}).get("href"),
+            url["expires_at"],
+        ),
+    )
+
+
+def find_url_in_index(
+    long_url: str, stats_is_public: bool, access_token: Optional[str]
+) -> Optional[Url]:
+    """
+    Returns not expired url with same long url and owner from local index.
+    Expired urls are pruned.
+    :param str long_url: long url
+    :param bool stats_is_public: stats of url should be public
+    :param Optional[str] access_token: access token of owner, None if anonymous
+    :rtype: Optional[Url]
+    :return: url without id, or None if not found
+    """
+    api_host = get_api_host()
+    with transaction(get_connection()) as connection:
+        connection.execute(
+            "DELETE FROM url_index WHERE api_host = ? AND expires_at <= ?",
+            (api_host, time.time()),
+        )
+        row = connection.execute(
+            "SELECT hash, redirect_url, qr_url, expires_at FROM url_index "
+            "WHERE api_host = ? AND owner = ? AND long_url = ? AND stats_is_public = ?",
+            (api_host, get_owner(access_token), normalize_long_url(long_url), stats_is_public),
+        ).fetchone()
+    if row is None:
+        return None
+    return {
+        "redirect_url": row["redirect_url"],
+        "hash": row["hash"],
+        "expires_at": row["expires_at"],
+        "is_expired": False,
+        "stats_is_public": stats_is_public,
+        "is_deleted": False,
+        "_links": {"qr": {"href": row["qr_url"]}, "stats": None},
+    }
+
+
+def delete_url_from_index(hash: str) -> None:
+    """
+    Deletes url from local index, when url is deleted.
+    :param str hash: url hash
+    :rtype: None
+    """
+    get_connection().execute(
+        "DELETE FROM url_index WHERE api_host = ? AND hash = ?", (get_api_host(), hash)
+    )
+
+
+def get_owner(access_token: Optional[str]) -> str:
+    """
+    Returns owner key of urls and pastes in indexes, token itself is not stored.
+    :param Optional[str] access_token: access token, None if anonymous
+    :rtype: str
+    :return: digest of access token, or empty string if anonymous
+    """
+    if access_token is None:
+        return ""
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+def normalize_long_url(long_url: str) -> str:
+    """
+    Normalizes long url, so same urls in different forms have same key in index.
+    Scheme and host (not user info) are lowercased, default port and empty query
+    and fragment are removed.
+    Url without scheme is not normalized to any scheme, as API decides it.
+    :param str long_url: long url
+    :rtype: str
+    """
+    long_url = long_url.strip()
+    parts = urlsplit(long_url if "://" in long_url else "//" + long_url)
+    scheme = parts.scheme.lower()
+    user_info, at, host = parts.netloc.rpartition("@")
+    netloc = user_info + at + host.lower()
+    default_port = {"http": ":80", "https": ":443"}.get(scheme)
+    if default_port and netloc.endswith(default_port):
+        netloc = netloc[: -len(default_port)]
+    return urlunsplit(
+        (parts.scheme.lower(), netloc, parts.path or "/", parts.query, parts.fragment)
+    )
+
+
+def save_url_to_info_cache(url: Url) -> None:
+    """
+    Saves url info to local cache, it is used until url expires.
+    :param Url url: url from API
+    :rtype: None
+    """
+    get_connection().execute(
+        "INSERT OR REPLACE INTO url_info_cache (api_host, hash, url, expires_at) "
+        "VALUES (?, ?, ?, ?)",
+        (get_api_host(), url["hash"], json.dumps(url), url["expires_at"]),
+    )
+
+
+def find_url_in_info_cache(hash: str) -> Optional[Url]:
+    """
+    Returns not expired url info from local cache.
+    Expired urls are not returned, see `prune_url_info_cache`.
+    :param str hash: url hash
+    :rtype: Optional[Url]
+    """
+    row = (
+        get_connection()
+        .execute(
+            "SELECT url FROM url_info_cache WHERE api_host = ? AND hash = ? AND expires_at > ?",
+            (get_api_host(), hash, time.time()),
+        )
+        .fetchone()
+    )
+    return json.loads(row["url"]) if row is not None else None
+
+
+def prune_url_info_cache() -> None:
+    """
+    Deletes expired urls from local info cache.
+    :rtype: None
+    """
+    get_connection().execute(
+        "DELETE FROM url_info_cache WHERE api_host = ? AND expires_at <= ?",
+        (get_api_host(), time.time()),
+    )
+
+
+def delete_url_from_info_cache(hash: str) -> None:
+    """
+    Deletes url from local info cache, when url is deleted.
+    :param str hash: url hash
+    :rtype: None
+    """
+    get_connection().execute(
+        "DELETE FROM url_info_cache WHERE api_host = ? AND hash = ?", (get_api_host(), hash)
+    )
@@ -0,0 +1,109 @@
+"""
+    Services for printing long lists of urls and pastes.
+"""
+from typing import Any, Callable, Dict, Optional, Sequence, TextIO
+import csv
+import io
+import json
+import time
+
+import click
+
+OUTPUT_FORMATS = ("table", "ndjson", "csv")
+FLUSH_SIZE = 64 * 1024
+FLUSH_INTERVAL = 0.1
+
+
+class ListWriter:
+    """
+    Writes rows as human readable lines (table), JSON objects (ndjson) or CSV.
+    Rows are buffered and written in large chunks, but not less often than every
+    FLUSH_INTERVAL seconds, so first rows are shown before whole list is requested.
+    Interval is checked only on write, so call `flush` before waiting for next rows
+    (e.g. pass it as `on_page_end` of `iter_list`).
+    Lines are styled only in table format and only if output is terminal.
+    """
+
+    def __init__(
+        self,
+        output_format: str,
+        fields: Sequence[str],
+        format_line: Callable[[Dict[str, Any]], str],
+        *,
+        get_color: Callable[[Dict[str, Any]], Optional[str]] = lambda row: None,
+        title: Optional[str] = None,
+        file: Optional[TextIO] = None,
+    ) -> None:
+        """
+        :param str output_format: table, ndjson or csv
+        :param Sequence[str] fields: fields of rows in ndjson and csv formats
+        :param Callable format_line: returns line of row in table format
+        :param Callable get_color: returns color of row in table format, or None for no style
+        :param Optional[str] title: line printed before rows in table format
+        :param Optional[TextIO] file: output file, stdout by default
+        """
+        self.output_format = output_format
+        self.fields = fields
+        self.format_line = format_line
+        self.get_color = get_color
+        self.file = file if file is not None else click.get_text_stream("stdout")
+        self.is_styled = output_format == "table" and _is_terminal(self.file)
+        self._buffer = io.StringIO()
+        self._flushed_at = time.monotonic()
+        self._csv_writer = None
+        self._json_encoder = json.JSONEncoder(check_circular=False)
+        if output_format == "csv":
+            self._csv_writer = csv.DictWriter(
+                self._buffer, fieldnames=fields, extrasaction="ignore", lineterminator="\n"
+            )
+            self._csv_writer.writeheader()
+        elif output_format == "table" and title is not None:
+            self._buffer.write(title + "\n")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        """
+        Writes row to buffer, buffer is flushed if it is large or was not flushed for long.
+        :param Dict[str, Any] row: row with all fields
+        :rtype: None
+        """
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(row)
+        elif self.output_format == "ndjson":
+            self._buffer.write(
+                self._json_encoder.encode({field: row[field] for field in self.fields}) + "\n"
+            )
+        else:
+            line = self.format_line(row)
+            color = self.get_color(row) if self.is_styled else None
+            self._buffer.write((click.style(line, fg=color) if color else line) + "\n")
+
+        if (
+            self._buffer.tell() >= FLUSH_SIZE
+            or time.monotonic() - self._flushed_at >= FLUSH_INTERVAL
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes buffered rows to output file.
+        :rtype: None
+        """
+        data = self._buffer.getvalue()
+        if data:
+            click.echo(data, file=self.file, nl=False)
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        self._flushed_at = time.monotonic()
+
+    def __enter__(self) -> "ListWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.flush()
+
+
+def _is_terminal(file: TextIO) -> bool:
+    try:
+        return file.isatty()
+    except (AttributeError, ValueError):
+        return False
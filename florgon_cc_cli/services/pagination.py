@@ -0,0 +1,95 @@
+"""
+    Services for requesting lists of urls and pastes page by page.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import click
+
+from florgon_cc_cli import config
+from florgon_cc_cli.services.cache import execute_cached_json_api_method
+from florgon_cc_cli.services.config import get_value_from_config
+
+
+def iter_list(
+    api_method: str,
+    field: str,
+    *,
+    access_token: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    page_size: Optional[int] = None,
+    is_visible: Callable[[Dict[str, Any]], bool] = lambda item: True,
+    on_page_end: Callable[[], None] = lambda: None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields items of list API method. Pages are requested with `offset` and `limit` params
+    only when previous page is consumed, so first items can be used before whole list
+    is downloaded. If API does not paginate and returns whole list, it is sliced by client.
+    Prints error and exits application if API returns error.
+    :param str api_method: list API method, like `urls/`
+    :param str field: field of success response with list, like `urls`
+    :param Optional[str] access_token: Florgon OAuth token
+    :param int offset: number of items to skip
+    :param Optional[int] limit: max number of yielded items, all items if None
+    :param Optional[int] page_size: number of items in page, `page_size` config value by default
+    :param Callable is_visible: items, for which it returns False, are skipped
+                                and not counted in limit (e.g. deleted items)
+    :param Callable on_page_end: called when page is consumed, before next page is requested
+                                 (e.g. to flush buffered output)
+    :rtype: Iterator[Dict[str, Any]]
+    """
+    if page_size is None:
+        page_size = int(get_value_from_config("page_size") or config.DEFAULT_PAGE_SIZE)
+
+    def request_page(position: int, count: int) -> List[Dict[str, Any]]:
+        response = execute_cached_json_api_method(
+            api_method, params={"offset": position, "limit": count}, access_token=access_token
+        )
+        if "success" not in response:
+            click.secho(response["error"]["message"], err=True, fg="red")
+            raise click.exceptions.Exit(1)
+        return response["success"][field]
+
+    if limit == 0:
+        return
+    yielded = 0
+    for page in _iter_pages(request_page, offset, page_size):
+        for item in page:
+            if not is_visible(item):
+                continue
+            yield item
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+        on_page_end()
+
+
+def _iter_pages(
+    request_page: Callable[[int, int], List[Dict[str, Any]]], offset: int, page_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yields pages starting from offset. API does not paginate, if it returns more items
+    than requested or returns the same first item for other offset, then whole list is
+    sliced and no more pages are requested. For non-zero offset it is checked with
+    one-item request, because whole list may be shorter than page.
+    """
+    first_item = None
+    if offset:
+        first_page = request_page(0, 1)
+        if len(first_page) > 1:
+            yield first_page[offset:]
+            return
+        first_item = first_page[0] if first_page else None
+
+    position = offset
+    while True:
+        page = request_page(position, page_size)
+        if len(page) > page_size or (position and page and page[0] == first_item):
+            yield page[position:]
+            return
+        if not position and page:
+            first_item = page[0]
+        yield page
+        if len(page) < page_size:
+            return
+        position += page_size
@@ -2,22 +2,52 @@
     Services for working with single paste API or list.
 """
 
-from typing import Optional, Tuple, Union, NoReturn, List, Literal
+from io import TextIOWrapper
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+    NoReturn,
+    List,
+    Literal,
+)
 
 import click
+import hashlib
+import json
 import re
-from pick import pick
+import tempfile
+import requests
 
-from florgon_cc_cli.models.url import Url
 from florgon_cc_cli.services.api import (
     execute_json_api_method,
     execute_api_method,
+    iter_response_content,
     try_decode_response_to_json,
 )
+from florgon_cc_cli.services.cache import execute_cached_json_api_method, invalidate_cache
 from florgon_cc_cli import config
 from florgon_cc_cli.models.paste import Paste
 from florgon_cc_cli.models.error import Error
 from florgon_cc_cli.models.stats import Stats
+from florgon_cc_cli.services.config import get_value_from_config
+from florgon_cc_cli.services.files import get_files_digest, iter_files_chunks
+from florgon_cc_cli.services.history import find_history_entries, get_text_digest
+from florgon_cc_cli.services.index import (
+    delete_paste_from_index,
+    find_paste_in_index,
+    save_paste_to_index,
+)
+from florgon_cc_cli.services.pagination import iter_list
+from florgon_cc_cli.services.picker import pick_item
+from florgon_cc_cli.services.streaming import extract_json_string_field
+
+FIRST_LINE_MAX_LENGTH = 200
 
 
 def build_paste_open_url(hash: str) -> str:
@@ -33,7 +63,7 @@ def create_paste(
     access_token: Optional[str] = None,
 ) -> Union[Tuple[Literal[True], Paste], Tuple[Literal[False], Error]]:
     """
-    Creates paste from text.
+    Creates paste from text and saves it to local index of pastes.
     :param str text: paste text
     :param Optional[str] access_token: Florgon OAuth token that used for authorization.
                                      Defaults to None
@@ -51,6 +81,8 @@ def create_paste(
         access_token=access_token,
     )
     if "success" in response:
+        invalidate_cache()
+        save_paste_to_index(response["success"]["paste"], get_text_digest(text), access_token)
         response["success"]["paste"]["text"] = response["success"]["paste"]["text"].replace(
             "\\n", "\n"
         )
@@ -58,6 +90,183 @@ def create_paste(
     return False, response["error"]
 
 
+def create_paste_from_files(
+    files: List[TextIOWrapper],
+    *,
+    stats_is_public: bool = False,
+    burn_after_read: bool = False,
+    access_token: Optional[str] = None,
+    write_text: Optional[Callable[[str], Any]] = None,
+) -> Union[Tuple[Literal[True], Paste], Tuple[Literal[False], Error], NoReturn]:
+    """
+    Creates paste from concatenated files. Files are read, encoded and uploaded by chunks,
+    so memory usage does not depend on files size. Same for paste text in API response.
+    Paste is saved to local index of pastes by digest of files, computed while uploading.
+    Max size of files can be set with `max_paste_size` key in user config (in bytes).
+    :param List[TextIOWrapper] files: list of files, opened for reading (with mode 'r')
+    :param bool stats_is_public: makes url stats public for all users
+    :param bool burn_after_read: paste will be deleted after first reading
+    :param Optional[str] access_token: Florgon OAuth token that used for authorization.
+                                     Defaults to None
+    :param Optional[Callable[[str], Any]] write_text: called with pieces of paste text
+                                                      from API response
+    :return: Tuple with two elements.
+             First is a creaton status (True if successfully).
+             Seconds is a response body, paste text in it is empty.
+    :rtype: Tuple[True, Paste] if request is successfully, else Tuple[False, Error]
+    :raises FileTooLargeError: if files are larger than `max_paste_size`
+    """
+    chunk_size = int(get_value_from_config("chunk_size") or config.DEFAULT_CHUNK_SIZE)
+    max_size = get_value_from_config("max_paste_size")
+    chunks = iter_files_chunks(files, chunk_size, int(max_size) if max_size else None)
+    digest = hashlib.sha256()
+    response = execute_api_method(
+        "POST",
+        "pastes/",
+        body=_iter_paste_json_body(
+            _iter_digested_chunks(chunks, digest),
+            stats_is_public=stats_is_public,
+            burn_after_read=burn_after_read,
+        ),
+        access_token=access_token,
+        stream=True,
+    )
+    response = try_extract_text_from_response(response, write_text)
+    if "success" in response:
+        invalidate_cache()
+        save_paste_to_index(response["success"]["paste"], digest.hexdigest(), access_token)
+        return True, response["success"]["paste"]
+    return False, response["error"]
+
+
+def find_existing_paste(
+    text: Optional[str],
+    files: List[TextIOWrapper],
+    *,
+    stats_is_public: bool = False,
+    access_token: Optional[str] = None,
+) -> Tuple[Optional[Paste], List[TextIOWrapper]]:
+    """
+    Finds not expired paste with same text (or concatenated files) and owner in local index
+    of pastes, so it can be reused instead of uploading text again. Files are hashed by chunks.
+    Index is trusted without request, like for urls, pastes are removed from it when deleted.
+    :param Optional[str] text: paste text, if paste is not created from files
+    :param List[TextIOWrapper] files: list of files, opened for reading (with mode 'r')
+    :param bool stats_is_public: stats of paste should be public
+    :param Optional[str] access_token: access token of owner, None if anonymous
+    :return: Tuple with two elements.
+             First is a found paste (without text) or None.
+             Seconds is a list of files, that can be read again (see `get_files_digest`).
+    :rtype: Tuple[Optional[Paste], List[TextIOWrapper]]
+    :raises FileTooLargeError: if files are larger than `max_paste_size`
+    """
+    if files:
+        chunk_size = int(get_value_from_config("chunk_size") or config.DEFAULT_CHUNK_SIZE)
+        max_size = get_value_from_config("max_paste_size")
+        text_digest, files = get_files_digest(
+            files, chunk_size, int(max_size) if max_size else None
+        )
+    else:
+        text_digest = get_text_digest(text)
+    return find_paste_in_index(text_digest, stats_is_public, access_token), files
+
+
+def try_extract_text_from_response(
+    response: requests.Response, write_text: Optional[Callable[[str], Any]]
+) -> Union[Dict[str, Any], NoReturn]:
+    """
+    Tries to decode streamed paste response to json, passing paste text to `write_text`
+    piece by piece instead of keeping it in memory. Escaped newlines in text are unescaped.
+    :param requests.Response response: streamed response object
+    :param Optional[Callable[[str], Any]] write_text: called with pieces of paste text
+    :return: JSON dict with empty paste text if decoding is successfully, else exit application
+    :rtype: Union[Dict[str, Any], NoReturn]
+    """
+    chunk_size = int(get_value_from_config("chunk_size") or config.DEFAULT_CHUNK_SIZE)
+    try:
+        return extract_json_string_field(
+            iter_response_content(response, chunk_size), "text", write_text, unescape_newlines=True
+        )
+    except ValueError:
+        click.secho("Unable to decode API response as JSON!", fg="red", err=True)
+        raise click.exceptions.Exit(1)
+    finally:
+        response.close()
+
+
+def _iter_digested_chunks(chunks: Iterable[str], digest: Any) -> Iterator[str]:
+    """Yields chunks of text, updating digest with them."""
+    for chunk in chunks:
+        digest.update(chunk.encode())
+        yield chunk
+
+
+def _iter_paste_json_body(
+    chunks: Iterable[str], *, stats_is_public: bool, burn_after_read: bool
+) -> Iterator[bytes]:
+    """Encodes JSON body for paste creation from chunks of text."""
+    yield b'{"text": "'
+    for chunk in chunks:
+        yield json.dumps(chunk, ensure_ascii=False)[1:-1].encode()
+    yield (
+        f'", "stats_is_public": {json.dumps(stats_is_public)}, '
+        f'"burn_after_read": {json.dumps(burn_after_read)}}}'
+    ).encode()
+
+
+class PasteTextWriter:
+    """
+    Receives paste text by pieces (see `create_paste_from_files`), computes its digest and
+    first line, and keeps text itself in temporary file (in memory while text is small).
+    """
+
+    def __init__(self, keep_text: bool = True) -> None:
+        """
+        :param bool keep_text: keep text for `iter_text`, otherwise text is discarded
+        """
+        self._digest = hashlib.sha256()
+        self._first_line: List[str] = []
+        self._first_line_complete = False
+        self._text_file = (
+            tempfile.SpooledTemporaryFile(max_size=config.DEFAULT_CHUNK_SIZE, mode="w+")
+            if keep_text
+            else None
+        )
+
+    def write(self, piece: str) -> None:
+        self._digest.update(piece.encode())
+        if not self._first_line_complete:
+            line, newline, _ = piece.partition("\n")
+            self._first_line.append(line)
+            self._first_line_complete = bool(newline) or sum(map(len, self._first_line)) >= 50
+        if self._text_file is not None:
+            self._text_file.write(piece)
+
+    @property
+    def digest(self) -> str:
+        """Digest of text, like `services.history.get_text_digest`."""
+        return self._digest.hexdigest()
+
+    @property
+    def first_line(self) -> str:
+        return "".join(self._first_line)
+
+    def iter_text(self, chunk_size: int = config.DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """Yields kept text by chunks."""
+        self._text_file.seek(0)
+        return iter(lambda: self._text_file.read(chunk_size), "")
+
+    def close(self) -> None:
+        if self._text_file is not None:
+            self._text_file.close()
+
+    def __enter__(self) -> "PasteTextWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
 def get_pastes_list(
     access_token: Optional[str] = None,
 ) -> Union[Tuple[Literal[True], List[Paste]], Tuple[Literal[False], Error]]:
@@ -70,49 +279,107 @@ def get_pastes_list(
              First is a response status (True if successfully).
              Seconds is a response body.
     """
-    response = execute_json_api_method(
-        "GET",
-        "pastes/",
-        access_token=access_token,
-    )
+    response = execute_cached_json_api_method("pastes/", access_token=access_token)
     if "success" in response:
         pastes: List[Paste] = []
         for paste in response["success"]["pastes"]:
             # NOTE: This is temporary solution. Should be moved to cc-api.
             if not paste["is_deleted"]:
-                paste["text"] = paste["text"].replace("\\n", "\n")
-                pastes.append(paste)
+                pastes.append({**paste, "text": paste["text"].replace("\\n", "\n")})
         return True, pastes
     return False, response["error"]
 
 
-def request_hash_from_pastes_list(access_token: Optional[str] = None) -> Union[str, NoReturn]:
+def iter_pastes_list(
+    access_token: Optional[str] = None,
+    *,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    page_size: Optional[int] = None,
+    exclude_expired: bool = False,
+    on_page_end: Callable[[], None] = lambda: None,
+) -> Iterator[Paste]:
+    """
+    Yields user's pastes by access_token, next page is requested only when previous is consumed.
+    Prints error and exits application if API returns error.
+    :param Optional[str] access_token: access token
+    :param int offset: number of pastes to skip
+    :param Optional[int] limit: max number of pastes, all pastes if None
+    :param Optional[int] page_size: number of pastes requested at once
+    :param bool exclude_expired: skip expired pastes, they are not counted in limit
+    :param Callable on_page_end: called when page is consumed, before next page is requested
+    :rtype: Iterator[Paste]
+    """
+    pastes = iter_list(
+        "pastes/",
+        "pastes",
+        access_token=access_token,
+        offset=offset,
+        limit=limit,
+        page_size=page_size,
+        on_page_end=on_page_end,
+        # NOTE: This is temporary solution. Should be moved to cc-api.
+        is_visible=lambda paste: not paste["is_deleted"]
+        and not (exclude_expired and paste["is_expired"]),
+    )
+    for paste in pastes:
+        # Cached response is shared, so paste is copied.
+        yield {**paste, "text": paste["text"].replace("\\n", "\n")}
+
+
+def request_hash_from_pastes_list(
+    access_token: Optional[str] = None, from_history: bool = False
+) -> Union[str, NoReturn]:
     """
     Requests server for pastes list and requests user to choose one.
     :param str access_token: Access token
+    :param bool from_history: choose from local history instead of requesting server
     :returns: Paste hash
     :rtype: str
     """
-    success, response = get_pastes_list(access_token=access_token)
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
-        click.get_current_context().exit(1)
+    if from_history:
+        pastes = [
+            {"hash": entry["hash"], "text": entry["text_preview"] or ""}
+            for entry in find_history_entries("paste", expired=False)
+        ]
+    else:
+        success, response = get_pastes_list(access_token=access_token)
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            click.get_current_context().exit(1)
 
-    # TODO: This logic must be moved to API
-    pastes = [paste for paste in response if not paste["is_expired"] and not paste["is_deleted"]]
+        # TODO: This logic must be moved to API
+        pastes = [
+            paste for paste in response if not paste["is_expired"] and not paste["is_deleted"]
+        ]
     if not pastes:
         click.secho("You have not active pastes!", fg="red", err=True)
         click.get_current_context().exit(1)
 
-    nl = "\n"
-    pastes_formatted = [
-        f"{build_paste_open_url(paste['hash'])} - {paste['text'].split(nl)[0][:50] + '...'}"
-        for paste in pastes
-    ]
-    _, index = pick(pastes_formatted, "Choose one from your pastes:", indicator=">")
+    first_lines = [get_first_line(paste["text"]) for paste in pastes]
+    index = pick_item(
+        range(len(pastes)),
+        "Choose one from your pastes (type to search):",
+        lambda index: f"{build_paste_open_url(pastes[index]['hash'])} - "
+        f"{first_lines[index][:50]}...",
+        lambda index: f"{pastes[index]['hash']} {first_lines[index]}",
+    )
+    if index is None:
+        raise click.Abort()
     return pastes[index]["hash"]
 
 
+def get_first_line(text: str) -> str:
+    """
+    Returns first line of text (not longer than FIRST_LINE_MAX_LENGTH)
+    without splitting whole text, that may be large.
+    :param str text: paste text
+    :rtype: str
+    """
+    end = text.find("\n", 0, FIRST_LINE_MAX_LENGTH)
+    return text[:end] if end != -1 else text[:FIRST_LINE_MAX_LENGTH]
+
+
 def extract_hash_from_paste_short_url(short_url: str) -> Union[str, NoReturn]:
     """
     Extracts hash from paste short url.
@@ -134,17 +401,20 @@ def extract_hash_from_paste_short_url(short_url: str) -> Union[str, NoReturn]:
     return short_url_hashes[0]
 
 
-def get_paste_info_by_hash(hash: str) -> Tuple[bool, Union[Url, Error]]:
+def get_paste_info_by_hash(hash: str) -> Tuple[bool, Union[Paste, Error]]:
     """
     Returns info about paste short url by hash.
     :param str hash: short url hash
     :return: Tuple with two elements.
              First is a response status (True if successfully).
              Seconds is a response body.
-    :rtype: Tuple[True, Url] if request is successfully, else Tuple[True, Error]
+    :rtype: Tuple[True, Paste] if request is successfully, else Tuple[True, Error]
     """
     response = execute_json_api_method("GET", f"pastes/{hash}/")
     if "success" in response:
+        if response["success"]["paste"]["burn_after_read"]:
+            # Paste is deleted after reading.
+            invalidate_cache()
         response["success"]["paste"]["text"] = response["success"]["paste"]["text"].replace(
             "\\n", "\n"
         )
@@ -152,6 +422,30 @@ def get_paste_info_by_hash(hash: str) -> Tuple[bool, Union[Url, Error]]:
     return False, response["error"]
 
 
+def stream_paste_by_hash(
+    hash: str, write_text: Callable[[str], Any]
+) -> Union[Tuple[Literal[True], Paste], Tuple[Literal[False], Error], NoReturn]:
+    """
+    Returns info about paste by hash, like `get_paste_info_by_hash`, but paste text is
+    downloaded, decoded and unescaped incrementally and passed to `write_text` piece by piece,
+    so memory usage does not depend on paste size.
+    :param str hash: paste hash
+    :param Callable[[str], Any] write_text: called with pieces of paste text as they arrive
+    :return: Tuple with two elements.
+             First is a response status (True if successfully).
+             Seconds is a response body, paste text in it is empty.
+    :rtype: Tuple[True, Paste] if request is successfully, else Tuple[False, Error]
+    """
+    response = execute_api_method("GET", f"pastes/{hash}/", stream=True)
+    response = try_extract_text_from_response(response, write_text)
+    if "success" in response:
+        if response["success"]["paste"]["burn_after_read"]:
+            # Paste is deleted after reading.
+            invalidate_cache()
+        return True, response["success"]["paste"]
+    return False, response["error"]
+
+
 def delete_paste_by_hash(
     hash: str, access_token: Optional[str] = None
 ) -> Union[Tuple[bool, Optional[Error]], NoReturn]:
@@ -167,8 +461,10 @@ def delete_paste_by_hash(
     """
     response = execute_api_method("DELETE", f"pastes/{hash}/", access_token=access_token)
     if response.status_code == 204:
+        invalidate_cache()
+        delete_paste_from_index(hash)
         return (True,)
-    return try_decode_response_to_json(response)
+    return False, try_decode_response_to_json(response)["error"]
 
 
 def get_paste_stats_by_hash(
@@ -216,4 +512,4 @@ def clear_paste_stats_by_hash(
     response = execute_api_method("DELETE", f"pastes/{hash}/stats", access_token=access_token)
     if response.status_code == 204:
         return (True,)
-    return try_decode_response_to_json(response)
+    return False, try_decode_response_to_json(response)["error"]
@@ -0,0 +1,165 @@
+"""
+    Interactive picker with incremental search, used to choose url or paste from long lists.
+"""
+from typing import Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+import curses
+import os
+
+from florgon_cc_cli.services.daemon import require_terminal
+
+T = TypeVar("T")
+
+KEY_ENTER = (curses.KEY_ENTER, "\n", "\r")
+KEY_BACKSPACE = (curses.KEY_BACKSPACE, "\b", "\x7f")
+KEY_ESCAPE = "\x1b"
+HEADER_HEIGHT = 2
+
+
+class Picker(Generic[T]):
+    """
+    Picker state. Search index (lowercased text of every item) is built once, items
+    are formatted only when they are visible. Typed query narrows previous matches,
+    so every keystroke filters less items, and results of shorter queries are kept
+    for backspace.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[T],
+        title: str,
+        format_item: Callable[[T], str],
+        get_search_text: Callable[[T], str],
+    ) -> None:
+        """
+        :param Sequence[T] items: items to choose from
+        :param str title: title, shown above the list
+        :param Callable[[T], str] format_item: returns item line shown in list
+        :param Callable[[T], str] get_search_text: returns item text, which query is searched in
+        """
+        self.items = items
+        self.title = title
+        self.format_item = format_item
+        self.search_index = [get_search_text(item).lower() for item in items]
+        self.query = ""
+        self.matches: List[int] = list(range(len(items)))
+        self.selected = 0
+        self.offset = 0
+        self._results: List[Tuple[str, List[int]]] = [("", self.matches)]
+
+    def set_query(self, query: str) -> None:
+        """
+        Filters items, every word of query must be found in item search text.
+        :param str query: search query
+        :rtype: None
+        """
+        while len(self._results) > 1 and not query.startswith(self._results[-1][0]):
+            self._results.pop()
+        base_query, matches = self._results[-1]
+        if query != base_query:
+            for word in query.lower().split():
+                matches = [index for index in matches if word in self.search_index[index]]
+            self._results.append((query, matches))
+        self.query = query
+        self.matches = matches
+        self.selected = self.offset = 0
+
+    def move(self, delta: int, height: int) -> None:
+        """
+        Moves selection and scrolls list, so selected item is visible.
+        :param int delta: number of items to move by, negative to move up
+        :param int height: number of visible items
+        :rtype: None
+        """
+        self.selected = max(0, min(len(self.matches) - 1, self.selected + delta))
+        if self.selected < self.offset:
+            self.offset = self.selected
+        elif self.selected >= self.offset + height:
+            self.offset = self.selected - height + 1
+
+    def get_selected_index(self) -> Optional[int]:
+        """
+        Returns index of selected item in items or None if nothing matches query.
+        :rtype: Optional[int]
+        """
+        return self.matches[self.selected] if self.matches else None
+
+    def draw(self, screen) -> None:
+        """Draws title, query and visible items."""
+        screen.erase()
+        height, width = screen.getmaxyx()
+        screen.addnstr(0, 0, self.title, width - 1, curses.A_BOLD)
+        screen.addnstr(
+            1, 0, f"Search: {self.query}  ({len(self.matches)}/{len(self.items)})", width - 1
+        )
+        start, end = self.offset, self.offset + height - HEADER_HEIGHT
+        visible = self.matches[start:end]
+        for row, index in enumerate(visible):
+            is_selected = self.offset + row == self.selected
+            line = ("> " if is_selected else "  ") + self.format_item(self.items[index])
+            screen.addnstr(
+                row + HEADER_HEIGHT,
+                0,
+                line,
+                width - 1,
+                curses.A_REVERSE if is_selected else curses.A_NORMAL,
+            )
+        screen.move(1, min(width - 1, len("Search: ") + len(self.query)))
+        screen.refresh()
+
+    def run(self, screen) -> Optional[int]:
+        """
+        Handles keys until item is chosen or picker is closed.
+        :rtype: Optional[int]
+        :return: index of chosen item or None if picker is closed with Escape
+        """
+        while True:
+            self.draw(screen)
+            list_height = max(1, screen.getmaxyx()[0] - HEADER_HEIGHT)
+            key = screen.get_wch()
+            if key in KEY_ENTER:
+                if self.matches:
+                    return self.get_selected_index()
+            elif key == KEY_ESCAPE:
+                return None
+            elif key in KEY_BACKSPACE:
+                self.set_query(self.query[:-1])
+            elif key == curses.KEY_UP:
+                self.move(-1, list_height)
+            elif key == curses.KEY_DOWN:
+                self.move(1, list_height)
+            elif key == curses.KEY_PPAGE:
+                self.move(-list_height, list_height)
+            elif key == curses.KEY_NPAGE:
+                self.move(list_height, list_height)
+            elif key == curses.KEY_HOME:
+                self.move(-len(self.matches), list_height)
+            elif key == curses.KEY_END:
+                self.move(len(self.matches), list_height)
+            elif isinstance(key, str) and key.isprintable():
+                self.set_query(self.query + key)
+
+
+def pick_item(
+    items: Sequence[T],
+    title: str,
+    format_item: Callable[[T], str],
+    get_search_text: Callable[[T], str],
+) -> Optional[int]:
+    """
+    Shows picker in terminal and returns index of chosen item.
+    :param Sequence[T] items: items to choose from
+    :param str title: title, shown above the list
+    :param Callable[[T], str] format_item: returns item line shown in list
+    :param Callable[[T], str] get_search_text: returns item text, which query is searched in
+    :rtype: Optional[int]
+    :return: index of chosen item or None if picker is closed
+    :raises TerminalRequiredError: if command is run by daemon
+    """
+    require_terminal()
+    picker = Picker(items, title, format_item, get_search_text)
+    # Escape closes picker without default 1 second delay.
+    os.environ.setdefault("ESCDELAY", "25")
+    try:
+        return curses.wrapper(picker.run)
+    except KeyboardInterrupt:
+        return None
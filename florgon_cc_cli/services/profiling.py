@@ -0,0 +1,67 @@
+"""
+    Services for profiling command, enabled with --profile option.
+"""
+from typing import Callable, Optional
+
+import click
+
+PROFILE_TOP_LIMIT = 25
+
+
+def start_profiling(kind: str, output: Optional[str] = None) -> Callable[[], None]:
+    """
+    Starts CPU (cProfile) or memory (tracemalloc) profiling.
+    Returns function that stops profiling and prints results to stderr.
+    If output is passed, raw results are also dumped to it: pstats file for CPU profile
+    or tracemalloc snapshot for memory profile.
+    NOTE: CPU profile includes only current thread, memory profile includes all threads.
+    :param str kind: "cpu" or "memory"
+    :param Optional[str] output: path to dump raw results
+    :rtype: Callable[[], None]
+    :return: function that stops profiling
+    """
+    if kind == "cpu":
+        return _start_cpu_profiling(output)
+    return _start_memory_profiling(output)
+
+
+def _start_cpu_profiling(output: Optional[str]) -> Callable[[], None]:
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    def stop() -> None:
+        profiler.disable()
+        if output:
+            profiler.dump_stats(output)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(
+            PROFILE_TOP_LIMIT
+        )
+        click.echo(stream.getvalue(), err=True)
+
+    return stop
+
+
+def _start_memory_profiling(output: Optional[str]) -> Callable[[], None]:
+    import tracemalloc
+
+    tracemalloc.start()
+
+    def stop() -> None:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if output:
+            snapshot.dump(output)
+        click.echo(
+            f"Allocated memory: {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB", err=True
+        )
+        click.echo(f"Top {PROFILE_TOP_LIMIT} allocations by line:", err=True)
+        for statistic in snapshot.statistics("lineno")[:PROFILE_TOP_LIMIT]:
+            click.echo(str(statistic), err=True)
+
+    return stop
@@ -0,0 +1,118 @@
+"""
+    Services for deleting many urls or pastes at once.
+"""
+from datetime import datetime
+from typing import Callable, Iterable, List, Literal, Optional, Pattern, TypeVar
+import re
+
+import click
+
+from florgon_cc_cli.services.concurrency import map_concurrently
+from florgon_cc_cli.services.history import mark_deleted_in_history
+
+T = TypeVar("T")
+
+HASH_REGEX = re.compile(r"[a-zA-Z0-9]{6}")
+
+
+def select_items_to_prune(
+    items: Iterable[T],
+    *,
+    field: str,
+    expired: bool = False,
+    expires_before: Optional[datetime] = None,
+    pattern: Optional[Pattern] = None,
+) -> List[T]:
+    """
+    Selects urls or pastes, that match all passed conditions.
+    :param Iterable[T] items: urls or pastes
+    :param str field: field matched with pattern, `redirect_url` or `text`
+    :param bool expired: select only expired items
+    :param Optional[datetime] expires_before: select only items, that expire before this moment
+    :param Optional[Pattern] pattern: select only items, which field matches pattern
+    :rtype: List[T]
+    :return: selected items
+    """
+    expires_before_timestamp = expires_before.timestamp() if expires_before else None
+    return [
+        item
+        for item in items
+        if (not expired or item["is_expired"])
+        and (expires_before_timestamp is None or item["expires_at"] < expires_before_timestamp)
+        and (pattern is None or pattern.search(item[field]))
+    ]
+
+
+def read_hashes(
+    short_urls: Iterable[str], extract_hash: Callable[[str], str], file=None
+) -> List[str]:
+    """
+    Returns hashes of short urls from options and file (one per line). Lines of file
+    may be short urls or hashes. Duplicates are removed, order is kept.
+    Exits application if any short url is invalid, so nothing is deleted.
+    :param Iterable[str] short_urls: short urls
+    :param Callable[[str], str] extract_hash: `extract_hash_from_short_url` or
+                                              `extract_hash_from_paste_short_url`
+    :param file: text file, like stdin
+    :rtype: List[str]
+    """
+    values = list(short_urls)
+    if file is not None:
+        values.extend(line.strip() for line in file if line.strip())
+    hashes = (value if HASH_REGEX.fullmatch(value) else extract_hash(value) for value in values)
+    return list(dict.fromkeys(hashes))
+
+
+def delete_by_hashes(
+    kind: Literal["url", "paste"],
+    hashes: Iterable[str],
+    delete_by_hash: Callable,
+    build_open_url: Callable[[str], str],
+    *,
+    access_token: Optional[str] = None,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+) -> int:
+    """
+    Deletes urls or pastes concurrently, prints result of every deletion and summary.
+    Deleted items are marked as deleted in local history.
+    :param Literal["url", "paste"] kind: url or paste
+    :param Iterable[str] hashes: url or paste hashes
+    :param Callable delete_by_hash: `delete_url_by_hash` or `delete_paste_by_hash`
+    :param Callable[[str], str] build_open_url: `build_open_url` or `build_paste_open_url`
+    :param Optional[str] access_token: access token
+    :param Optional[int] workers: max number of concurrent requests
+    :param bool dry_run: only print what would be deleted
+    :rtype: int
+    :return: number of failed deletions
+    """
+    if dry_run:
+        count = 0
+        for hash in hashes:
+            click.echo(f"{build_open_url(hash)} - would be deleted")
+            count += 1
+        click.echo(f"{count} {kind}s would be deleted.")
+        return 0
+
+    results = map_concurrently(
+        lambda hash: delete_by_hash(hash=hash, access_token=access_token), hashes, workers
+    )
+    deleted = failed = 0
+    for hash, result in results:
+        if isinstance(result, Exception):
+            failed += 1
+            # Exit means that error was already printed by API services.
+            if not isinstance(result, click.exceptions.Exit):
+                click.secho(f"{build_open_url(hash)} - {result}", err=True, fg="red")
+            continue
+        success, *response = result
+        if not success:
+            failed += 1
+            click.secho(f"{build_open_url(hash)} - {response[0]['message']}", err=True, fg="red")
+            continue
+        deleted += 1
+        mark_deleted_in_history(kind, hash)
+        click.echo(f"{build_open_url(hash)} - deleted")
+
+    click.secho(f"Deleted {deleted} {kind}s, failed {failed}.", fg="red" if failed else "green")
+    return failed
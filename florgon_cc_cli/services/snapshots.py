@@ -0,0 +1,364 @@
+"""
+    Services for working with local store of stats snapshots, so stats trends
+    can be queried without requesting API.
+"""
+from collections import Counter
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+import sqlite3
+import time
+
+from florgon_cc_cli.models.stats import Views
+from florgon_cc_cli.services.api import get_api_host
+from florgon_cc_cli.services.storage import get_connection, transaction
+
+EPOCH_DAY = date(1970, 1, 1).toordinal()
+# Same dates are in stats of every link, so they are parsed once.
+DATES_CACHE_SIZE = 16 * 1024
+# SQL expressions, which convert day (number of days since epoch) to period.
+PERIOD_EXPRESSIONS = {
+    "day": "date(day * 86400, 'unixepoch')",
+    # Weeks start on Monday, epoch day was Thursday.
+    "week": "date((day - (day + 3) % 7) * 86400, 'unixepoch')",
+    "month": "strftime('%Y-%m', day * 86400, 'unixepoch')",
+}
+
+
+def save_stats_snapshot(
+    kind: Literal["url", "paste"], views_by_hash: Iterable[Tuple[str, Views]]
+) -> int:
+    """
+    Saves snapshot of stats (with numbers, not percents) in one transaction.
+    Only values that are changed since last snapshot are stored.
+    :param Literal["url", "paste"] kind: url or paste
+    :param Iterable[Tuple[str, Views]] views_by_hash: pairs of hash and its views
+    :rtype: int
+    :return: number of stored values
+    """
+    api_host = get_api_host()
+    taken_at = int(time.time())
+    stored = 0
+    with transaction(get_connection()) as connection:
+        for hash, views in views_by_hash:
+            link_id = _get_link_id(connection, api_host, kind, hash)
+            stored += _save_total(connection, link_id, taken_at, views["total"])
+            stored += _save_referers(connection, link_id, taken_at, views.get("by_referers") or {})
+            stored += _save_dates(
+                connection, api_host, kind, link_id, taken_at, views.get("by_dates") or {}
+            )
+    return stored
+
+
+def query_views_by_period(
+    group_by: Literal["day", "week", "month"] = "day",
+    *,
+    kind: Optional[Literal["url", "paste"]] = None,
+    hashes: Sequence[str] = (),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> List[Tuple[str, int]]:
+    """
+    Returns views by days, weeks or months from stored snapshots, summed for all links.
+    :param Literal["day", "week", "month"] group_by: period
+    :param Optional[Literal["url", "paste"]] kind: only urls or only pastes, both if None
+    :param Sequence[str] hashes: only links with these hashes, all if empty
+    :param Optional[date] since: first day (inclusive)
+    :param Optional[date] until: last day (inclusive)
+    :rtype: List[Tuple[str, int]]
+    :return: pairs of period and views, in chronological order
+    """
+    if hashes:
+        conditions, parameters = _build_links_conditions(kind, hashes)
+        source = (
+            "stats_current_dates JOIN stats_links ON stats_links.id = stats_current_dates.link_id"
+        )
+    else:
+        # Views of all links are summed by days when snapshots are saved.
+        conditions, parameters = ["api_host = ?"], [get_api_host()]
+        if kind is not None:
+            conditions.append("kind = ?")
+            parameters.append(kind)
+        source = "stats_days"
+    _add_range_conditions(
+        conditions,
+        parameters,
+        "day",
+        _to_day(since) if since is not None else None,
+        _to_day(until) if until is not None else None,
+    )
+    cursor = get_connection().execute(
+        f"SELECT {PERIOD_EXPRESSIONS[group_by]} AS period, SUM(views) FROM {source} "
+        f"WHERE {' AND '.join(conditions)} GROUP BY period ORDER BY period",
+        parameters,
+    )
+    return [(period, views) for period, views in cursor]
+
+
+def query_top_links(
+    limit: int,
+    *,
+    kind: Optional[Literal["url", "paste"]] = None,
+    hashes: Sequence[str] = (),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> List[Tuple[str, str, int]]:
+    """
+    Returns links with most views in period from stored snapshots.
+    :param int limit: max number of links
+    :param Optional[Literal["url", "paste"]] kind: only urls or only pastes, both if None
+    :param Sequence[str] hashes: only links with these hashes, all if empty
+    :param Optional[date] since: first day (inclusive)
+    :param Optional[date] until: last day (inclusive)
+    :rtype: List[Tuple[str, str, int]]
+    :return: tuples of kind, hash and views, most viewed first
+    """
+    # Views of whole months are taken from monthly rollup, days are read only at range edges.
+    first_month = last_month = None
+    if since is not None:
+        first_month = _to_month(since) + (since.day != 1)
+    if until is not None:
+        last_month = _to_month(until) - ((until + timedelta(days=1)).day != 1)
+
+    views: Counter = Counter()
+    day_ranges = []
+    if first_month is not None and last_month is not None and first_month > last_month:
+        day_ranges.append((_to_day(since), _to_day(until)))
+    else:
+        views.update(
+            _sum_links_views(kind, hashes, "stats_months", "month", first_month, last_month)
+        )
+        if since is not None and _to_day(since) < _get_month_first_day(first_month):
+            day_ranges.append((_to_day(since), _get_month_first_day(first_month) - 1))
+        if until is not None and _get_month_first_day(last_month + 1) <= _to_day(until):
+            day_ranges.append((_get_month_first_day(last_month + 1), _to_day(until)))
+    for first_day, last_day in day_ranges:
+        views.update(
+            _sum_links_views(kind, hashes, "stats_current_dates", "day", first_day, last_day)
+        )
+
+    top = sorted(views.items(), key=lambda item: (-item[1], item[0][1]))[:limit]
+    return [(link_kind, hash, link_views) for (link_kind, hash), link_views in top]
+
+
+def query_top_referers(
+    limit: int,
+    *,
+    kind: Optional[Literal["url", "paste"]] = None,
+    hashes: Sequence[str] = (),
+    until: Optional[date] = None,
+) -> List[Tuple[str, int]]:
+    """
+    Returns referers with most views, summed for all links. API returns views by referers
+    for whole time, so they are taken from last snapshot before end of `until` day.
+    :param int limit: max number of referers
+    :param Optional[Literal["url", "paste"]] kind: only urls or only pastes, both if None
+    :param Sequence[str] hashes: only links with these hashes, all if empty
+    :param Optional[date] until: last day (inclusive)
+    :rtype: List[Tuple[str, int]]
+    :return: pairs of referer and views, most viewed first
+    """
+    conditions, parameters = _build_links_conditions(kind, hashes)
+    if until is None:
+        source = (
+            "SELECT referer, views FROM stats_current_referers "
+            "JOIN stats_links ON stats_links.id = stats_current_referers.link_id "
+            f"WHERE {' AND '.join(conditions)}"
+        )
+    else:
+        # Old values are read from history, bare columns are taken from row with max taken_at.
+        conditions.append("stats_referers.taken_at < ?")
+        parameters.append((_to_day(until) + 1) * 86400)
+        source = (
+            "SELECT referer, views, MAX(taken_at) FROM stats_referers "
+            "JOIN stats_links ON stats_links.id = stats_referers.link_id "
+            f"WHERE {' AND '.join(conditions)} GROUP BY link_id, referer"
+        )
+    cursor = get_connection().execute(
+        f"SELECT referer, SUM(views) AS total FROM ({source}) "
+        "GROUP BY referer ORDER BY total DESC, referer LIMIT ?",
+        [*parameters, limit],
+    )
+    return [(referer, views) for referer, views in cursor]
+
+
+def _get_link_id(connection: sqlite3.Connection, api_host: str, kind: str, hash: str) -> int:
+    """Returns id of link, link is created if needed."""
+    connection.execute(
+        "INSERT OR IGNORE INTO stats_links (api_host, kind, hash) VALUES (?, ?, ?)",
+        (api_host, kind, hash),
+    )
+    return connection.execute(
+        "SELECT id FROM stats_links WHERE api_host = ? AND kind = ? AND hash = ?",
+        (api_host, kind, hash),
+    ).fetchone()[0]
+
+
+def _save_total(connection: sqlite3.Connection, link_id: int, taken_at: int, views: int) -> int:
+    """Saves total views of link, if they are changed. Returns number of stored values."""
+    row = connection.execute(
+        "SELECT views FROM stats_totals WHERE link_id = ? ORDER BY taken_at DESC LIMIT 1",
+        (link_id,),
+    ).fetchone()
+    if row is not None and row[0] == views:
+        return 0
+    connection.execute(
+        "INSERT OR REPLACE INTO stats_totals (link_id, taken_at, views) VALUES (?, ?, ?)",
+        (link_id, taken_at, views),
+    )
+    return 1
+
+
+def _save_referers(
+    connection: sqlite3.Connection, link_id: int, taken_at: int, by_referers: Dict[str, int]
+) -> int:
+    """Saves views by referers of link, that are changed. Returns number of stored values."""
+    current = _get_current_views(connection, "stats_current_referers", "referer", link_id)
+    changed = [
+        (link_id, referer, views)
+        for referer, views in by_referers.items()
+        if current.get(referer) != views
+    ]
+    connection.executemany(
+        "INSERT OR REPLACE INTO stats_referers (link_id, referer, taken_at, views) "
+        f"VALUES (?, ?, {taken_at}, ?)",
+        changed,
+    )
+    connection.executemany(
+        "INSERT OR REPLACE INTO stats_current_referers (link_id, referer, views) VALUES (?, ?, ?)",
+        changed,
+    )
+    return len(changed)
+
+
+def _save_dates(
+    connection: sqlite3.Connection,
+    api_host: str,
+    kind: str,
+    link_id: int,
+    taken_at: int,
+    by_dates: Dict[str, int],
+) -> int:
+    """
+    Saves views by dates of link, that are changed, and adds differences to rollups.
+    Returns number of stored values.
+    """
+    current = _get_current_views(connection, "stats_current_dates", "day", link_id)
+    changed = []
+    days_differences: Counter = Counter()
+    months_differences: Counter = Counter()
+    for day_date, views in by_dates.items():
+        day_and_month = _parse_date(day_date)
+        if day_and_month is None:
+            continue
+        day, month = day_and_month
+        current_views = current.get(day)
+        if current_views == views:
+            continue
+        changed.append((link_id, day, views))
+        days_differences[day] += views - (current_views or 0)
+        months_differences[month] += views - (current_views or 0)
+
+    connection.executemany(
+        "INSERT OR REPLACE INTO stats_dates (link_id, day, taken_at, views) "
+        f"VALUES (?, ?, {taken_at}, ?)",
+        changed,
+    )
+    connection.executemany(
+        "INSERT OR REPLACE INTO stats_current_dates (link_id, day, views) VALUES (?, ?, ?)",
+        changed,
+    )
+    connection.executemany(
+        "INSERT INTO stats_months (link_id, month, views) VALUES (?, ?, ?) "
+        "ON CONFLICT (link_id, month) DO UPDATE SET views = views + excluded.views",
+        [(link_id, month, difference) for month, difference in months_differences.items()],
+    )
+    connection.executemany(
+        "INSERT INTO stats_days (api_host, kind, day, views) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (api_host, kind, day) DO UPDATE SET views = views + excluded.views",
+        [(api_host, kind, day, difference) for day, difference in days_differences.items()],
+    )
+    return len(changed)
+
+
+def _get_current_views(
+    connection: sqlite3.Connection, table: str, key_column: str, link_id: int
+) -> Dict:
+    """Returns latest stored views of link by referers or days."""
+    return dict(
+        connection.execute(f"SELECT {key_column}, views FROM {table} WHERE link_id = ?", (link_id,))
+    )
+
+
+def _sum_links_views(
+    kind: Optional[str],
+    hashes: Sequence[str],
+    table: str,
+    column: str,
+    first: Optional[int],
+    last: Optional[int],
+) -> Dict[Tuple[str, str], int]:
+    """Returns views of links by kind and hash, summed for days or months in range."""
+    conditions, parameters = _build_links_conditions(kind, hashes)
+    _add_range_conditions(conditions, parameters, f"{table}.{column}", first, last)
+    cursor = get_connection().execute(
+        f"SELECT stats_links.kind, stats_links.hash, SUM({table}.views) FROM stats_links "
+        f"JOIN {table} ON {table}.link_id = stats_links.id "
+        f"WHERE {' AND '.join(conditions)} GROUP BY stats_links.id",
+        parameters,
+    )
+    return {(kind, hash): views for kind, hash, views in cursor}
+
+
+def _build_links_conditions(kind: Optional[str], hashes: Sequence[str]) -> Tuple[List[str], List]:
+    """Returns SQL conditions and parameters for links filters."""
+    conditions = ["stats_links.api_host = ?"]
+    parameters: list = [get_api_host()]
+    if kind is not None:
+        conditions.append("stats_links.kind = ?")
+        parameters.append(kind)
+    if hashes:
+        conditions.append(f"stats_links.hash IN ({', '.join('?' * len(hashes))})")
+        parameters.extend(hashes)
+    return conditions, parameters
+
+
+def _add_range_conditions(
+    conditions: List[str],
+    parameters: List,
+    column: str,
+    first: Optional[int],
+    last: Optional[int],
+) -> None:
+    """Adds SQL conditions for column to be in range (inclusive), bound is skipped if None."""
+    if first is not None:
+        conditions.append(f"{column} >= ?")
+        parameters.append(first)
+    if last is not None:
+        conditions.append(f"{column} <= ?")
+        parameters.append(last)
+
+
+@lru_cache(maxsize=DATES_CACHE_SIZE)
+def _parse_date(day_date: str) -> Optional[Tuple[int, int]]:
+    """Returns day and month of date from stats, or None if date is invalid."""
+    try:
+        parsed_date = date.fromisoformat(day_date)
+    except ValueError:
+        return None
+    return _to_day(parsed_date), _to_month(parsed_date)
+
+
+def _to_day(day_date: date) -> int:
+    """Returns number of days since epoch."""
+    return day_date.toordinal() - EPOCH_DAY
+
+
+def _to_month(day_date: date) -> int:
+    """Returns month of date as `year * 12 + month - 1`."""
+    return day_date.year * 12 + day_date.month - 1
+
+
+def _get_month_first_day(month: int) -> int:
+    """Returns first day of month as number of days since epoch."""
+    return _to_day(date(month // 12, month % 12 + 1, 1))
@@ -0,0 +1,290 @@
+"""
+    Services for working with url and paste stats.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import shutil
+import time
+import unicodedata
+
+import click
+
+from florgon_cc_cli.models.stats import Views
+from florgon_cc_cli.services.concurrency import map_concurrently
+from florgon_cc_cli.services.daemon import require_terminal
+
+DEFAULT_WATCH_INTERVAL = 2
+DEFAULT_WATCH_MAX_INTERVAL = 60
+
+
+def get_aggregated_stats(
+    hashes: Iterable[str],
+    get_stats_by_hash: Callable,
+    *,
+    access_token: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> Tuple[Views, Dict[str, str]]:
+    """
+    Requests stats of every url or paste concurrently and merges them.
+    Stats are requested as numbers, so merged percents can be computed correctly.
+    :param Iterable[str] hashes: url or paste hashes
+    :param Callable get_stats_by_hash: `get_url_stats_by_hash` or `get_paste_stats_by_hash`
+    :param Optional[str] access_token: access token
+    :param Optional[int] workers: max number of concurrent requests
+    :return: Tuple with two elements.
+             First is merged views, with numbers.
+             Second is error messages by hash, for stats that was not requested.
+    :rtype: Tuple[Views, Dict[str, str]]
+    """
+    results = map_concurrently(
+        lambda hash: get_stats_by_hash(
+            hash,
+            url_views_by_referers_as="number",
+            url_views_by_dates_as="number",
+            access_token=access_token,
+        ),
+        hashes,
+        workers,
+    )
+    total = 0
+    by_referers: Counter = Counter()
+    by_dates: Counter = Counter()
+    errors: Dict[str, str] = {}
+    for hash, result in results:
+        if isinstance(result, Exception):
+            errors[hash] = str(result) or "Unable to request stats!"
+            continue
+        success, views = result
+        if not success:
+            errors[hash] = views["message"]
+            continue
+        total += views["total"]
+        by_referers.update(views.get("by_referers") or {})
+        by_dates.update(views.get("by_dates") or {})
+
+    return {"total": total, "by_referers": dict(by_referers), "by_dates": dict(by_dates)}, errors
+
+
+def format_views(
+    views: Views,
+    referers_as: str = "percent",
+    dates_as: str = "percent",
+    top_referers: Optional[int] = None,
+) -> Views:
+    """
+    Converts views with numbers to requested form: referers are sorted by views,
+    dates are sorted chronologically, percents are computed from numbers.
+    :param Views views: views with numbers
+    :param str referers_as: "percent" or "number"
+    :param str dates_as: "percent" or "number"
+    :param Optional[int] top_referers: keep only top N referers, percents are still
+                                       computed from all referers
+    :rtype: Views
+    """
+    by_referers = sorted(views["by_referers"].items(), key=lambda item: (-item[1], item[0]))
+    by_dates = sorted(views["by_dates"].items())
+    return {
+        "total": views["total"],
+        "by_referers": _to_percents(by_referers, referers_as == "percent", top_referers),
+        "by_dates": _to_percents(by_dates, dates_as == "percent"),
+    }
+
+
+def print_views(views: Views, referers_as: str = "percent", dates_as: str = "percent") -> None:
+    """
+    Prints views, received from API or formatted with `format_views`.
+    :param Views views: views
+    :param str referers_as: "percent" or "number"
+    :param str dates_as: "percent" or "number"
+    :rtype: None
+    """
+    click.echo("Total views: " + click.style(views["total"], fg="green"))
+    if views.get("by_referers"):
+        click.echo("Views by referers:")
+        for referer in views["by_referers"]:
+            click.echo(
+                f"\t{referer} - {views['by_referers'][referer]}"
+                + "%" * int(referers_as == "percent")
+            )
+
+    if views.get("by_dates"):
+        click.echo("Views by dates:")
+        for date in views["by_dates"]:
+            click.echo(f"\t{date} - {views['by_dates'][date]}" + "%" * int(dates_as == "percent"))
+
+
+def watch_stats(
+    hashes: Sequence[str],
+    get_stats_by_hash: Callable,
+    build_open_url: Callable[[str], str],
+    *,
+    referers_as: str = "percent",
+    dates_as: str = "percent",
+    access_token: Optional[str] = None,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    max_interval: float = DEFAULT_WATCH_MAX_INTERVAL,
+) -> None:
+    """
+    Polls stats of urls or pastes concurrently and prints them until interrupted.
+    Polling interval is doubled (up to max_interval) while stats are not changed,
+    and is reset when they are changed. In terminal only changed lines are redrawn,
+    otherwise (or if lines do not fit in terminal) only changed lines are printed with time,
+    like log.
+    :param Sequence[str] hashes: url or paste hashes
+    :param Callable get_stats_by_hash: `get_url_stats_by_hash` or `get_paste_stats_by_hash`
+    :param Callable[[str], str] build_open_url: `build_open_url` or `build_paste_open_url`
+    :param str referers_as: "percent" or "number"
+    :param str dates_as: "percent" or "number"
+    :param Optional[str] access_token: access token
+    :param float interval: min polling interval in seconds
+    :param float max_interval: max polling interval in seconds
+    :raises TerminalRequiredError: if command is run by daemon, as it runs until interrupted
+    :rtype: None
+    """
+    require_terminal()
+    is_terminal = click.get_text_stream("stdout").isatty()
+    lines: List[Tuple[str, str]] = []
+    drawn_columns = 0
+    current_interval = interval
+    try:
+        while True:
+            new_lines = _poll_stats_lines(
+                hashes, get_stats_by_hash, build_open_url, referers_as, dates_as, access_token
+            )
+            changed = new_lines != lines
+            terminal_size = shutil.get_terminal_size()
+            if is_terminal and len(new_lines) + 1 > terminal_size.lines:
+                # Lines above the screen can not be redrawn, so output falls back to log.
+                click.echo("\r\x1b[2K", nl=False)
+                is_terminal = False
+            if is_terminal and lines and terminal_size.columns != drawn_columns:
+                # Terminal is resized and could rewrap lines, so screen is cleared.
+                click.echo("\x1b[H\x1b[2J", nl=False)
+                lines = []
+            if is_terminal:
+                _redraw_lines(lines, new_lines, terminal_size.columns)
+                drawn_columns = terminal_size.columns
+            else:
+                _print_changed_lines(lines, new_lines)
+            lines = new_lines
+            current_interval = interval if changed else min(current_interval * 2, max_interval)
+            if is_terminal:
+                _draw_status(
+                    f"Updated at {datetime.now():%H:%M:%S}, next in {current_interval:g}s",
+                    terminal_size.columns,
+                )
+            time.sleep(current_interval)
+    except KeyboardInterrupt:
+        if is_terminal:
+            click.echo()
+
+
+def _poll_stats_lines(
+    hashes: Sequence[str],
+    get_stats_by_hash: Callable,
+    build_open_url: Callable[[str], str],
+    referers_as: str,
+    dates_as: str,
+    access_token: Optional[str],
+) -> List[Tuple[str, str]]:
+    """Requests stats of every hash and returns lines to print, with url of every line."""
+    results = map_concurrently(
+        lambda hash: get_stats_by_hash(
+            hash,
+            url_views_by_referers_as=referers_as,
+            url_views_by_dates_as=dates_as,
+            access_token=access_token,
+        ),
+        hashes,
+    )
+    lines: List[Tuple[str, str]] = []
+    for hash, result in results:
+        open_url = build_open_url(hash)
+        if len(hashes) > 1:
+            lines.append((open_url, open_url))
+        if isinstance(result, Exception):
+            lines.append((open_url, f"Error: {result or 'Unable to request stats!'}"))
+            continue
+        success, views = result
+        if not success:
+            lines.append((open_url, f"Error: {views['message']}"))
+            continue
+        lines.extend((open_url, line) for line in _get_views_lines(views, referers_as, dates_as))
+    return lines
+
+
+def _get_views_lines(views: Views, referers_as: str, dates_as: str) -> List[str]:
+    """Returns lines of views, like `print_views` prints them."""
+    lines = [f"Total views: {views['total']}"]
+    if views.get("by_referers"):
+        lines.append("Views by referers:")
+        for referer, value in views["by_referers"].items():
+            lines.append(f"\t{referer} - {value}" + "%" * int(referers_as == "percent"))
+    if views.get("by_dates"):
+        lines.append("Views by dates:")
+        for date, value in views["by_dates"].items():
+            lines.append(f"\t{date} - {value}" + "%" * int(dates_as == "percent"))
+    return lines
+
+
+def _redraw_lines(
+    lines: List[Tuple[str, str]], new_lines: List[Tuple[str, str]], columns: int
+) -> None:
+    """
+    Redraws changed lines in terminal, cursor is on status line below lines.
+    All lines are redrawn only if number of lines is changed.
+    Lines are truncated to terminal width, so every line takes one row.
+    """
+    if len(lines) != len(new_lines):
+        # Cursor is moved to first line, and everything below is cleared.
+        prefix = f"\r\x1b[{len(lines)}A" if lines else "\r"
+        click.echo(prefix + "\x1b[J", nl=False)
+        for _, line in new_lines:
+            click.echo(_fit_line(line, columns))
+        return
+
+    for index, ((_, line), (_, new_line)) in enumerate(zip(lines, new_lines)):
+        if line != new_line:
+            offset = len(lines) - index
+            click.echo(
+                f"\r\x1b[{offset}A\x1b[2K{_fit_line(new_line, columns)}\x1b[{offset}B", nl=False
+            )
+
+
+def _draw_status(status: str, columns: int) -> None:
+    """Draws status line below stats lines."""
+    click.echo("\r\x1b[2K" + click.style(_fit_line(status, columns), dim=True), nl=False)
+
+
+def _fit_line(line: str, columns: int) -> str:
+    """
+    Expands tabs and truncates line, so it does not wrap in terminal of given width.
+    Wide (e.g. CJK) characters take two columns.
+    """
+    line = line.expandtabs()
+    width = 0
+    for index, char in enumerate(line):
+        width += 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+        if width > columns - 1:
+            return line[:index]
+    return line
+
+
+def _print_changed_lines(lines: List[Tuple[str, str]], new_lines: List[Tuple[str, str]]) -> None:
+    """Prints new and changed lines with time and url, for output that is not terminal."""
+    previous_lines = set(lines)
+    now = f"{datetime.now():%H:%M:%S}"
+    for open_url, line in new_lines:
+        if (open_url, line) not in previous_lines and line != open_url:
+            click.echo(f"{now} {open_url} {line.strip()}")
+
+
+def _to_percents(
+    items: List[Tuple[str, int]], as_percent: bool, limit: Optional[int] = None
+) -> Dict[str, float]:
+    """Converts sorted pairs of key and number to dict, with percents if needed."""
+    total = sum(value for _, value in items) or 1
+    return {
+        key: round(value / total * 100, 2) if as_percent else value for key, value in items[:limit]
+    }
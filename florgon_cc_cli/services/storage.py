@@ -0,0 +1,208 @@
+"""
+    Local SQLite storage in config dir. Used by local history, indexes and stats snapshots.
+"""
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+import sqlite3
+import threading
+
+from florgon_cc_cli import config
+
+# Statements of every migration are applied once,
+# number of applied migrations is stored as database `user_version`.
+MIGRATIONS: List[Tuple[str, ...]] = [
+    (
+        """
+        CREATE TABLE history (
+            api_host TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            redirect_url TEXT,
+            text_digest TEXT,
+            text_preview TEXT,
+            expires_at REAL NOT NULL,
+            stats_is_public INTEGER NOT NULL,
+            burn_after_read INTEGER NOT NULL,
+            is_deleted INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (api_host, kind, hash)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX history_by_expires_at ON history (api_host, kind, expires_at)",
+        "CREATE INDEX history_by_created_at ON history (api_host, kind, created_at)",
+    ),
+    (
+        """
+        CREATE TABLE paste_index (
+            api_host TEXT NOT NULL,
+            owner TEXT NOT NULL,
+            text_digest TEXT NOT NULL,
+            stats_is_public INTEGER NOT NULL,
+            hash TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (api_host, owner, text_digest, stats_is_public)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX paste_index_by_hash ON paste_index (api_host, hash)",
+        "CREATE INDEX paste_index_by_expires_at ON paste_index (api_host, expires_at)",
+    ),
+    (
+        """
+        CREATE TABLE url_index (
+            api_host TEXT NOT NULL,
+            owner TEXT NOT NULL,
+            long_url TEXT NOT NULL,
+            stats_is_public INTEGER NOT NULL,
+            hash TEXT NOT NULL,
+            redirect_url TEXT NOT NULL,
+            qr_url TEXT,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (api_host, owner, long_url, stats_is_public)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX url_index_by_hash ON url_index (api_host, hash)",
+        "CREATE INDEX url_index_by_expires_at ON url_index (api_host, expires_at)",
+    ),
+    (
+        """
+        CREATE TABLE url_info_cache (
+            api_host TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            url TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (api_host, hash)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX url_info_cache_by_expires_at ON url_info_cache (api_host, expires_at)",
+    ),
+    (
+        # Stats snapshots. Values are appended only when they are changed since last snapshot,
+        # days are stored as number of days since epoch, months as `year * 12 + month - 1`.
+        """
+        CREATE TABLE stats_links (
+            id INTEGER PRIMARY KEY,
+            api_host TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            UNIQUE (api_host, kind, hash)
+        )
+        """,
+        """
+        CREATE TABLE stats_totals (
+            link_id INTEGER NOT NULL,
+            taken_at INTEGER NOT NULL,
+            views INTEGER NOT NULL,
+            PRIMARY KEY (link_id, taken_at)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE stats_referers (
+            link_id INTEGER NOT NULL,
+            referer TEXT NOT NULL,
+            taken_at INTEGER NOT NULL,
+            views INTEGER NOT NULL,
+            PRIMARY KEY (link_id, referer, taken_at)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE stats_dates (
+            link_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            taken_at INTEGER NOT NULL,
+            views INTEGER NOT NULL,
+            PRIMARY KEY (link_id, day, taken_at)
+        ) WITHOUT ROWID
+        """,
+        # Latest values and rollups, updated with snapshots, so queries do not read history.
+        """
+        CREATE TABLE stats_current_referers (
+            link_id INTEGER NOT NULL,
+            referer TEXT NOT NULL,
+            views INTEGER NOT NULL,
+            PRIMARY KEY (link_id, referer)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE stats_current_dates (
+            link_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            views INTEGER NOT NULL,
+            PRIMARY KEY (link_id, day)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE stats_months (
+            link_id INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            views INTEGER NOT NULL,
+            PRIMARY KEY (link_id, month)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE stats_days (
+            api_host TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            views INTEGER NOT NULL,
+            PRIMARY KEY (api_host, kind, day)
+        ) WITHOUT ROWID
+        """,
+    ),
+]
+
+_local = threading.local()
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Returns connection to local storage, one per thread. Creates and migrates storage if needed.
+    Connection is in autocommit mode, use transaction() to group statements.
+    :rtype: sqlite3.Connection
+    :return: connection, rows are returned as sqlite3.Row
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is None or getattr(_local, "path", None) != config.STORAGE_FILE:
+        config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(config.STORAGE_FILE, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        migrate(connection)
+        # Keeps query planner statistics fresh, it is cheap if nothing changed.
+        connection.execute("PRAGMA optimize(0x10002)")
+        _local.connection = connection
+        _local.path = config.STORAGE_FILE
+    return connection
+
+
+@contextmanager
+def transaction(connection: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Executes statements in one write transaction, rollbacks it on error.
+    :param sqlite3.Connection connection: storage connection
+    """
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def migrate(connection: sqlite3.Connection) -> None:
+    """
+    Applies migrations that are not applied yet.
+    :param sqlite3.Connection connection: storage connection
+    :rtype: None
+    """
+    if connection.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        return
+
+    with transaction(connection):
+        # Version is read again, because storage may be migrated by another process.
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        for statements in MIGRATIONS[version:]:
+            for statement in statements:
+                connection.execute(statement)
+        connection.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
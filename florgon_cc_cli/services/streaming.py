@@ -0,0 +1,176 @@
+"""
+    Services for incremental processing of large JSON documents.
+"""
+from typing import Any, Callable, Dict, Iterable, Optional
+import json
+import re
+
+# Longest run of complete characters and escapes inside of JSON string.
+_FIELD_CONTENT_REGEX = re.compile(rb'(?:[^"\\]+|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*')
+_HIGH_SURROGATE_ESCAPE_REGEX = re.compile(rb"\\u[dD][89abAB][0-9a-fA-F]{2}")
+_JSON_WHITESPACE = b" \t\r\n"
+
+
+def extract_json_string_field(
+    chunks: Iterable[bytes],
+    field: str,
+    write: Optional[Callable[[str], Any]] = None,
+    *,
+    unescape_newlines: bool = False,
+) -> Dict[str, Any]:
+    """
+    Parses JSON document from chunks, but value of string field is not kept in memory:
+    it is decoded incrementally and passed to `write` piece by piece.
+    Rest of document must be small, it is parsed as usual.
+    :param Iterable[bytes] chunks: UTF-8 encoded JSON document
+    :param str field: name of string field, first field with this name is extracted
+    :param Optional[Callable[[str], Any]] write: called with decoded pieces of field value,
+                                                 value is discarded if None
+    :param bool unescape_newlines: also replace escaped newlines ("\\n") in value with newlines,
+                                   in the same pass
+    :rtype: Dict[str, Any]
+    :return: parsed document, where field value is replaced with empty string
+    :raises ValueError: if document is not valid JSON
+    """
+    extractor = _JsonStringFieldExtractor(field, write, unescape_newlines)
+    for chunk in chunks:
+        extractor.feed(chunk)
+    return extractor.close()
+
+
+class _JsonStringFieldExtractor:
+    """
+    Incremental scanner for `extract_json_string_field`.
+    Outside of extracted value bytes are scanned one by one and collected,
+    value itself is decoded by large pieces.
+    """
+
+    def __init__(
+        self, field: str, write: Optional[Callable[[str], Any]], unescape_newlines: bool
+    ) -> None:
+        self.key = json.dumps(field).encode()
+        self.write = write
+        self.unescape_newlines = unescape_newlines
+        self.document = bytearray()
+        self.carry = b""
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        # Which token after field key is expected: None, "colon" or "value".
+        self.expect: Optional[str] = None
+        self.in_field = False
+        self.field_found = False
+        self.pending_backslash = False
+
+    def feed(self, data: bytes) -> None:
+        if self.carry:
+            data = self.carry + data
+            self.carry = b""
+        position = 0
+        while position < len(data):
+            if self.in_field:
+                position = self._feed_field(data, position)
+            else:
+                position = self._feed_document(data, position)
+
+    def close(self) -> Dict[str, Any]:
+        if self.in_field or self.carry:
+            raise ValueError("Unexpected end of JSON document")
+        return json.loads(self.document)
+
+    def _feed_document(self, data: bytes, position: int) -> int:
+        start = position
+        while position < len(data):
+            byte = data[position]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif byte == 0x5C:  # \
+                    self.escaped = True
+                elif byte == 0x22:  # "
+                    self.in_string = False
+                    end = position + 1
+                    self.document += data[start:end]
+                    start = end
+                    string_start = self.string_start
+                    is_key = self.document[string_start:] == self.key
+                    self.expect = "colon" if is_key and not self.field_found else None
+            elif byte == 0x22:
+                if self.expect == "value":
+                    end = position + 1
+                    self.document += data[start:end]
+                    self.expect = None
+                    self.in_field = self.field_found = True
+                    return end
+                self.in_string = True
+                self.string_start = len(self.document) + position - start
+                self.expect = None
+            elif byte == 0x3A and self.expect == "colon":  # :
+                self.expect = "value"
+            elif byte not in _JSON_WHITESPACE:
+                self.expect = None
+            position += 1
+
+        self.document += data[start:position]
+        return position
+
+    def _feed_field(self, data: bytes, position: int) -> int:
+        end = _FIELD_CONTENT_REGEX.match(data, position).end()
+        if end < len(data) and data[end] == 0x5C and len(data) - end >= 6:
+            raise ValueError(f"Invalid JSON escape at byte {end}")
+
+        is_closed = end < len(data) and data[end] == 0x22
+        cut = end if is_closed else _get_safe_cut(data, position, end)
+        if cut > position:
+            # Complete escapes are decoded by JSON decoder at C speed.
+            self._write(json.loads(b'"' + data[position:cut] + b'"'))
+        if not is_closed:
+            self.carry = data[cut:]
+            return len(data)
+
+        if self.pending_backslash:
+            self._write_raw("\\")
+            self.pending_backslash = False
+        self.document += b'"'
+        self.in_field = False
+        return end + 1
+
+    def _write(self, text: str) -> None:
+        if not self.unescape_newlines:
+            self._write_raw(text)
+            return
+
+        if self.pending_backslash:
+            self.pending_backslash = False
+            text = "\\" + text
+        if text.endswith("\\"):
+            # Backslash may be followed by "n" from the next piece.
+            self.pending_backslash = True
+            text = text[:-1]
+        self._write_raw(text.replace("\\n", "\n"))
+
+    def _write_raw(self, text: str) -> None:
+        if self.write is not None:
+            self.write(text)
+
+
+def _get_safe_cut(data: bytes, start: int, end: int) -> int:
+    """
+    Returns position, where JSON string content data[start:end] can be split
+    without breaking UTF-8 character or UTF-16 surrogate pair escape.
+    """
+    for offset in range(1, min(4, end - start + 1)):
+        byte = data[end - offset]
+        if byte < 0x80:
+            break
+        if byte >= 0xC0:
+            length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return end - offset if offset < length else end
+
+    if end - start >= 6 and _HIGH_SURROGATE_ESCAPE_REGEX.fullmatch(data, end - 6, end):
+        backslashes = 0
+        while end - 7 - backslashes >= start and data[end - 7 - backslashes] == 0x5C:
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return end - 6
+    return end
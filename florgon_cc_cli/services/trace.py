@@ -0,0 +1,145 @@
+"""
+    Services for tracing timings of API requests, enabled with --trace flag.
+"""
+from typing import List, Optional
+import threading
+import time
+
+import click
+
+from florgon_cc_cli.models.trace import RequestTrace, Trace
+
+_local = threading.local()
+
+
+class Tracer:
+    """
+    Collects timings of API requests and config loading during command execution.
+    Can be used from worker threads.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.requests: List[RequestTrace] = []
+        self.config_load_ms = 0.0
+        self._lock = threading.Lock()
+
+    def add_request(self, request: RequestTrace) -> RequestTrace:
+        """
+        Adds request timings. Returned dict may be updated later, e.g. with JSON decode time.
+        :param RequestTrace request: request timings
+        :rtype: RequestTrace
+        """
+        with self._lock:
+            self.requests.append(request)
+        return request
+
+    def add_config_load(self, duration: float) -> None:
+        """
+        Adds time spent on loading user config.
+        :param float duration: duration in seconds
+        :rtype: None
+        """
+        with self._lock:
+            self.config_load_ms += duration * 1000
+
+    def get_trace(self) -> Trace:
+        """
+        Returns collected timings with total time breakdown.
+        :rtype: Trace
+        """
+        with self._lock:
+            requests = list(self.requests)
+        total_ms = (time.perf_counter() - self.started_at) * 1000
+        network_ms = sum(request["total_ms"] for request in requests)
+        json_decode_ms = sum(request["json_decode_ms"] or 0 for request in requests)
+        bytes_saved = sum(
+            request[size_field] - request[wire_size_field]
+            for request in requests
+            for size_field, wire_size_field in (
+                ("bytes", "wire_bytes"),
+                ("sent_bytes", "sent_wire_bytes"),
+            )
+            if request[size_field] is not None and request[wire_size_field] is not None
+        )
+        return {
+            "requests": requests,
+            "config_load_ms": round(self.config_load_ms, 3),
+            "network_ms": round(network_ms, 3),
+            "json_decode_ms": round(json_decode_ms, 3),
+            "other_ms": round(
+                max(0.0, total_ms - network_ms - json_decode_ms - self.config_load_ms), 3
+            ),
+            "total_ms": round(total_ms, 3),
+            "bytes_saved": bytes_saved,
+        }
+
+
+def get_tracer() -> Optional[Tracer]:
+    """
+    Returns tracer of current command or None if --trace is not passed.
+    :rtype: Optional[Tracer]
+    """
+    ctx = click.get_current_context(silent=True)
+    if ctx is None or not ctx.obj:
+        return None
+    return ctx.obj.get("TRACE")
+
+
+def add_connect_time(duration: float) -> None:
+    """
+    Adds time of opening connection in current thread. Called by HTTP connections.
+    :param float duration: duration in seconds
+    :rtype: None
+    """
+    _local.connect_time = getattr(_local, "connect_time", 0.0) + duration
+
+
+def pop_connect_time() -> float:
+    """
+    Returns time of opening connections in current thread since last call, in seconds.
+    :rtype: float
+    """
+    connect_time = getattr(_local, "connect_time", 0.0)
+    _local.connect_time = 0.0
+    return connect_time
+
+
+def format_trace(trace: Trace) -> str:
+    """
+    Formats trace as human readable table.
+    :param Trace trace: trace
+    :rtype: str
+    """
+    lines = [
+        f"{'METHOD':<8}{'ENDPOINT':<32}{'STATUS':>7}{'BYTES':>10}{'WIRE':>10}"
+        f"{'CONNECT':>10}{'TTFB':>10}{'TOTAL':>10}{'JSON':>10}{'RETRIES':>9}"
+    ]
+    for request in trace["requests"]:
+        lines.append(
+            f"{request['method']:<8}{request['endpoint']:<32}"
+            f"{_format_value(request['status']):>7}{_format_value(request['bytes']):>10}"
+            f"{_format_value(request['wire_bytes']):>10}"
+            f"{request['connect_ms']:>10.2f}{_format_value(request['ttfb_ms'], 2):>10}"
+            f"{request['total_ms']:>10.2f}{_format_value(request['json_decode_ms'], 2):>10}"
+            f"{request['retries']:>9}"
+        )
+    lines.extend(
+        [
+            "",
+            f"Requests: {len(trace['requests'])}",
+            f"Saved by compression: {trace['bytes_saved']} bytes",
+            f"Network: {trace['network_ms']:.2f} ms",
+            f"JSON decode: {trace['json_decode_ms']:.2f} ms",
+            f"Config load: {trace['config_load_ms']:.2f} ms",
+            f"Other: {trace['other_ms']:.2f} ms",
+            f"Total: {trace['total_ms']:.2f} ms",
+        ]
+    )
+    return "\n".join(lines)
+
+
+def _format_value(value, digits: Optional[int] = None) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.{digits}f}" if digits is not None else str(value)
@@ -1,33 +1,53 @@
 """
     Services for working with single url API or list.
 """
+import functools
 import re
-from typing import Tuple, Optional, Union, NoReturn, Literal, List
+from typing import Callable, Iterator, Tuple, Optional, Union, NoReturn, Literal, List, Pattern
 
 import click
-from pick import pick
 
 from florgon_cc_cli.services.api import (
     execute_json_api_method,
     execute_api_method,
     try_decode_response_to_json,
 )
+from florgon_cc_cli.services.cache import execute_cached_json_api_method, invalidate_cache
 from florgon_cc_cli.services.config import get_value_from_config
+from florgon_cc_cli.services.history import find_history_entries
+from florgon_cc_cli.services.index import (
+    delete_url_from_index,
+    delete_url_from_info_cache,
+    find_url_in_info_cache,
+    save_url_to_index,
+    save_url_to_info_cache,
+)
+from florgon_cc_cli.services.pagination import iter_list
+from florgon_cc_cli.services.picker import pick_item
 from florgon_cc_cli.models.url import Url
 from florgon_cc_cli.models.error import Error
 from florgon_cc_cli import config
 
 
+def get_url_open_provider() -> str:
+    """
+    Returns url open provider, it can be changed with `url_open_provider` config value
+    for self-hosted instance.
+    :rtype: str
+    """
+    return (get_value_from_config("url_open_provider") or config.URL_OPEN_PROVIDER).rstrip("/")
+
+
 def build_open_url(hash: str) -> str:
     """Builds url for opening short url."""
-    return f"{config.URL_OPEN_PROVIDER}/{hash}"
+    return f"{get_url_open_provider()}/{hash}"
 
 
 def create_url(
     long_url: str, stats_is_public: bool = False, access_token: Optional[str] = None
 ) -> Union[Tuple[Literal[True], Url], Tuple[Literal[False], Error]]:
     """
-    Creates short url from long url.
+    Creates short url from long url and saves it to local index of urls.
     :param str long_url: url which short url will be redirect
     :param Optional[str] access_token: Florgon OAuth token that used for authentification.
                                      Defaults to None
@@ -45,6 +65,9 @@ def create_url(
     )
 
     if "success" in response:
+        invalidate_cache()
+        save_url_to_index(response["success"]["url"], long_url, access_token)
+        save_url_to_info_cache(response["success"]["url"])
         return True, response["success"]["url"]
     return False, response["error"]
 
@@ -53,15 +76,23 @@ def get_url_info_by_hash(
     hash: str,
 ) -> Union[Tuple[Literal[True], Url], Tuple[Literal[False], Error]]:
     """
-    Returns info about short url by hash.
+    Returns info about short url by hash. Info is cached locally until url expires,
+    cache is not used if --no-cache flag is passed.
     :param str hash: short url hash
     :return: Tuple with two elements.
              First is a response status (True if successfully).
              Seconds is a response body.
     :rtype: Tuple[True, Url] if request is successfully, else Tuple[True, Error]
     """
+    ctx = click.get_current_context(silent=True)
+    use_cache = ctx is None or not ctx.obj.get("NO_CACHE")
+    url = find_url_in_info_cache(hash) if use_cache else None
+    if url is not None:
+        return True, url
+
     response = execute_json_api_method("GET", f"urls/{hash}/")
     if "success" in response:
+        save_url_to_info_cache(response["success"]["url"])
         return True, response["success"]["url"]
     return False, response["error"]
 
@@ -98,36 +129,72 @@ def get_url_stats_by_hash(
 def extract_hash_from_short_url(short_url: str) -> Union[str, NoReturn]:
     """
     Extracts hash from short url.
-    :param str short_url: short url
+    :param str short_url: short url or hash
     :rtype: Union[str, NoReturn]
     :return: url hash or exit application
     """
-    short_url_hashes = re.findall(f"^{config.URL_OPEN_PROVIDER}" + r"/([a-zA-Z0-9]{6})$", short_url)
-    if not short_url_hashes:
+    hash = match_short_url_hash(short_url)
+    if hash is None:
         click.secho(
-            f"Short url is invalid! It should be in form '{config.URL_OPEN_PROVIDER}/xxxxxx'",
+            f"Short url is invalid! It should be in form '{get_url_open_provider()}/xxxxxx'",
             err=True,
             fg="red",
         )
         click.get_current_context().exit(1)
 
-    return short_url_hashes[0]
+    return hash
 
 
-def request_hash_from_urls_list() -> Union[str, NoReturn]:
-    success, response = get_urls_list(access_token=get_value_from_config("access_token"))
-    if not success:
-        click.secho(response["message"], err=True, fg="red")
-        click.get_current_context().exit(1)
+def match_short_url_hash(short_url: str) -> Optional[str]:
+    """
+    Returns hash of short url or None if short url is invalid. Short url may have default
+    or configured open provider (see `get_url_open_provider`), or be bare hash.
+    :param str short_url: short url or hash
+    :rtype: Optional[str]
+    """
+    match = _get_short_url_regex(get_url_open_provider()).fullmatch(short_url)
+    return match.group(1) if match is not None else None
 
-    # TODO: This logic must be moved to API
-    urls = [url for url in response if not url["is_expired"] and not url["is_deleted"]]
+
+@functools.lru_cache(maxsize=None)
+def _get_short_url_regex(url_open_provider: str) -> Pattern[str]:
+    """Returns compiled regex for short urls, it is compiled once per open provider."""
+    providers = "|".join(
+        re.escape(provider)
+        for provider in dict.fromkeys([config.URL_OPEN_PROVIDER, url_open_provider])
+    )
+    return re.compile(f"(?:(?:{providers})/)?([a-zA-Z0-9]{{6}})")
+
+
+def request_hash_from_urls_list(from_history: bool = False) -> Union[str, NoReturn]:
+    """
+    Requests server for urls list and requests user to choose one.
+    :param bool from_history: choose from local history instead of requesting server
+    :returns: Url hash
+    :rtype: str
+    """
+    if from_history:
+        urls = find_history_entries("url", expired=False)
+    else:
+        success, response = get_urls_list(access_token=get_value_from_config("access_token"))
+        if not success:
+            click.secho(response["message"], err=True, fg="red")
+            click.get_current_context().exit(1)
+
+        # TODO: This logic must be moved to API
+        urls = [url for url in response if not url["is_expired"] and not url["is_deleted"]]
     if not urls:
-        click.secho("You have not active pastes!", fg="red", err=True)
+        click.secho("You have not active urls!", fg="red", err=True)
         click.get_current_context().exit(1)
 
-    urls_formatted = [f"{build_open_url(url['hash'])} - {url['redirect_url']}" for url in urls]
-    _, index = pick(urls_formatted, "Choose one from your urls:", indicator=">")
+    index = pick_item(
+        urls,
+        "Choose one from your urls (type to search):",
+        lambda url: f"{build_open_url(url['hash'])} - {url['redirect_url']}",
+        lambda url: f"{url['hash']} {url['redirect_url']}",
+    )
+    if index is None:
+        raise click.Abort()
     return urls[index]["hash"]
 
 
@@ -142,13 +209,44 @@ def get_urls_list(
              Seconds is a response body.
     :rtype: Tuple[True, Url] if request is successfully, else Tuple[False, Error]
     """
-    response = execute_json_api_method("GET", "urls/", access_token=access_token)
+    response = execute_cached_json_api_method("urls/", access_token=access_token)
     if "success" in response:
         # NOTE: This is temporary solution. Should be moved to cc-api.
         return True, [url for url in response["success"]["urls"] if not url["is_deleted"]]
     return False, response["error"]
 
 
+def iter_urls_list(
+    access_token: Optional[str] = None,
+    *,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    page_size: Optional[int] = None,
+    on_page_end: Callable[[], None] = lambda: None,
+) -> Iterator[Url]:
+    """
+    Yields user's urls by access_token, next page is requested only when previous is consumed.
+    Prints error and exits application if API returns error.
+    :param Optional[str] access_token: access token
+    :param int offset: number of urls to skip
+    :param Optional[int] limit: max number of urls, all urls if None
+    :param Optional[int] page_size: number of urls requested at once
+    :param Callable on_page_end: called when page is consumed, before next page is requested
+    :rtype: Iterator[Url]
+    """
+    return iter_list(
+        "urls/",
+        "urls",
+        access_token=access_token,
+        offset=offset,
+        limit=limit,
+        page_size=page_size,
+        on_page_end=on_page_end,
+        # NOTE: This is temporary solution. Should be moved to cc-api.
+        is_visible=lambda url: not url["is_deleted"],
+    )
+
+
 def delete_url_by_hash(
     hash: str, access_token: Optional[str] = None
 ) -> Union[Tuple[Literal[True]], Tuple[Literal[False], Error], NoReturn]:
@@ -164,8 +262,11 @@ def delete_url_by_hash(
     """
     response = execute_api_method("DELETE", f"urls/{hash}/", access_token=access_token)
     if response.status_code == 204:
+        invalidate_cache()
+        delete_url_from_index(hash)
+        delete_url_from_info_cache(hash)
         return (True,)
-    return try_decode_response_to_json(response)
+    return False, try_decode_response_to_json(response)["error"]
 
 
 def clear_url_stats_by_hash(
@@ -184,4 +285,4 @@ def clear_url_stats_by_hash(
     response = execute_api_method("DELETE", f"urls/{hash}/stats", access_token=access_token)
     if response.status_code == 204:
         return (True,)
-    return try_decode_response_to_json(response)
+    return False, try_decode_response_to_json(response)["error"]
@@ -0,0 +1,16 @@
+"""
+    Shared fixtures of tests.
+"""
+import pytest
+
+from florgon_cc_cli import config
+
+
+@pytest.fixture()
+def config_dir(tmp_path, monkeypatch):
+    """Config, storage and cache are kept in temporary dir, so real config is not touched."""
+    monkeypatch.setattr(config, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(config, "CONFIG_FILE", tmp_path / "config.toml")
+    monkeypatch.setattr(config, "STORAGE_FILE", tmp_path / "storage.sqlite3")
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path / "cache")
+    return tmp_path
@@ -0,0 +1,21 @@
+"""
+    Tests for process-wide HTTP session.
+"""
+from florgon_cc_cli.services import api
+from florgon_cc_cli.services.config import update_config
+
+
+def test_session_is_rebuilt_when_config_is_changed(config_dir):
+    api.close_session()
+
+    session = api.get_session()
+    update_config({"access_token": "token"})
+    assert api.get_session() is session
+
+    update_config({"max_retries": 0, "pool_size": 2})
+    rebuilt_session = api.get_session()
+    adapter = rebuilt_session.get_adapter("https://example.com/")
+    assert rebuilt_session is not session
+    assert adapter.max_retries.total == 0
+    assert adapter._pool_maxsize == 2
+    api.close_session()
@@ -0,0 +1,116 @@
+"""
+    Tests for asyncio interface of API, run against fake API (benchmarks/fake_api.py).
+"""
+import asyncio
+import threading
+
+import pytest
+
+from benchmarks.fake_api import FakeApi, create_server
+from florgon_cc_cli import config
+from florgon_cc_cli.models.error import Error
+from florgon_cc_cli.models.paste import Paste
+from florgon_cc_cli.models.stats import Views
+from florgon_cc_cli.models.url import Url
+from florgon_cc_cli.services import async_api, async_paste, async_url, paste, url
+from florgon_cc_cli.services.config import update_config
+
+LATENCY = 0.05
+
+
+class CountingFakeApi(FakeApi):
+    """Fake API, that counts max number of requests handled at the same time."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.counter_lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def handle(self, *args, **kwargs):
+        with self.counter_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return super().handle(*args, **kwargs)
+        finally:
+            with self.counter_lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture()
+def api(config_dir):
+    """Starts fake API, config in temporary dir points to it."""
+    fake_api = CountingFakeApi(urls_count=5, pastes_count=3, paste_size=256, latency=LATENCY)
+    server = create_server(fake_api)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    update_config({"api_host": f"http://127.0.0.1:{server.server_address[1]}/v1"})
+    yield fake_api
+    server.shutdown()
+    server.server_close()
+    async_api.set_concurrency_limit(config.DEFAULT_POOL_SIZE)
+
+
+def assert_model(value, model) -> None:
+    assert set(model.__annotations__) <= set(value)
+
+
+def test_url_functions_return_same_models(api):
+    async def run():
+        created = await async_url.create_url("https://example.com/async")
+        info = await async_url.get_url_info_by_hash(created[1]["hash"])
+        stats = await async_url.get_url_stats_by_hash(created[1]["hash"])
+        urls = await async_url.get_urls_list()
+        missing = await async_url.get_url_info_by_hash("missing")
+        return created, info, stats, urls, missing
+
+    created, info, stats, urls, missing = asyncio.run(run())
+
+    assert created[0] and info[0] and stats[0] and urls[0]
+    assert_model(created[1], Url)
+    assert info[1]["hash"] == created[1]["hash"]
+    assert set(info[1]) == set(url.get_url_info_by_hash(created[1]["hash"])[1])
+    assert_model(stats[1], Views)
+    assert stats[1] == url.get_url_stats_by_hash(created[1]["hash"])[1]
+    assert len(urls[1]) == 6
+    assert missing[0] is False
+    assert_model(missing[1], Error)
+    assert missing == url.get_url_info_by_hash("missing")
+
+
+def test_paste_functions_return_same_models(api):
+    async def run():
+        created = await async_paste.create_paste("first\nsecond")
+        info = await async_paste.get_paste_info_by_hash(created[1]["hash"])
+        stats = await async_paste.get_paste_stats_by_hash(created[1]["hash"])
+        pastes = await async_paste.get_pastes_list()
+        deleted = await async_paste.delete_paste_by_hash(created[1]["hash"])
+        missing = await async_paste.get_paste_info_by_hash(created[1]["hash"])
+        return created, info, stats, pastes, deleted, missing
+
+    created, info, stats, pastes, deleted, missing = asyncio.run(run())
+
+    assert created[0] and info[0] and stats[0] and pastes[0] and deleted[0]
+    assert_model(created[1], Paste)
+    assert info[1]["text"] == created[1]["text"] == "first\nsecond"
+    assert_model(stats[1], Views)
+    assert len(pastes[1]) == 4
+    assert missing[0] is False
+    assert_model(missing[1], Error)
+    assert missing == paste.get_paste_info_by_hash(created[1]["hash"])
+
+
+def test_concurrency_limit_holds(api):
+    async_api.set_concurrency_limit(2)
+
+    async def run():
+        return await asyncio.gather(
+            *(async_url.get_url_stats_by_hash(hash) for hash in list(api.urls) * 2)
+        )
+
+    results = asyncio.run(run())
+
+    assert all(success for success, _ in results)
+    assert api.max_in_flight == 2
+    assert async_api.get_concurrency_limit() == 2
@@ -0,0 +1,39 @@
+"""
+    Tests for entry point, that forwards commands to daemon.
+"""
+import pytest
+
+from florgon_cc_cli import client
+
+
+@pytest.mark.parametrize(
+    "arg, reads_stdin",
+    [
+        ("-", True),
+        ("--from-file=-", True),
+        ("-f-", True),
+        ("-of-", True),
+        ("-f", False),
+        ("--", False),
+        ("--from-file", False),
+        ("--from-file=urls.txt", False),
+        ("https://example.com/a-", False),
+        ("x1xx23", False),
+    ],
+)
+def test_is_stdin_arg(arg, reads_stdin):
+    assert client._is_stdin_arg(arg) is reads_stdin
+
+
+def test_commands_that_read_stdin_are_not_forwarded(tmp_path, monkeypatch):
+    socket_file = tmp_path / "daemon.sock"
+    socket_file.touch()
+    monkeypatch.setattr(client, "SOCKET_FILE", socket_file)
+    monkeypatch.delenv(client.NO_DAEMON_ENV, raising=False)
+
+    assert client._can_forward(["url", "create", "-f", "urls.txt"])
+    assert not client._can_forward(["url", "create", "--from-file=-"])
+    assert not client._can_forward(["url", "create", "-f-"])
+    assert not client._can_forward(["--anonymous", "shell"])
+    monkeypatch.setenv(client.NO_DAEMON_ENV, "1")
+    assert not client._can_forward(["url", "list"])
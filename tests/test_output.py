@@ -0,0 +1,50 @@
+"""
+    Tests for buffered list writer.
+"""
+import io
+
+from florgon_cc_cli.services import output, pagination
+from florgon_cc_cli.services.output import ListWriter
+
+
+def test_rows_are_flushed_before_next_page(monkeypatch):
+    file = io.StringIO()
+    written_before_request = []
+
+    def execute_cached_json_api_method(api_method, params, access_token):
+        written_before_request.append(file.getvalue().count("\n"))
+        items = [{"id": index} for index in range(5)]
+        start, end = params["offset"], params["offset"] + params["limit"]
+        return {"success": {"items": items[start:end]}}
+
+    monkeypatch.setattr(
+        pagination, "execute_cached_json_api_method", execute_cached_json_api_method
+    )
+    # Interval is never reached, so rows are flushed only on page end.
+    monkeypatch.setattr(output, "FLUSH_INTERVAL", 3600)
+    writer = ListWriter("ndjson", ("id",), str, file=file)
+    with writer:
+        for item in pagination.iter_list("items/", "items", page_size=2, on_page_end=writer.flush):
+            writer.write(item)
+
+    assert written_before_request == [0, 2, 4]
+    assert file.getvalue().count("\n") == 5
+
+
+def test_formats():
+    rows = [{"hash": "a", "views": 1}, {"hash": "b,c", "views": 2}]
+    files = {output_format: io.StringIO() for output_format in output.OUTPUT_FORMATS}
+    for output_format, file in files.items():
+        with ListWriter(
+            output_format,
+            ("hash", "views"),
+            lambda row: f"{row['hash']} - {row['views']}",
+            title="Title:",
+            file=file,
+        ) as writer:
+            for row in rows:
+                writer.write(row)
+
+    assert files["table"].getvalue() == "Title:\na - 1\nb,c - 2\n"
+    assert files["ndjson"].getvalue() == '{"hash": "a", "views": 1}\n{"hash": "b,c", "views": 2}\n'
+    assert files["csv"].getvalue() == 'hash,views\na,1\n"b,c",2\n'
@@ -0,0 +1,92 @@
+"""
+    Tests for requesting lists page by page.
+"""
+from florgon_cc_cli.services import pagination
+from florgon_cc_cli.services.paste import iter_pastes_list
+
+
+def fake_list_api(monkeypatch, field, items, *, paginate=True):
+    """Replaces list API with list of items, returns list of requested (offset, limit)."""
+    requests = []
+
+    def execute_cached_json_api_method(api_method, params, access_token):
+        requests.append((params["offset"], params["limit"]))
+        if not paginate:
+            return {"success": {field: items}}
+        start, end = params["offset"], params["offset"] + params["limit"]
+        return {"success": {field: items[start:end]}}
+
+    monkeypatch.setattr(
+        pagination, "execute_cached_json_api_method", execute_cached_json_api_method
+    )
+    return requests
+
+
+def make_items(count):
+    return [{"id": index} for index in range(count)]
+
+
+def test_pages_are_requested_with_offset(monkeypatch):
+    requests = fake_list_api(monkeypatch, "items", make_items(7))
+
+    items = list(pagination.iter_list("items/", "items", offset=3, page_size=2))
+
+    assert [item["id"] for item in items] == [3, 4, 5, 6]
+    # One-item request checks whether API paginates.
+    assert requests == [(0, 1), (3, 2), (5, 2), (7, 2)]
+
+
+def test_pages_are_requested_lazily(monkeypatch):
+    requests = fake_list_api(monkeypatch, "items", make_items(7))
+
+    items = pagination.iter_list("items/", "items", page_size=2, limit=3)
+
+    assert next(items)["id"] == 0
+    assert requests == [(0, 2)]
+    assert [item["id"] for item in items] == [1, 2]
+    assert requests == [(0, 2), (2, 2)]
+
+
+def test_whole_list_is_sliced_if_api_does_not_paginate(monkeypatch):
+    requests = fake_list_api(monkeypatch, "items", make_items(7), paginate=False)
+
+    items = list(pagination.iter_list("items/", "items", page_size=2))
+    items_with_offset = list(pagination.iter_list("items/", "items", offset=3, page_size=2))
+    items_with_limit = list(pagination.iter_list("items/", "items", offset=3, limit=2))
+
+    assert [item["id"] for item in items] == list(range(7))
+    assert [item["id"] for item in items_with_offset] == [3, 4, 5, 6]
+    assert [item["id"] for item in items_with_limit] == [3, 4]
+    # Whole list is requested once, no more pages are requested.
+    assert requests == [(0, 2), (0, 1), (0, 1)]
+
+
+def test_whole_list_is_sliced_if_api_returns_not_more_than_page(monkeypatch):
+    # Whole list fits in page, so API that ignores offset returns the same first item.
+    requests = fake_list_api(monkeypatch, "items", make_items(2), paginate=False)
+
+    items = list(pagination.iter_list("items/", "items", page_size=2))
+
+    assert [item["id"] for item in items] == [0, 1]
+    assert requests == [(0, 2), (2, 2)]
+
+
+def make_paste(index, *, is_expired=False, is_deleted=False):
+    return {
+        "hash": str(index),
+        "text": "",
+        "is_expired": is_expired,
+        "is_deleted": is_deleted,
+    }
+
+
+def test_limit_counts_only_not_expired_pastes(monkeypatch):
+    pastes = [make_paste(index, is_expired=index % 2 == 0) for index in range(10)]
+    pastes.append(make_paste(10, is_deleted=True))
+    fake_list_api(monkeypatch, "pastes", pastes)
+
+    found = list(iter_pastes_list(limit=3, page_size=2, exclude_expired=True))
+    everything = list(iter_pastes_list(page_size=4))
+
+    assert [paste["hash"] for paste in found] == ["1", "3", "5"]
+    assert len(everything) == 10
@@ -0,0 +1,72 @@
+"""
+    Tests for local store of stats snapshots.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from florgon_cc_cli.services.snapshots import query_top_links, save_stats_snapshot
+
+FIRST_DAY = date(2023, 1, 15)
+DAYS_COUNT = 80
+
+
+def get_views_by_dates(factor):
+    days = (FIRST_DAY + timedelta(days=offset) for offset in range(DAYS_COUNT))
+    return {day.isoformat(): day.toordinal() % 7 * factor + 1 for day in days}
+
+
+VIEWS_BY_DATES = {"first": get_views_by_dates(1), "second": get_views_by_dates(3)}
+
+
+@pytest.fixture()
+def snapshot(config_dir):
+    save_stats_snapshot(
+        "url",
+        [
+            (hash, {"total": sum(by_dates.values()), "by_dates": by_dates})
+            for hash, by_dates in VIEWS_BY_DATES.items()
+        ],
+    )
+
+
+def sum_views(hash, since, until):
+    return sum(
+        views
+        for day, views in VIEWS_BY_DATES[hash].items()
+        if (since is None or date.fromisoformat(day) >= since)
+        and (until is None or date.fromisoformat(day) <= until)
+    )
+
+
+@pytest.mark.parametrize(
+    "since, until",
+    [
+        (None, None),
+        (date(2023, 2, 1), date(2023, 2, 28)),
+        (date(2023, 1, 20), date(2023, 3, 10)),
+        (date(2023, 1, 31), date(2023, 2, 1)),
+        (date(2023, 2, 3), date(2023, 2, 17)),
+        (date(2023, 2, 1), date(2023, 3, 31)),
+        (date(2023, 2, 2), None),
+        (None, date(2023, 2, 27)),
+        (date(2023, 3, 1), date(2023, 2, 28)),
+    ],
+)
+def test_top_links_sum_months_and_edge_days(snapshot, since, until):
+    expected = sorted(
+        (("url", hash, sum_views(hash, since, until)) for hash in VIEWS_BY_DATES),
+        key=lambda link: -link[2],
+    )
+    expected = [link for link in expected if link[2]]
+
+    assert query_top_links(10, since=since, until=until) == expected
+
+
+def test_changed_views_are_counted_once(snapshot):
+    changed = {**VIEWS_BY_DATES["first"], "2023-02-10": 1000}
+    save_stats_snapshot("url", [("first", {"total": sum(changed.values()), "by_dates": changed})])
+
+    assert query_top_links(1, kind="url", hashes=["first"]) == [
+        ("url", "first", sum(changed.values()))
+    ]